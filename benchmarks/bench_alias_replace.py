@@ -0,0 +1,87 @@
+"""
+Substituição de aliases nas explicações exibidas.
+
+Gera as linhas de explicação classificando relatos sorteados do
+KEYWORDS_DICT e compara a função antiga (ordena a tabela e aplica um re.sub
+por alias a cada linha) com o AliasReplacer da versão ativa da base: sem o
+cache de linhas, com o cache esvaziado antes de cada lista (primeira
+exibição) e com o cache cheio (reruns do Streamlit). Confere que todos dão o
+mesmo texto.
+
+Uso: python benchmarks/bench_alias_replace.py [relatos]   (padrão: 50)
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base.keyword_aliases import get_alias_replacer
+from knowledge_base.versioning import active_version
+
+from bench_multi_case import make_corpus
+
+REPEAT = 20
+
+
+def legacy_apply_aliases(text):
+    """apply_aliases_to_text como era antes do AliasReplacer."""
+    result = text
+    sorted_keywords = sorted(active_version().keyword_aliases.items(), key=lambda x: len(x[0]), reverse=True)
+    for keyword, alias in sorted_keywords:
+        if keyword.replace("_", "").isalnum():
+            pattern = rf'\b{re.escape(keyword)}\b'
+        else:
+            pattern = rf'{re.escape(keyword)}'
+        result = re.sub(pattern, alias, result, flags=re.IGNORECASE)
+    return result
+
+
+def explanation_lines(size):
+    expert_system = ExpertSystem(api_key="benchmark")
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch = expert_system.classify_batch(make_corpus(size))
+    return [
+        line.strip()[2:] if line.strip().startswith("- ") else line.strip()
+        for result in batch.values()
+        for classification in result["classifications"]
+        for line in classification.get("explanation", [])
+        if line.strip()
+    ]
+
+
+def timed(function, lines, before=None):
+    elapsed = 0.0
+    for _ in range(REPEAT):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        output = [function(line) for line in lines]
+        elapsed += time.perf_counter() - start
+    return output, elapsed / (REPEAT * len(lines))
+
+
+def main(size=50):
+    lines = explanation_lines(size)
+    replacer = get_alias_replacer()
+
+    expected, legacy_time = timed(legacy_apply_aliases, lines)
+    rows = [
+        ("sem cache de linhas", timed(replacer._apply, lines)),
+        ("primeira exibição", timed(replacer, lines, before=replacer.cache_clear)),
+        ("reruns", timed(replacer, lines)),
+    ]
+
+    print(f"{len(lines)} linhas de explicação ({len(set(lines))} distintas)")
+    print(f"{'re.sub por alias':<22}{legacy_time * 1e6:>10.1f} us/linha")
+    for label, (output, elapsed) in rows:
+        assert output == expected
+        print(f"{label:<22}{elapsed * 1e6:>10.1f} us/linha{legacy_time / elapsed:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+Latência de uma análise completa (load_facts + run) por backend de casamento.
+
+Compara a rede Rete do experta com o avaliador gerado por
+engine/rules/rule_compiler.py sobre os mesmos fatos e confere que os dois
+chegam ao mesmo resultado.
+
+Uso: python benchmarks/bench_compiled.py [repeticoes]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import ViolenceRules
+from engine.rules.rule_compiler import compile_engine
+from engine.request_context import new_relato_id
+from engine.text_processor import TextProcessor
+from engine.facts import AnalysisResult
+
+from bench_declare import CASES
+
+
+def analyze(engine, facts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine.load_facts([fact.copy() for fact in facts])
+        engine.run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def result_of(engine):
+    return [fact.as_dict() for fact in engine.facts.values() if isinstance(fact, AnalysisResult)]
+
+
+def main(repeat=200):
+    processor = TextProcessor(api_key="benchmark")
+    experta_engine = ViolenceRules()
+    compiled_engine = compile_engine(ViolenceRules)()
+
+    print(f"{'caso':<10}{'fatos':>7}{'experta (ms)':>15}{'compilado (ms)':>17}{'ganho':>8}")
+    for name, keywords in CASES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            facts = processor.build_facts(new_relato_id(), keywords)
+            rete = analyze(experta_engine, facts, repeat)
+            compiled = analyze(compiled_engine, facts, repeat)
+        assert result_of(compiled_engine) == result_of(experta_engine)
+        print(f"{name:<10}{len(facts):>7}{rete:>15.3f}{compiled:>17.3f}{rete / compiled:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
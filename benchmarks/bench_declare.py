@@ -0,0 +1,87 @@
+"""
+Microbenchmark da fase de declaração de fatos.
+
+Compara o caminho anterior (DepthStrategy padrão, reset, um declare por fato
+e o disparo de start_analysis_phase para sair da fase de coleta) com o
+caminho em lote (BatchDepthStrategy e load_facts, que já reinicia na fase de
+análise e declara tudo de uma vez).
+Os dois caminhos terminam no mesmo estado: fase de análise com a agenda
+completa, pronta para run.
+
+Uso: python benchmarks/bench_declare.py [repeticoes]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from experta import KnowledgeEngine
+from experta.strategies import DepthStrategy
+from engine.rules import ViolenceRules
+from engine.request_context import new_relato_id
+from engine.text_processor import TextProcessor
+
+CASES = {
+    "pequeno": {"action_type": ["perseguicao"]},
+    "medio": {
+        "action_type": ["humilhacao", "pressao_tarefas"],
+        "target": ["genero"],
+        "context": ["local_trabalho"],
+    },
+    "grande": {
+        "action_type": ["perseguicao", "insulto_racial", "humilhacao", "ameaca"],
+        "target": ["raca_etnia", "genero"],
+        "impact": ["medo_inseguranca", "danos_emocionais"],
+        "context": ["local_trabalho"],
+        "frequency": ["repetidamente"],
+        "relationship": ["relacao_hierarquica"],
+    },
+}
+
+
+class LegacyViolenceRules(ViolenceRules):
+    """Motor com a estratégia padrão do Experta, como antes do caminho em lote."""
+    __strategy__ = DepthStrategy
+
+
+def declare_one_by_one(engine, facts):
+    engine.reset()
+    for fact in facts:
+        engine.declare(fact)
+    # Dispara apenas start_analysis_phase (única ativação na fase de coleta)
+    KnowledgeEngine.run(engine, 1)
+    # Propaga a nova fase até a agenda, como o próximo passo de run faria
+    added, removed = engine.get_activations()
+    engine.strategy.update_agenda(engine.agenda, added, removed)
+
+
+def declare_bulk(engine, facts):
+    engine.load_facts(facts)
+
+
+def measure(strategy, engine, facts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        strategy(engine, [fact.copy() for fact in facts])
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(repeat=300):
+    processor = TextProcessor(api_key="benchmark")
+    legacy_engine = LegacyViolenceRules()
+    engine = ViolenceRules()
+
+    print(f"{'caso':<10}{'fatos':>7}{'hoje (ms)':>15}{'lote (ms)':>12}{'ganho':>8}")
+    for name, keywords in CASES.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            facts = processor.build_facts(new_relato_id(), keywords)
+            legacy = measure(declare_one_by_one, legacy_engine, facts, repeat)
+            bulk = measure(declare_bulk, engine, facts, repeat)
+        print(f"{name:<10}{len(facts):>7}{legacy:>15.3f}{bulk:>12.3f}{legacy / bulk:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
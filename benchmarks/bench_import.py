@@ -0,0 +1,55 @@
+"""
+Tempo de import em um interpretador novo, como pagam a CLI, os testes e os
+processos de replay.
+
+Cada módulo é importado em um subprocesso; o tempo do interpretador vazio é
+descontado. Também informa se a importação já montou a base de conhecimento
+(ViolenceTypeManager) ou carregou o streamlit.
+
+Uso: python benchmarks/bench_import.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULES = [
+    "knowledge_base.keywords_dictionary",
+    "knowledge_base.weight_matrix",
+    "engine.rules",
+    "engine.expert_system",
+]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+versioning = sys.modules.get("knowledge_base.versioning")
+built = getattr(versioning, "_current", None) is not None
+print(elapsed * 1000, built, "streamlit" in sys.modules)
+"""
+
+
+def measure(module, repeat):
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        samples.append(float(output[0]))
+    return statistics.median(samples), output[1] == "True", output[2] == "True"
+
+
+def main(repeat=5):
+    print(f"{'módulo':<38}{'import (ms)':>12}{'base montada':>15}{'streamlit':>11}")
+    for module in MODULES:
+        elapsed, built, streamlit = measure(module, repeat)
+        print(f"{module:<38}{elapsed:>12.1f}{'sim' if built else 'não':>15}{'sim' if streamlit else 'não':>11}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,87 @@
+"""
+Memória da base de conhecimento por processo, antes e depois dos modelos
+compactos (congelados, com __slots__, campos em tupla e strings internadas).
+
+Mede com tracemalloc, em um interpretador novo, quanto os modelos da base
+(ViolenceTypeManager) e as visões da instituição padrão (VIOLENCE_TYPES,
+REPORT_CONTACT, SEVERITY_RANKING) alocam. O "antes" é a revisão anterior à
+introdução dos modelos compactos, extraída do git para um diretório
+temporário; o "depois" é a árvore atual. O valor se multiplica pelo número
+de processos de trabalho.
+
+Uso: python benchmarks/bench_kb_memory.py [revisao_anterior]
+"""
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Funciona nas duas revisões: a anterior ainda não tinha versões da base
+PROBE = """
+import gc, tracemalloc
+import knowledge_base.factories.violence_factory
+from knowledge_base import keyword_aliases, keywords_dictionary, violence_manager
+tracemalloc.start()
+gc.collect()
+start = tracemalloc.get_traced_memory()[0]
+if hasattr(violence_manager, "active_version"):
+    from knowledge_base import versioning
+    manager = violence_manager.ViolenceTypeManager()
+    gc.collect()
+    models = tracemalloc.get_traced_memory()[0] - start
+    versioning._publish(versioning.KnowledgeBaseVersion(1, "", manager, keywords_dictionary, keyword_aliases))
+else:
+    # Também pela fábrica: strings vindas de um snapshot JSON seriam alocações novas
+    manager = violence_manager.ViolenceTypeManager(use_snapshot=False)
+    violence_manager.get_violence_manager = lambda: manager
+    gc.collect()
+    models = tracemalloc.get_traced_memory()[0] - start
+gc.collect()
+start = tracemalloc.get_traced_memory()[0]
+views = (violence_manager.get_violence_types(), violence_manager.get_report_contact(),
+         violence_manager.get_severity_ranking())
+gc.collect()
+print(models, tracemalloc.get_traced_memory()[0] - start)
+"""
+
+
+def baseline_revision() -> str:
+    """Revisão anterior ao commit que introduziu os modelos compactos."""
+    introduced = subprocess.run(
+        ["git", "log", "--format=%H", "--reverse", "-S", "def _model(", "--",
+         "knowledge_base/models/violence_type.py"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()[0]
+    return f"{introduced}^"
+
+
+def measure(tree):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=tree, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return int(output[-2]), int(output[-1])
+
+
+def measure_revision(revision):
+    with tempfile.TemporaryDirectory() as tree:
+        archive = os.path.join(tree, "tree.tar")
+        subprocess.run(["git", "archive", "-o", archive, revision], cwd=ROOT, check=True)
+        with tarfile.open(archive) as source:
+            source.extractall(tree)
+        return measure(tree)
+
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else baseline_revision()
+    print(f"{'':<10}{'modelos (KiB)':>15}{'visões (KiB)':>15}{'total (KiB)':>14}")
+    for label, (models, views) in (("antes", measure_revision(revision)), ("depois", measure(ROOT))):
+        print(f"{label:<10}{models / 1024:>15.1f}{views / 1024:>15.1f}{(models + views) / 1024:>14.1f}")
+    print(f"\nantes = {revision}")
+
+
+if __name__ == "__main__":
+    main()
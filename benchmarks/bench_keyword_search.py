@@ -0,0 +1,115 @@
+"""
+Busca por palavras-chave: varredura original × índice invertido.
+
+Monta uma base sintética com milhares de subtipos (palavras-chave geradas a
+partir de sílabas, mais as da base real), confere que o índice devolve
+exatamente a mesma lista da varredura e mede o tempo médio por consulta.
+
+Uso: python benchmarks/bench_keyword_search.py [subtipos] [consultas]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knowledge_base.keyword_index import KeywordIndex
+from knowledge_base.normalization import normalize_term
+from knowledge_base.models.violence_type import ViolenceType, ViolenceSubtype, Severity
+from knowledge_base.violence_manager import get_violence_manager
+
+SYLLABLES = ["ca", "de", "fa", "lo", "mi", "no", "pe", "ra", "si", "tu", "va", "zo", "ção", "ão", "ss"]
+
+
+def scan_search(violence_types, keywords):
+    """Varredura completa (a busca original), com os termos normalizados."""
+    results = []
+    query_terms = [normalize_term(k) for k in keywords]
+
+    for vtype_name, vtype in violence_types.items():
+        vtype_keywords = [normalize_term(k) for k in vtype.keywords]
+        main_matches = sum(1 for k in query_terms if any(k in vk for vk in vtype_keywords))
+        if main_matches > 0:
+            results.append((vtype_name, None, main_matches))
+
+        for subtype_name, subtype in vtype.subtypes.items():
+            subtype_keywords = [normalize_term(k) for k in subtype.keywords]
+            sub_matches = sum(1 for k in query_terms if any(k in sk for sk in subtype_keywords))
+            if sub_matches > 0:
+                results.append((vtype_name, subtype_name, sub_matches))
+
+    results.sort(key=lambda x: x[2], reverse=True)
+    return results
+
+
+def synthetic_knowledge_base(subtypes, rng):
+    real_keywords = sorted({
+        keyword
+        for vtype in get_violence_manager().get_all_violence_types().values()
+        for keyword in vtype.get_all_keywords()
+    })
+
+    def word():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+
+    def keywords():
+        return [rng.choice(real_keywords) if rng.random() < 0.3 else word()
+                for _ in range(rng.randint(2, 6))]
+
+    violence_types = {}
+    per_type = 50
+    for type_number in range(max(1, subtypes // per_type)):
+        type_keywords = keywords()
+        subtypes = {}
+        for subtype_number in range(per_type):
+            name = f"subtipo_{type_number}_{subtype_number}"
+            subtypes[name] = ViolenceSubtype(name=name, definition="", keywords=keywords())
+        vtype = ViolenceType(
+            name=f"tipo_{type_number}", definition="", severity=Severity.MEDIA,
+            keywords=type_keywords, subtypes=subtypes
+        )
+        violence_types[vtype.name] = vtype
+    return violence_types, real_keywords
+
+
+def main(subtypes=5000, queries=200):
+    rng = random.Random(39)
+    violence_types, real_keywords = synthetic_knowledge_base(subtypes, rng)
+    vocabulary = sorted({k for vtype in violence_types.values() for k in vtype.get_all_keywords()})
+
+    workload = []
+    for _ in range(queries):
+        query = []
+        for _ in range(rng.randint(1, 4)):
+            keyword = rng.choice(vocabulary if rng.random() < 0.7 else real_keywords)
+            start = rng.randint(0, max(0, len(keyword) - 3))
+            query.append(keyword[start:start + rng.randint(2, 8)].upper() if rng.random() < 0.1
+                         else keyword[start:start + rng.randint(2, 8)])
+        workload.append(query)
+
+    start = time.perf_counter()
+    index = KeywordIndex(violence_types)
+    build = time.perf_counter() - start
+
+    scan_samples = workload[:max(1, queries // 10)]
+    start = time.perf_counter()
+    expected = [scan_search(violence_types, query) for query in scan_samples]
+    scan = (time.perf_counter() - start) / len(scan_samples)
+
+    start = time.perf_counter()
+    results = [index.search(query) for query in workload]
+    indexed = (time.perf_counter() - start) / len(workload)
+
+    mismatches = sum(1 for query, want in zip(scan_samples, expected) if index.search(query) != want)
+    print(f"Base sintética: {len(violence_types)} tipos, {subtypes} subtipos, "
+          f"{len(index.vocabulary)} palavras distintas")
+    print(f"Construção do índice: {build * 1000:.1f} ms")
+    print(f"Varredura: {scan * 1000:8.3f} ms/consulta")
+    print(f"Índice:    {indexed * 1000:8.3f} ms/consulta ({scan / indexed:.0f}x)")
+    print(f"Resultados médios por consulta: {sum(map(len, results)) / len(results):.0f}")
+    print(f"Divergências: {mismatches} de {len(scan_samples)}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
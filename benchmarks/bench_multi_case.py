@@ -0,0 +1,69 @@
+"""
+Vazão do modo multi-caso contra o laço relato a relato.
+
+Para cada tamanho de lote, classifica o mesmo conjunto de palavras-chave
+(sorteado do KEYWORDS_DICT) de três formas: load_facts + run por relato,
+um único run multi-caso com a rede Rete e um único run multi-caso com o
+avaliador compilado. Confere que os três dão o mesmo resultado.
+
+Uso: python benchmarks/bench_multi_case.py [tamanhos...]   (padrão: 10 100 1000)
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+CATEGORIES = ["action_type", "frequency", "context", "target", "relationship", "impact"]
+
+
+def make_corpus(size, seed=0):
+    rng = random.Random(seed)
+    return {
+        index: {
+            category: rng.sample(KEYWORDS_DICT[category], rng.randint(1, 3))
+            for category in rng.sample(CATEGORIES, rng.randint(1, 6))
+        }
+        for index in range(size)
+    }
+
+
+def one_by_one(expert_system, corpus):
+    results = {}
+    for case_id, keywords in corpus.items():
+        expert_system.engine.load_facts(expert_system.text_processor.build_keyword_facts(keywords))
+        expert_system.engine.run()
+        results[case_id] = expert_system._collect_results()
+    return results
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes=(10, 100, 1000)):
+    rete = ExpertSystem(api_key="benchmark")
+    compiled = ExpertSystem(api_key="benchmark", engine="compiled")
+
+    print(f"{'relatos':>8}{'laço (rel/s)':>15}{'lote rete (rel/s)':>20}{'lote compilado (rel/s)':>25}")
+    for size in sizes:
+        corpus = make_corpus(size)
+        expected, loop_time = timed(one_by_one, rete, corpus)
+        rete_batch, rete_time = timed(rete.classify_batch, corpus)
+        compiled_batch, compiled_time = timed(compiled.classify_batch, corpus)
+        assert rete_batch == expected and compiled_batch == expected
+
+        print(f"{size:>8}{size / loop_time:>15.0f}{size / rete_time:>20.0f}{size / compiled_time:>25.0f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or (10, 100, 1000))
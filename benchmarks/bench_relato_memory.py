@@ -0,0 +1,97 @@
+"""
+Memória e tempo de declaração por análise para relatos longos.
+
+Compara declarar o texto bruto na memória de trabalho (TextRelato com o campo
+text, como antes) com declarar apenas o identificador do relato. Para cada
+tamanho de relato mede:
+
+- o tempo de criar e declarar os fatos de uma análise, com o relato
+  decodificado a cada requisição (string nova, hash ainda não calculado);
+- o tamanho dos valores guardados na memória de trabalho do motor;
+- o pico de alocação durante a declaração.
+
+Uso: python benchmarks/bench_relato_memory.py [repeticoes]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from experta import Fact, Field
+from engine.rules import ViolenceRules
+from engine.request_context import new_relato_id
+from engine.text_processor import TextProcessor
+
+KEYWORDS = {
+    "action_type": ["humilhacao", "pressao_tarefas"],
+    "target": ["genero"],
+    "context": ["local_trabalho"],
+}
+SIZES_KB = [1, 16, 128, 1024]
+
+
+class LegacyTextRelato(Fact):
+    text = Field(str, mandatory=True)
+    processed = Field(bool, default=False)
+
+
+def legacy_facts(processor, text):
+    facts = [LegacyTextRelato(text=text, processed=True)]
+    processor._add_keyword_facts(facts, KEYWORDS)
+    return facts
+
+
+def id_facts(processor, text):
+    return processor.build_facts(new_relato_id(), KEYWORDS)
+
+
+def measure_time(builder, processor, engine, payload, repeat):
+    elapsed = 0.0
+    for _ in range(repeat):
+        text = payload.decode("utf-8")
+        start = time.perf_counter()
+        engine.load_facts(builder(processor, text))
+        elapsed += time.perf_counter() - start
+    return elapsed / repeat * 1000
+
+
+def working_memory_kb(engine):
+    total = 0
+    for fact in engine.facts.values():
+        total += sum(sys.getsizeof(value) for value in fact.values())
+    return total / 1024
+
+
+def measure_memory(builder, processor, engine, payload):
+    text = payload.decode("utf-8")
+    engine.reset()
+    tracemalloc.start()
+    engine.load_facts(builder(processor, text))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return working_memory_kb(engine), peak / 1024
+
+
+def main(repeat=100):
+    processor = TextProcessor(api_key="benchmark")
+    engine = ViolenceRules()
+
+    print(f"{'relato':>8} | {'declarar (ms)':^17} | {'mem. trabalho (KB)':^19} | {'pico alocação (KB)':^19}")
+    print(f"{'':>8} | {'texto':>8}{'id':>9} | {'texto':>9}{'id':>10} | {'texto':>9}{'id':>10}")
+    for size in SIZES_KB:
+        payload = ("Relato de teste com acentuação. " * (size * 32)).encode("utf-8")
+        with contextlib.redirect_stdout(io.StringIO()):
+            legacy_ms = measure_time(legacy_facts, processor, engine, payload, repeat)
+            id_ms = measure_time(id_facts, processor, engine, payload, repeat)
+            legacy_wm, legacy_peak = measure_memory(legacy_facts, processor, engine, payload)
+            id_wm, id_peak = measure_memory(id_facts, processor, engine, payload)
+        print(f"{size:>6}KB | {legacy_ms:>8.3f}{id_ms:>9.3f} | {legacy_wm:>9.1f}{id_wm:>10.1f} | "
+              f"{legacy_peak:>9.1f}{id_peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
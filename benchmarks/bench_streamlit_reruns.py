@@ -0,0 +1,170 @@
+"""
+Custo por interação na interface Streamlit.
+
+Executa o main.py com o streamlit.testing (AppTest) e mede, para cada
+interação, o tempo de servidor (do início ao fim da execução do script) e o
+tamanho das mensagens enviadas ao navegador em dois casos: reexecutando o app
+inteiro, que era o que toda interação fazia, e reexecutando só o fragmento da
+tela, que é o que o navegador pede quando o widget está dentro de um
+st.fragment.
+
+O AppTest só faz execuções completas; a execução do fragmento é pedida ao
+ScriptRunner como o servidor faz (RerunData com fragment_id_queue), usando
+internals do streamlit.testing. O AppTest também cria um ScriptCache por
+execução e recompila o main.py a cada uma; aqui o cache é compartilhado, como
+no servidor, para que a compilação não entre na medida.
+
+Uso: python benchmarks/bench_streamlit_reruns.py [repetições]   (padrão: 20)
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData, ScriptRequests
+from streamlit.testing.v1 import app_test
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+
+from engine.analysis_job import AnalysisJob
+from engine.expert_system import ExpertSystem
+from utils.result_cards import card_key
+
+MAIN = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'main.py'))
+
+RELATO = "Um colega me segue pelo campus todos os dias e me ameaça quando estou sozinha."
+
+
+class MeasuredRunner(LocalScriptRunner):
+    """LocalScriptRunner que mede a execução e pode executar só um fragmento."""
+
+    fragment_id = None
+    last = None
+    script_cache = ScriptCache()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        MeasuredRunner.last = self
+        self._script_cache = self.script_cache
+        self.started = self.stopped = None
+        self.on_event.connect(self._time_event, weak=False)
+
+    def _time_event(self, sender, event, **kwargs):
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            self.started = time.perf_counter()
+        elif event.name.startswith(("SCRIPT_STOPPED", "FRAGMENT_STOPPED")):
+            self.stopped = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return self.stopped - self.started
+
+    @property
+    def payload(self):
+        return sum(message.ByteSize() for message in self.forward_msgs())
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        if self.fragment_id is None:
+            return super().run(widget_state, query_params, timeout, page_hash)
+        # O runner nasce com um pedido de execução completa; trocado pelo do fragmento
+        self._requests = ScriptRequests()
+        self.request_rerun(RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=[self.fragment_id],
+            is_fragment_scoped_rerun=True,
+        ))
+        try:
+            if not self._script_thread:
+                self.start()
+            require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def fragment_of(at, nested=False):
+    """Id do fragmento da tela (ou do fragmento aninhado nela)."""
+    storage = at._fragment_storage
+    for fragment_id in storage._fragments:
+        if (storage._parent_by_id.get(fragment_id) is not None) == nested:
+            return fragment_id
+    raise LookupError("fragmento não encontrado")
+
+
+def result_state(at):
+    expert_system = ExpertSystem(api_key="benchmark")
+    keywords = {"action_type": ["perseguicao", "ameaca"], "frequency": ["repetidamente"],
+                "context": ["espaco_publico_campus"], "impact": ["medo_inseguranca"]}
+    classifications = expert_system.classify_batch({"caso": keywords})["caso"]["classifications"]
+    at.session_state.state = "result"
+    at.session_state.results = classifications
+    at.session_state.card_keys = [card_key(c) for c in classifications]
+
+
+def follow_up_state(at):
+    at.session_state.state = "follow_up"
+    at.session_state.keywords = {"action_type": ["perseguicao"], "context": ["espaco_publico_campus"]}
+    at.session_state.questions = ["Com que frequência isso acontece?", "Como isso te afetou?"]
+
+
+def pending_job(at):
+    # Análise que não termina: cada execução do fragmento é uma consulta
+    job = AnalysisJob()
+    job.future = Future()
+    job.stage = "inferring"
+    at.session_state.analysis_job = job
+
+
+SCENARIOS = [
+    ("digitar o relato", None, lambda at: at.text_area[0].input(RELATO), False),
+    ("digitar a resposta", follow_up_state, lambda at: at.text_area[0].input("Toda semana, tenho medo."), False),
+    ("tela de resultados", result_state, None, False),
+    ("acompanhar a análise", pending_job, None, True),
+]
+
+
+def measure(setup, interact, nested, fragment, repeat):
+    at = app_test.AppTest.from_file(MAIN, default_timeout=30)
+    at.secrets["GROQ_API_KEY"] = "benchmark"
+    if setup is not None:
+        setup(at)
+    MeasuredRunner.fragment_id = None
+    at.run()
+    assert not at.exception, at.exception
+    if interact is not None:
+        interact(at)
+
+    MeasuredRunner.fragment_id = fragment_of(at, nested) if fragment else None
+    times, payloads = [], []
+    for _ in range(repeat):
+        at.run()
+        assert not at.exception, at.exception
+        times.append(MeasuredRunner.last.elapsed)
+        payloads.append(MeasuredRunner.last.payload)
+    MeasuredRunner.fragment_id = None
+    return statistics.median(times), statistics.median(payloads)
+
+
+def main(repeat=20):
+    app_test.LocalScriptRunner = MeasuredRunner
+
+    print(f"{'interação':<24}{'app inteiro':>22}{'só o fragmento':>22}")
+    for label, setup, interact, nested in SCENARIOS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            full = measure(setup, interact, nested, False, repeat)
+            fragment = measure(setup, interact, nested, True, repeat)
+        print(f"{label:<24}"
+              f"{full[0] * 1000:>10.1f} ms{full[1]:>8.0f} B"
+              f"{fragment[0] * 1000:>10.1f} ms{fragment[1]:>8.0f} B")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,145 @@
+"""
+Análises em segundo plano para a interface.
+
+A análise de um relato (Groq, motor de inferência e montagem dos cartões de
+resultado) roda em um executor compartilhado pelo processo; a página guarda o
+AnalysisJob na sessão e consulta o estágio atual sem bloquear o script.
+
+Cada sessão tem o seu ExpertSystem (main.py), então análises de sessões
+diferentes rodam em paralelo. A trava por sistema só serializa análises da
+mesma sessão (um job cancelado que ainda não terminou e o seguinte) e cobre
+apenas a inferência: a chamada ao Groq e os cartões não tocam a sessão e
+ficam fora dela.
+
+Cancelar libera a página na hora. Um job ainda na fila nem começa; um job em
+andamento para na próxima troca de estágio, antes de pegar a trava e de
+alterar a sessão do sistema especialista. A chamada ao Groq usa a sessão HTTP
+do job (AbortableSession), e cancelar a fecha: a requisição em andamento é
+interrompida e o processo de trabalho fica livre sem esperar o Groq.
+"""
+import os
+import threading
+import weakref
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from knowledge_base.versioning import pinned
+from utils.groq_integration import AbortableSession
+from utils.result_cards import card_key, get_card
+
+# Estágios na ordem em que acontecem
+STAGES = ("extracting", "inferring", "rendering")
+
+# Análises simultâneas no processo; as demais esperam na fila. Uma análise
+# passa quase todo o tempo esperando o Groq, então o executor tem bem mais
+# threads que núcleos (as threads só são criadas quando há trabalho)
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", min(32, (os.cpu_count() or 1) * 5)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Um sistema especialista guarda a sessão e o motor: uma inferência por vez
+_system_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class AnalysisCancelled(Exception):
+    """A análise foi cancelada antes de terminar."""
+
+
+class AnalysisJob:
+    """Análise submetida ao executor: estágio atual, cancelamento e resultado."""
+
+    def __init__(self):
+        self.stage = "queued"
+        self.future: Optional[Future] = None
+        self.http = AbortableSession()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fração dos estágios já concluídos."""
+        if self.stage not in STAGES:
+            return 0.0
+        return STAGES.index(self.stage) / len(STAGES)
+
+    def enter_stage(self, stage: str):
+        # Chamado pela própria análise: é aqui que o cancelamento a interrompe
+        if self.cancelled:
+            raise AnalysisCancelled()
+        self.stage = stage
+
+    def cancel(self):
+        self._cancelled.set()
+        self.future.cancel()
+        # Interrompe a chamada ao Groq em andamento
+        self.http.close()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Dict[str, Any]:
+        """Resultado da análise; AnalysisCancelled se foi cancelada."""
+        if self.cancelled:
+            raise AnalysisCancelled()
+        try:
+            return self.future.result()
+        except CancelledError:
+            raise AnalysisCancelled()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analise")
+        return _executor
+
+
+def _lock_for(expert_system) -> threading.Lock:
+    with _executor_lock:
+        return _system_locks.setdefault(expert_system, threading.Lock())
+
+
+def _run(job: AnalysisJob, expert_system, text: str, follow_up: bool,
+         session_token: Optional[str]) -> Dict[str, Any]:
+    # A mesma versão da base da extração aos cartões
+    with pinned(), job.http:
+        job.enter_stage("extracting")
+        keywords = expert_system.text_processor.extract_keywords(text, http=job.http)
+
+        job.enter_stage("inferring")
+        with _lock_for(expert_system):
+            if follow_up:
+                # A sessão vem do token, então qualquer processo pode atender o
+                # follow-up; o sistema que já a tem segue com o motor incremental
+                if session_token and not expert_system.holds_session(session_token):
+                    expert_system.restore_session(session_token)
+                result = expert_system.analyze_follow_up_keywords(keywords)
+            else:
+                result = expert_system.analyze_keywords(keywords)
+
+            outcome = {
+                "classifications": result["classifications"],
+                "keywords": expert_system.session_keywords,
+                "session_token": expert_system.export_session(),
+            }
+
+        # Os cartões não dependem da sessão
+        job.enter_stage("rendering")
+        classifications = outcome["classifications"]
+        outcome["card_keys"] = [card_key(classification, expert_system.institution)
+                                for classification in classifications]
+        for key, classification in zip(outcome["card_keys"], classifications):
+            get_card(key, classification)
+        return outcome
+
+def submit_analysis(expert_system, text: str, follow_up: bool = False,
+                    session_token: Optional[str] = None) -> AnalysisJob:
+    """Submete a análise do relato (ou da resposta de follow-up) ao executor."""
+    job = AnalysisJob()
+    job.future = get_executor().submit(_run, job, expert_system, text, follow_up, session_token)
+    return job
@@ -1,60 +1,387 @@
-from typing import Dict, Any
-from .rules import ViolenceRules
+import base64
+import hashlib
+import inspect
+from typing import Callable, Dict, Any, Optional
+from .rules import ViolenceRules, multi_case, rule_compiler
+from .rules.rule_compiler import compile_engine
+from .rules.multi_case import make_multi_case_engine
 from .text_processor import TextProcessor
-from .facts import AnalysisResult, ViolenceClassification
+from .result_cache import ResultCache
+from .replay import ReplayJournal
+from .request_context import new_relato_id
+from .snapshot import decode_snapshot, pending_snapshot, record_to_fact
+from .facts import AnalysisResult, ViolenceClassification, KeywordFact, TextRelato
+from knowledge_base.fingerprint import combine_fingerprints, get_fingerprints
+from knowledge_base.institutions import DEFAULT_INSTITUTION, INSTITUTIONS
+from knowledge_base.versioning import active_version, pinned
+
+
+def _ignore_stage(stage: str):
+    pass
+
+
+def compute_rule_base_version() -> str:
+    """
+    Versão da base de regras derivada do código-fonte do que decide os
+    resultados: as classes de regras, a estratégia que ordena as ativações
+    (SeverityStrategy) e os módulos que montam os motores compilado e
+    multi-caso a partir delas.
+    """
+    digest = hashlib.sha1()
+    for cls in ViolenceRules.__mro__:
+        if cls.__module__.startswith(ViolenceRules.__module__.rsplit(".", 1)[0]):
+            digest.update(inspect.getsource(cls).encode("utf-8"))
+    digest.update(inspect.getsource(ViolenceRules.__strategy__).encode("utf-8"))
+    for module in (rule_compiler, multi_case):
+        digest.update(inspect.getsource(module).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
 
 class ExpertSystem:
     """Sistema especialista que conecta processador de texto e motor de regras."""
     
-    def __init__(self, api_key=None):
-        """Inicializa o sistema com processador de texto e motor de regras."""
+    def __init__(self, api_key=None, cache_size: int = 256, engine: str = "experta",
+                 institution: str = DEFAULT_INSTITUTION, result_cache: Optional[ResultCache] = None):
+        """
+        Inicializa o sistema com processador de texto e motor de regras.
+
+        engine escolhe o casamento de padrões: "experta" usa a rede Rete e
+        "compiled" usa o avaliador gerado a partir das mesmas regras.
+
+        institution escolhe a sobreposição da base (knowledge_base/institutions.py)
+        usada no ranking, na gravidade e nas impressões digitais dos resultados.
+
+        result_cache permite compartilhar o cache de classificações entre
+        sistemas (um por sessão); a chave inclui a impressão digital da base da
+        instituição e das regras. Sem ele, o sistema cria um com cache_size.
+        """
+        if institution not in INSTITUTIONS:
+            raise ValueError(f"Instituição desconhecida: {institution}")
+        self.institution = institution
         self.text_processor = TextProcessor(api_key=api_key)
-        self.engine = ViolenceRules()
+        if engine == "experta":
+            self.engine = ViolenceRules()
+        elif engine == "compiled":
+            self.engine = compile_engine(ViolenceRules)()
+        else:
+            raise ValueError(f"Motor desconhecido: {engine}")
+        self.engine.institution = institution
+        self.rule_base_version = compute_rule_base_version()
+        self.result_cache = result_cache if result_cache is not None else ResultCache(maxsize=cache_size)
+        self._result_fingerprint = None
+        self._fingerprints = None
+        self.session_keywords = {}
+        self._session_relato_id = None
+        self._session_active = False
+        self._engine_loaded = False
+        self._pending_snapshot = None
+        # Token que descreve a sessão atual (exportado ou importado e não alterado desde então)
+        self._session_token = None
+        self._batch_engine = None
+        # Quando definido, cada análise completa é gravada no diário de replay (engine/replay.py)
+        self.history: ReplayJournal = None
     
-    def analyze_text(self, text: str) -> Dict[str, Any]:
+    @pinned()
+    def analyze_text(self, text: str, top_k: int = None,
+                     on_stage: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Analisa um texto livre e retorna resultados estruturados.
+
+        Com top_k (triagem rápida), o motor para assim que as top_k
+        classificações mais graves estiverem estabelecidas. Esses resultados
+        parciais não passam pelo cache de classificações.
+
+        A análise inteira usa a versão da base de conhecimento ativa no
+        início, mesmo que uma recarga publique outra no meio do caminho.
+
+        on_stage é chamado com "extracting" antes da consulta ao Groq e com
+        "inferring" antes de alterar a sessão; uma exceção lançada por ele
+        interrompe a análise com a sessão anterior intacta.
         """
-        # 1. Reiniciar o motor para garantir um estado limpo
-        self.engine.reset()
-        
-        # 2. Processar texto e obter fatos compatíveis com Experta
-        facts = self.text_processor.create_experta_facts(text)
-        
-        # 3. Inserir fatos no motor
-        for fact in facts:
-            self.engine.declare(fact)
+        on_stage = on_stage or _ignore_stage
+
+        # 1. Processar texto e obter as palavras-chave do relato
+        on_stage("extracting")
+        keywords = self.text_processor.extract_keywords(text)
+        on_stage("inferring")
+        return self.analyze_keywords(keywords, top_k=top_k)
+
+    @pinned()
+    def analyze_keywords(self, keywords: Dict, top_k: int = None) -> Dict[str, Any]:
+        """
+        analyze_text a partir de palavras-chave já extraídas: inicia a sessão e
+        classifica. A consulta ao Groq não toca a sessão, então pode ser feita
+        antes, fora de qualquer trava (engine/analysis_job.py).
+        """
+        self.session_keywords = keywords
+        self._session_relato_id = new_relato_id()
+        self._session_active = True
+        self._pending_snapshot = None
+        self._session_token = None
+
+        if top_k is not None:
+            return self._run_full_analysis(self._session_relato_id, keywords, top_k=top_k)
+
+        # 2. Conjuntos de fatos já classificados não precisam passar pelo motor
+        cache_key = self._cache_key(keywords)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            print("Resultado recuperado do cache de classificações")
+            self._engine_loaded = False
+            self._record_history(keywords, cached)
+            return cached
+
+        results = self._run_full_analysis(self._session_relato_id, keywords)
+        self.result_cache.put(cache_key, results)
+        self._record_history(keywords, results)
+        return results
+
+    def _run_full_analysis(self, relato_id: str, keywords: Dict, top_k: int = None) -> Dict[str, Any]:
+        facts = self.text_processor.build_facts(relato_id, keywords)
+
+        # 1. Reiniciar o motor em estado limpo e inserir os fatos em lote
+        self.engine.load_facts(facts)
         
-        # 4. Executar o método de debug para verificar fatos
+        # 2. Executar o método de debug para verificar fatos
         self.engine.debug_facts()
         
-        # 5. Executar o motor (que já consolida os resultados no final)
-        self.engine.run()
-        
-        # 6. Coletar resultados
-        results = self._collect_results()
+        # 3. Executar o motor (que já consolida os resultados no final)
+        self.engine.run(top_k=top_k)
         
+        # 4. Coletar resultados
+        self._engine_loaded = True
+        return self._collect_results()
+
+    @pinned()
+    def analyze_follow_up(self, text: str,
+                          on_stage: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Complementa a análise da sessão atual com a resposta de follow-up.
+
+        Mantém a memória de trabalho do relato original, extrai palavras-chave
+        apenas do texto novo e declara somente os fatos inéditos, deixando a
+        rede Rete propagar o delta de forma incremental. on_stage como em
+        analyze_text.
+        """
+        if not self._session_active:
+            return self.analyze_text(text, on_stage=on_stage)
+        on_stage = on_stage or _ignore_stage
+
+        on_stage("extracting")
+        new_keywords = self.text_processor.extract_keywords(text)
+        on_stage("inferring")
+        return self.analyze_follow_up_keywords(new_keywords)
+
+    @pinned()
+    def analyze_follow_up_keywords(self, new_keywords: Dict) -> Dict[str, Any]:
+        """analyze_follow_up a partir das palavras-chave já extraídas da resposta."""
+        if not self._session_active:
+            return self.analyze_keywords(new_keywords)
+
+        follow_up = self.text_processor.merge_followup(new_keywords, self.session_keywords)
+        self.session_keywords = follow_up["identified_keywords"]
+        self._session_token = None
+
+        cache_key = self._cache_key(self.session_keywords)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            print("Resultado recuperado do cache de classificações")
+            self._engine_loaded = False
+            self._pending_snapshot = None
+            self._record_history(self.session_keywords, cached)
+            return cached
+
+        if not self._engine_loaded and self._pending_snapshot is not None:
+            # Sessão importada de outro processo: restaurar a memória de trabalho agora
+            self.engine.restore(self._pending_snapshot)
+            self._pending_snapshot = None
+            self._engine_loaded = True
+
+        if not self._engine_loaded:
+            # A análise anterior veio do cache: carregar a sessão completa no motor
+            results = self._run_full_analysis(self._session_relato_id, self.session_keywords)
+        else:
+            if follow_up["facts"]:
+                self.engine.declare(*follow_up["facts"])
+
+            self.engine.debug_facts()
+            self.engine.run()
+            results = self._collect_results()
+
+        self.result_cache.put(cache_key, results)
+        self._record_history(self.session_keywords, results)
+        return results
+
+    @pinned()
+    def classify_batch(self, keywords_by_case: Dict[Any, Dict]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Classifica muitos relatos já extraídos em um único run do motor.
+
+        keywords_by_case mapeia um identificador de caso às palavras-chave do
+        relato, como dicionário por categoria ou como sequência de IDs do
+        vocabulário (KeywordVocabulary.encode); o resultado de cada caso tem o
+        mesmo formato de analyze_text. Não usa o Groq nem altera a sessão atual.
+        """
+        if self._batch_engine is None:
+            self._batch_engine = make_multi_case_engine(type(self.engine))()
+            self._batch_engine.institution = self.institution
+
+        vocabulary = active_version().vocabulary
+        self._batch_engine.load_cases({
+            case_id: self.text_processor.build_keyword_facts(
+                keywords if isinstance(keywords, dict) else vocabulary.decode(keywords)
+            )
+            for case_id, keywords in keywords_by_case.items()
+        })
+        results = self._batch_engine.run_cases()
+        fingerprint = self.fingerprints["combined"]
+        for case_results in results.values():
+            case_results["fingerprint"] = fingerprint
         return results
 
+    def reset_session(self):
+        """Descarta a sessão atual e a memória de trabalho do motor."""
+        self.engine.reset()
+        self.session_keywords = {}
+        self._session_relato_id = None
+        self._session_active = False
+        self._engine_loaded = False
+        self._pending_snapshot = None
+        self._session_token = None
+
+    @pinned()
+    def export_session(self) -> str:
+        """
+        Exporta a sessão atual como um token compacto (base64 URL-safe).
+
+        O token contém o snapshot da memória de trabalho do motor, assinado
+        (engine/snapshot.py), e pode ser importado com restore_session em
+        qualquer réplica que use o mesmo SESSION_SECRET. O texto do relato não
+        faz parte do token.
+
+        Se o resultado veio do cache, o motor não tem a sessão carregada: o
+        token leva só os fatos de entrada, e as regras disparam no motor que
+        receber o follow-up.
+        """
+        if not self._session_active:
+            raise ValueError("Nenhuma sessão ativa para exportar")
+
+        if self._pending_snapshot is not None:
+            blob = self._pending_snapshot
+        elif self._engine_loaded:
+            blob = self.engine.snapshot()
+        else:
+            blob = pending_snapshot(
+                self.text_processor.build_facts(self._session_relato_id, self.session_keywords)
+            )
+        self._session_token = base64.urlsafe_b64encode(blob).decode("ascii")
+        return self._session_token
+
+    def holds_session(self, token: str) -> bool:
+        """
+        True se a sessão atual é a descrita pelo token: foi exportada ou
+        importada aqui e não mudou desde então. Nesse caso restore_session só
+        jogaria fora a memória de trabalho já carregada no motor.
+        """
+        return self._session_active and token == self._session_token
+
+    def restore_session(self, token: str):
+        """
+        Importa uma sessão exportada por export_session.
+
+        Apenas decodifica o token: a memória de trabalho só é reconstruída no
+        motor quando um follow-up precisar dela. Um token com assinatura
+        inválida é recusado com ValueError.
+        """
+        blob = base64.urlsafe_b64decode(token.encode("ascii"))
+        payload = decode_snapshot(blob)
+
+        keywords = {}
+        relato_id = None
+        for record in payload["facts"]:
+            fact = record_to_fact(record)
+            if isinstance(fact, KeywordFact):
+                keywords.setdefault(fact["category"], []).append(fact["keyword"])
+            elif isinstance(fact, TextRelato):
+                relato_id = fact["relato_id"]
+
+        self.session_keywords = keywords
+        self._session_relato_id = relato_id
+        self._session_active = True
+        self._engine_loaded = False
+        self._pending_snapshot = blob
+        self._session_token = token
+
+    def _record_history(self, keywords: Dict, results: Dict[str, Any]):
+        if self.history is not None:
+            self.history.append(keywords, results["classifications"],
+                                case_id=self._session_relato_id,
+                                rule_base_version=self.rule_base_version)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache de classificações (acertos, falhas, taxa, tamanho)."""
+        return self.result_cache.stats()
+
+    def _cache_key(self, keywords: Dict):
+        # Pares do vocabulário entram como IDs inteiros; a versão cobre o dicionário
+        version = self._result_version()
+        return ResultCache.keywords_key(keywords, version, active_version().vocabulary.ids)
+
+    def _result_version(self) -> str:
+        """
+        Impressão digital combinada das regras e da base de conhecimento ativa.
+
+        Quando o conteúdo muda, os resultados calculados com o anterior são
+        descartados; os outros caches do sistema não são afetados.
+        """
+        fingerprint = self.fingerprints["combined"]
+        if fingerprint != self._result_fingerprint:
+            if self._result_fingerprint is not None:
+                self.result_cache.clear()
+            self._result_fingerprint = fingerprint
+        return fingerprint
+
+    @property
+    def fingerprints(self) -> Dict[str, str]:
+        """
+        Impressões digitais do conteúdo usado nas análises: uma por componente
+        da base ativa vista pela instituição (knowledge_base/fingerprint.py), a
+        da base de regras em "rules" e a combinada em "combined", gravada em
+        cada resultado.
+        """
+        knowledge_base = get_fingerprints(self.institution)
+        if self._fingerprints is None or self._fingerprints[0] is not knowledge_base:
+            fingerprints = dict(knowledge_base, rules=self.rule_base_version)
+            fingerprints["combined"] = combine_fingerprints({
+                "knowledge_base": knowledge_base["knowledge_base"],
+                "rules": self.rule_base_version
+            })
+            self._fingerprints = (knowledge_base, fingerprints)
+        return dict(self._fingerprints[1])
+
     def _collect_results(self) -> Dict[str, Any]:
         """Coleta resultados do motor após execução."""
         results = {
             "classifications": [],
             "primary_result": {"violence_type": "", "subtype": ""},
-            "multiple_types": False
+            "multiple_types": False,
+            # Identifica as regras e a base que produziram o resultado
+            "fingerprint": self.fingerprints["combined"]
         }
         
         # Buscar resultado da análise
         for fact in self.engine.facts.values():
             if isinstance(fact, AnalysisResult):
-                results["classifications"] = getattr(fact, "classifications", [])
+                # Fatos do Experta são dicionários congelados: ler os campos como chaves
+                data = fact.as_dict()
+                results["classifications"] = data.get("classifications", [])
                 
                 # Atualizar primary_result se disponível
-                primary_result = getattr(fact, "primary_result", None)
+                primary_result = data.get("primary_result")
                 if primary_result is not None:
                     results["primary_result"] = primary_result
                 
-                results["multiple_types"] = getattr(fact, "multiple_types", False)
+                results["multiple_types"] = data.get("multiple_types", False)
                 break
         
         # Se não encontrou AnalysisResult ou classifications está vazio, busque diretamente ViolenceClassification
@@ -1,11 +1,16 @@
 from experta import Fact, Field
-from knowledge_base.violence_types import VIOLENCE_TYPES, SEVERITY_LEVEL, REPORT_CONTACT
-import streamlit as st
+from knowledge_base.violence_types import SEVERITY_LEVEL
+from knowledge_base.guidance import get_guidance, get_guidance_table
+from knowledge_base.institutions import DEFAULT_INSTITUTION
+from knowledge_base.violence_manager import get_report_contact
+
+# As funções de exibição importam o streamlit só quando chamadas: o motor, os
+# testes e os processos de replay usam os fatos sem carregar a interface.
 
 ### Fatos de Entrada ###
 
 class TextRelato(Fact):
-    text = Field(str, mandatory=True)
+    relato_id = Field(str, mandatory=True)      # O texto bruto não é guardado
     processed = Field(bool, default=False)
 
 class KeywordFact(Fact):
@@ -54,49 +59,49 @@ class ProcessingPhase(Fact):
     """Controla a fase de processamento do motor de inferência."""
     phase = Field(str, mandatory=True)  # 'collection', 'analysis'
 
-def print_information(violence_type, subtype=None):
-    info = VIOLENCE_TYPES.get(violence_type)
-    if not info:
+def print_information(violence_type, subtype=None, institution=DEFAULT_INSTITUTION):
+    import streamlit as st
+
+    if (violence_type, "") not in get_guidance_table(institution):
         st.warning("Informações adicionais não disponíveis.")
         return
 
-    title, definition = _get_title_and_definition(info, violence_type, subtype)
+    guidance = get_guidance(violence_type, subtype, institution)
+    title = violence_type.replace('_', ' ').title()
+    if guidance.subtype:
+        title += f" - {guidance.subtype.replace('_', ' ').title()}"
     st.markdown(f"### ✅ {title}")
-    st.markdown(f"**Definição:** {definition}")
+    st.markdown(f"**Definição:** {guidance.definition}")
 
-    _print_severity(info)
-    _print_contacts(info)
-    _print_recommendations(info)
+    # Gravidade, canais e recomendações exibidos são os do tipo
+    type_guidance = get_guidance(violence_type, institution=institution)
+    _print_severity(type_guidance.severity)
+    _print_contacts(type_guidance.reporting_channels, institution)
+    _print_recommendations(type_guidance.recommendations)
+
+def _print_severity(severity):
+    import streamlit as st
 
-def _get_title_and_definition(info, violence_type, subtype):
-    title = violence_type.replace('_', ' ').title()
-    if subtype and subtype in info.get('subtipos', {}):
-        subtype_info = info['subtipos'][subtype]
-        title += f" - {subtype.replace('_', ' ').title()}"
-        definition = subtype_info.get('definicao', info.get('definicao', ''))
-    else:
-        definition = info.get('definicao', '')
-    return title, definition
-
-def _print_severity(info):
-    severity = info.get('gravidade')
     if severity:
         st.markdown(f"**Gravidade:** {SEVERITY_LEVEL.get(severity, '')}")
 
-def _print_contacts(info):
-    contacts = info.get("canais_denuncia", [])
+def _print_contacts(contacts, institution):
+    import streamlit as st
+
     if contacts:
         st.markdown("**Canais de denúncia:**")
+        report_contact = get_report_contact(institution)
         for contact in contacts:
-            contact_info = REPORT_CONTACT.get(contact)
+            contact_info = report_contact.get(contact)
             if contact_info:
                 st.markdown(f"- **{contact}**: {contact_info.get('descricao')}")
                 if "contato" in contact_info:
                     st.markdown(f"  📧 Contato: `{contact_info['contato']}`")
                 st.markdown(f"  📌 Procedimento: {contact_info.get('procedimento')}")
 
-def _print_recommendations(info):
-    recommendations = info.get("recomendacoes", [])
+def _print_recommendations(recommendations):
+    import streamlit as st
+
     if recommendations:
         st.markdown("**Recomendações:**")
         for r in recommendations:
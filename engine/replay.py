@@ -0,0 +1,376 @@
+"""
+Replay "e se": reclassifica análises históricas com uma base de regras candidata.
+
+O histórico guarda, por análise, as palavras-chave extraídas pelo Groq e as
+classificações obtidas na época, em um arquivo colunar compacto: vocabulários
+de pares (categoria, palavra-chave) e (tipo, subtipo) mais quatro colunas de
+inteiros (deslocamentos e códigos, como uma matriz esparsa CSR). Reexecutar o
+histórico não chama o Groq: os casos são divididos em blocos e classificados
+em processos paralelos pelo motor multi-caso compilado da regra candidata.
+
+Formato: b"VLR" + versão (1 byte) + tamanho do cabeçalho (uint32 LE) +
+cabeçalho JSON compactado com zlib + colunas uint32 LE compactadas com zlib.
+
+O app grava o histórico em um diário (ReplayJournal): uma linha JSON por
+análise, só por acréscimo, que ReplayLog.load também lê.
+
+As classificações gravadas só servem de referência se vieram da base de regras
+atual; do contrário a diferença misturaria a candidata com as mudanças já
+publicadas. Nesse caso o replay recusa o histórico, ou reclassifica a
+referência com a base atual quando chamado com --rebaseline.
+
+Uso: python -m engine.replay historico.vlr [--candidate modulo:Classe] [--workers N] [--json] [--rebaseline]
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from multiprocessing import Pool
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .rules.multi_case import make_multi_case_engine
+from .rules.rule_compiler import UnsupportedRuleError, compile_engine
+from .text_processor import TextProcessor
+
+REPLAY_MAGIC = b"VLR"
+REPLAY_VERSION = 1
+DEFAULT_CANDIDATE = "engine.rules:ViolenceRules"
+
+Pair = Tuple[str, str]
+
+
+def _column(values: List[int]) -> bytes:
+    column = array("I", values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(data: bytes, start: int, length: int) -> Tuple[array, int]:
+    column = array("I")
+    end = start + length * column.itemsize
+    column.frombytes(data[start:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+
+def _pairs_to_keywords(pairs) -> Dict[str, List[str]]:
+    keywords: Dict[str, List[str]] = {}
+    for category, keyword in pairs:
+        keywords.setdefault(category, []).append(keyword)
+    return keywords
+
+
+class ReplayLog:
+    """Histórico de análises: palavras-chave extraídas e classificações obtidas."""
+
+    def __init__(self, rule_base_version: str = ""):
+        self.rule_base_version = rule_base_version
+        self.case_ids: List[Hashable] = []
+        self.keywords: List[Tuple[Pair, ...]] = []
+        self.classifications: List[Tuple[Pair, ...]] = []
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def append(self, keywords: Dict[str, List[str]], classifications: List[Dict],
+               case_id: Optional[Hashable] = None):
+        """Registra uma análise; classifications na ordem do ranking (principal primeiro)."""
+        self.case_ids.append(case_id if case_id is not None else len(self.case_ids))
+        self.keywords.append(tuple(
+            (category, keyword)
+            for category, values in keywords.items()
+            for keyword in values
+        ))
+        self.classifications.append(tuple(
+            (item["violence_type"], item.get("subtype") or "")
+            for item in classifications
+        ))
+
+    def keywords_of(self, index: int) -> Dict[str, List[str]]:
+        return _pairs_to_keywords(self.keywords[index])
+
+    def encode(self) -> bytes:
+        keyword_vocabulary: Dict[Pair, int] = {}
+        class_vocabulary: Dict[Pair, int] = {}
+        keyword_offsets, keyword_codes = [0], []
+        class_offsets, class_codes = [0], []
+
+        for pairs, classes in zip(self.keywords, self.classifications):
+            keyword_codes.extend(keyword_vocabulary.setdefault(pair, len(keyword_vocabulary)) for pair in pairs)
+            keyword_offsets.append(len(keyword_codes))
+            class_codes.extend(class_vocabulary.setdefault(pair, len(class_vocabulary)) for pair in classes)
+            class_offsets.append(len(class_codes))
+
+        header = json.dumps({
+            "rule_base_version": self.rule_base_version,
+            "case_ids": self.case_ids,
+            "keywords": list(keyword_vocabulary),
+            "classes": list(class_vocabulary),
+            "keyword_count": len(keyword_codes),
+            "class_count": len(class_codes)
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        header = zlib.compress(header, 6)
+        columns = zlib.compress(
+            _column(keyword_offsets) + _column(keyword_codes)
+            + _column(class_offsets) + _column(class_codes), 6
+        )
+        return REPLAY_MAGIC + struct.pack("<BI", REPLAY_VERSION, len(header)) + header + columns
+
+    @classmethod
+    def decode(cls, blob: bytes) -> "ReplayLog":
+        if blob[:3] != REPLAY_MAGIC:
+            raise ValueError("Histórico inválido: cabeçalho desconhecido")
+        version, header_size = struct.unpack_from("<BI", blob, 3)
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Versão de histórico não suportada: {version}")
+
+        start = 3 + struct.calcsize("<BI")
+        header = json.loads(zlib.decompress(blob[start:start + header_size]).decode("utf-8"))
+        data = zlib.decompress(blob[start + header_size:])
+
+        cases = len(header["case_ids"])
+        keyword_offsets, position = _read_column(data, 0, cases + 1)
+        keyword_codes, position = _read_column(data, position, header["keyword_count"])
+        class_offsets, position = _read_column(data, position, cases + 1)
+        class_codes, _ = _read_column(data, position, header["class_count"])
+
+        keyword_vocabulary = [tuple(pair) for pair in header["keywords"]]
+        class_vocabulary = [tuple(pair) for pair in header["classes"]]
+
+        log = cls(header["rule_base_version"])
+        log.case_ids = header["case_ids"]
+        log.keywords = [
+            tuple(keyword_vocabulary[code] for code in keyword_codes[keyword_offsets[i]:keyword_offsets[i + 1]])
+            for i in range(cases)
+        ]
+        log.classifications = [
+            tuple(class_vocabulary[code] for code in class_codes[class_offsets[i]:class_offsets[i + 1]])
+            for i in range(cases)
+        ]
+        return log
+
+    @classmethod
+    def from_journal(cls, lines) -> "ReplayLog":
+        """
+        Histórico a partir das linhas de um ReplayJournal. Cada relato fica com
+        a sua análise mais recente (a do follow-up substitui a inicial). Se as
+        análises vierem de bases de regras diferentes, rule_base_version fica
+        vazio e o replay exige --rebaseline.
+        """
+        records: Dict[Hashable, Dict[str, Any]] = {}
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                records.pop(record["case_id"], None)
+                records[record["case_id"]] = record
+
+        versions = {record["rule_base_version"] for record in records.values()}
+        log = cls(versions.pop() if len(versions) == 1 else "")
+        for case_id, record in records.items():
+            log.case_ids.append(case_id)
+            log.keywords.append(tuple(tuple(pair) for pair in record["keywords"]))
+            log.classifications.append(tuple(tuple(pair) for pair in record["classifications"]))
+        return log
+
+    def save(self, path: str):
+        with open(path, "wb") as output:
+            output.write(self.encode())
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayLog":
+        """Lê um arquivo .vlr ou um diário gravado por ReplayJournal."""
+        with open(path, "rb") as source:
+            blob = source.read()
+        if blob[:3] == REPLAY_MAGIC:
+            return cls.decode(blob)
+        return cls.from_journal(blob.decode("utf-8").splitlines())
+
+
+class ReplayJournal:
+    """
+    Histórico do processo gravado em disco, só por acréscimo: uma linha JSON por
+    análise com o id do relato, a versão da base de regras, as palavras-chave
+    e as classificações. O texto do relato não é gravado.
+
+    Cada linha vai para o arquivo em uma única escrita com O_APPEND, então
+    sessões e réplicas podem gravar no mesmo arquivo sem se intercalar.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+
+    def append(self, keywords: Dict[str, List[str]], classifications: List[Dict],
+               case_id: Hashable, rule_base_version: str):
+        record = json.dumps({
+            "case_id": case_id,
+            "rule_base_version": rule_base_version,
+            "keywords": [
+                [category, keyword]
+                for category, values in keywords.items()
+                for keyword in values
+            ],
+            "classifications": [
+                [item["violence_type"], item.get("subtype") or ""]
+                for item in classifications
+            ]
+        }, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, record.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+def load_engine_class(spec: str):
+    """Importa a base de regras candidata a partir de "modulo:Classe"."""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name or "ViolenceRules")
+
+
+def build_batch_engine(engine_class):
+    """Motor multi-caso compilado; volta à rede Rete se a regra não for compilável."""
+    try:
+        return make_multi_case_engine(compile_engine(engine_class))()
+    except UnsupportedRuleError:
+        return make_multi_case_engine(engine_class)()
+
+
+# Estado de cada processo de trabalho, montado uma vez por _init_worker
+_worker_engine = None
+_worker_processor = None
+
+
+def _init_worker(candidate: str):
+    global _worker_engine, _worker_processor
+    _worker_engine = build_batch_engine(load_engine_class(candidate))
+    _worker_processor = TextProcessor(api_key="replay")
+
+
+def _classify_chunk(chunk: List[Tuple[int, Tuple[Pair, ...]]]) -> List[Tuple[int, Tuple[Pair, ...]]]:
+    cases = {
+        index: _worker_processor.build_keyword_facts(_pairs_to_keywords(pairs))
+        for index, pairs in chunk
+    }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_engine.load_cases(cases)
+        results = _worker_engine.run_cases()
+
+    return [
+        (index, tuple((item["violence_type"], item["subtype"]) for item in result["classifications"]))
+        for index, result in results.items()
+    ]
+
+
+def replay(log: ReplayLog, candidate: str = DEFAULT_CANDIDATE,
+           workers: Optional[int] = None, chunk_size: int = 500) -> List[Tuple[Pair, ...]]:
+    """Classifica todos os casos do histórico com a base candidata, em paralelo."""
+    chunks = [
+        [(index, log.keywords[index]) for index in range(start, min(start + chunk_size, len(log)))]
+        for start in range(0, len(log), chunk_size)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(candidate)
+        outputs = [_classify_chunk(chunk) for chunk in chunks]
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=(candidate,)) as pool:
+            outputs = pool.map(_classify_chunk, chunks)
+
+    results: List[Tuple[Pair, ...]] = [()] * len(log)
+    for output in outputs:
+        for index, classes in output:
+            results[index] = classes
+    return results
+
+
+def diff_results(log: ReplayLog, results: List[Tuple[Pair, ...]]) -> List[Dict[str, Any]]:
+    """
+    Casos cuja classificação mudou: tipos adicionados, removidos e principal.
+    Só a ordem dos tipos secundários mudar não conta como mudança.
+    """
+    changes = []
+    for index, (before, after) in enumerate(zip(log.classifications, results)):
+        if set(before) == set(after) and before[:1] == after[:1]:
+            continue
+        changes.append({
+            "case_id": log.case_ids[index],
+            "added": [list(pair) for pair in after if pair not in before],
+            "removed": [list(pair) for pair in before if pair not in after],
+            "primary_before": list(before[0]) if before else None,
+            "primary_after": list(after[0]) if after else None
+        })
+    return changes
+
+
+def _format_pair(pair) -> str:
+    if not pair:
+        return "-"
+    violence_type, subtype = pair
+    return f"{violence_type}/{subtype}" if subtype else violence_type
+
+
+def format_diff(changes: List[Dict[str, Any]], total: int) -> str:
+    lines = [f"{len(changes)} de {total} casos mudariam de classificação"]
+    for change in changes:
+        parts = []
+        if change["added"]:
+            parts.append("+ " + ", ".join(_format_pair(pair) for pair in change["added"]))
+        if change["removed"]:
+            parts.append("- " + ", ".join(_format_pair(pair) for pair in change["removed"]))
+        if change["primary_before"] != change["primary_after"]:
+            parts.append(f"principal: {_format_pair(change['primary_before'])} → "
+                         f"{_format_pair(change['primary_after'])}")
+        lines.append(f"   • {change['case_id']}: {' | '.join(parts)}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reclassifica o histórico com uma base de regras candidata.")
+    parser.add_argument("history", help="arquivo de histórico (.vlr)")
+    parser.add_argument("--candidate", default=DEFAULT_CANDIDATE, help="base de regras, no formato modulo:Classe")
+    parser.add_argument("--workers", type=int, default=None, help="processos paralelos (padrão: núcleos)")
+    parser.add_argument("--json", action="store_true", help="imprime a diferença em JSON")
+    parser.add_argument("--rebaseline", action="store_true",
+                        help="reclassifica a referência com a base atual se o histórico veio de outra")
+    args = parser.parse_args(argv)
+
+    from .expert_system import compute_rule_base_version
+
+    log = ReplayLog.load(args.history)
+    start = time.perf_counter()
+    current = compute_rule_base_version()
+    if log.rule_base_version != current:
+        if not args.rebaseline:
+            parser.error(
+                f"o histórico foi gravado com a base de regras {log.rule_base_version or '(várias)'} "
+                f"e a atual é {current}; use --rebaseline para reclassificar a referência"
+            )
+        log.classifications = replay(log, DEFAULT_CANDIDATE, args.workers)
+        log.rule_base_version = current
+    changes = diff_results(log, replay(log, args.candidate, args.workers))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(changes, ensure_ascii=False, indent=2))
+    else:
+        print(format_diff(changes, len(log)))
+        print(f"\n{len(log)} casos em {elapsed:.2f}s ({len(log) / elapsed:.0f} casos/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import uuid
+
+
+def new_relato_id() -> str:
+    """
+    Identificador de um relato na memória de trabalho (TextRelato.relato_id).
+
+    Nenhuma regra casa com o texto do relato, então o motor recebe apenas este
+    identificador e o texto não é guardado em lugar nenhum depois da extração
+    das palavras-chave. O identificador é único entre processos: uma sessão
+    restaurada de um token em outra réplica continua com o mesmo id, sem colidir
+    com os relatos de lá.
+    """
+    return uuid.uuid4().hex
@@ -0,0 +1,85 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+
+class ResultCache:
+    """
+    Cache LRU limitado para resultados completos de classificação.
+
+    As chaves devem identificar o conjunto canônico de fatos de entrada e a
+    versão da base de regras; os valores são copiados na entrada e na saída
+    para que quem chama não altere o que está armazenado.
+
+    Pode ser compartilhado por vários ExpertSystem de threads diferentes
+    (uma sessão do Streamlit por thread): as operações são protegidas por
+    uma trava.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = self._entries[key]
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any]):
+        if self.maxsize <= 0:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def keywords_key(keywords: Dict[str, List[str]], version: str,
+                     ids: Optional[Mapping[Tuple[str, str], int]] = None) -> Hashable:
+        """
+        Chave canônica: conjunto de pares (categoria, palavra-chave) + versão.
+
+        Com ids (KeywordVocabulary.ids), cada par conhecido entra na chave como
+        o seu ID inteiro; a versão deve então identificar o vocabulário.
+        """
+        ids = ids or {}
+        return (
+            version,
+            frozenset(
+                ids.get((category, keyword), (category, keyword))
+                for category, values in keywords.items()
+                for keyword in values
+            )
+        )
@@ -1,24 +1,115 @@
 import inspect
 from experta.engine import KnowledgeEngine
 from experta import Fact
+from experta.agenda import Agenda
+from experta.fact import InitialFact
 from experta.rule import Rule
 from experta.deffacts import DefFacts
+from experta.strategies import DepthStrategy
 
 from ..facts import (
-    ViolenceClassification, AnalysisResult, ProcessingPhase
+    ViolenceClassification, AnalysisResult, ProcessingPhase, KeywordFact
 )
+from ..snapshot import encode_snapshot, decode_snapshot, fact_to_record, record_to_fact
+from .rule_analyzer import find_conclusion
+
+from knowledge_base.institutions import DEFAULT_INSTITUTION
+from knowledge_base.weight_matrix import get_weight_matrix
+
+class BatchDepthStrategy(DepthStrategy):
+    """
+    Mesma ordenação da DepthStrategy, mas insere as ativações novas em lote.
+
+    Em vez de um insort (e um hash da ativação para o lru_cache) por ativação,
+    calcula as chaves diretamente e reordena a agenda uma única vez.
+
+    Ativações de regras diferentes sobre os mesmos fatos desempatam pelo nome
+    da regra. Sem isso a ordem dependeria da montagem interna da rede Rete,
+    que varia entre processos, e o avaliador compilado não poderia reproduzi-la.
+    """
+
+    def get_key(self, activation):
+        salience = activation.rule.salience
+        facts = sorted((f['__factid__'] for f in activation.facts),
+                       reverse=True)
+        return (salience, facts, activation.rule.__name__)
+
+    def _update_agenda(self, agenda, added, removed):
+        if removed:
+            super()._update_agenda(agenda, [], removed)
+
+        if added:
+            for act in added:
+                act.key = self.get_key(act)
+            agenda.activations.extend(added)
+            agenda.activations.sort()
+
+
+class SeverityStrategy(BatchDepthStrategy):
+    """
+    Dispara primeiro as regras cuja classificação alvo é mais grave.
+
+    A gravidade vem da conclusão de cada regra (a chamada literal a
+    create_classification) e do severity_score do tipo/subtipo. Regras de
+    controle, sem conclusão, disparam antes de todas. Dentro da mesma
+    gravidade a ordem é a da BatchDepthStrategy, então as explicações e o
+    ranking final não mudam; só a ordem entre gravidades diferentes.
+
+    As gravidades ficam em cache por matriz de pesos: se a base de
+    conhecimento for recarregada ou a instituição mudar, o cache é refeito.
+    """
+    CONTROL_SEVERITY = float("inf")
+    # Instituição cujas gravidades ordenam a agenda (ver BaseViolenceEngine.institution)
+    institution = DEFAULT_INSTITUTION
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._severity = {}
+        self._severity_matrix = None
+
+    def rule_severity(self, rule):
+        matrix = get_weight_matrix(self.institution)
+        if matrix is not self._severity_matrix:
+            self._severity = {}
+            self._severity_matrix = matrix
+
+        function = rule._wrapped
+        if function not in self._severity:
+            conclusion = find_conclusion(function)
+            self._severity[function] = (
+                matrix.severity_of(*conclusion)
+                if conclusion else self.CONTROL_SEVERITY
+            )
+        return self._severity[function]
+
+    def get_key(self, activation):
+        salience, facts, name = super().get_key(activation)
+        return (salience, self.rule_severity(activation.rule), facts, name)
 
-from knowledge_base.violence_types import VIOLENCE_TYPES
 
 class BaseViolenceEngine(KnowledgeEngine):
+    __strategy__ = SeverityStrategy
+
     def __init__(self):
         super().__init__()
         self.explanations = {}
 
+    @property
+    def institution(self) -> str:
+        """
+        Instituição cuja base (gravidades e subtipos extras) ordena a agenda e
+        ranqueia as classificações. Fica na estratégia, que também a usa.
+        """
+        return self.strategy.institution
+
+    @institution.setter
+    def institution(self, institution: str):
+        self.strategy.institution = institution
+
     @DefFacts()
-    def initial_facts(self):
+    def initial_facts(self, phase="collection"):
         yield Fact(engine_ready=True)
-        yield ProcessingPhase(phase="collection")  # Fase inicial: coleta de fatos
+        yield ProcessingPhase(phase=phase)  # Fase inicial: coleta de fatos
 
     @Rule(ProcessingPhase(phase="collection"))
     def start_analysis_phase(self):
@@ -33,6 +124,58 @@ class BaseViolenceEngine(KnowledgeEngine):
         # Declarar a fase de análise
         self.declare(ProcessingPhase(phase="analysis"))
 
+    def load_facts(self, facts):
+        """
+        Reinicia o motor já na fase de análise e declara todos os fatos em lote.
+
+        Os fatos são validados e inseridos em uma única chamada a declare, de
+        modo que a rede Rete propaga o lote uma só vez, e a transição
+        coleta → análise de start_analysis_phase deixa de ser necessária.
+        """
+        self.reset(phase="analysis")
+        if facts:
+            self.declare(*facts)
+
+    def snapshot(self) -> bytes:
+        """
+        Serializa a memória de trabalho (fatos, explicações e fase) em um blob binário.
+
+        O blob pode ser restaurado com restore em qualquer instância do motor,
+        inclusive em outro processo.
+        """
+        phase = "analysis"
+        records = []
+        for fact in self.facts.values():
+            if isinstance(fact, ProcessingPhase):
+                phase = fact["phase"]
+            elif type(fact) not in (Fact, InitialFact):
+                records.append(fact_to_record(fact))
+
+        return encode_snapshot({
+            "phase": phase,
+            "facts": records,
+            "explanations": self.explanations,
+            "settled": not self.agenda.activations
+        })
+
+    def restore(self, blob: bytes):
+        """
+        Substitui a memória de trabalho pelo conteúdo de um snapshot.
+
+        Se o snapshot foi tirado depois de run, as ativações recriadas pela
+        redeclaração já tinham disparado no motor de origem e são descartadas;
+        só fatos declarados depois da restauração geram novas ativações.
+        """
+        payload = decode_snapshot(blob)
+        facts = [record_to_fact(record) for record in payload["facts"]]
+
+        self.reset(phase=payload["phase"])
+        self.explanations = payload["explanations"]
+        if facts:
+            self.declare(*facts)
+        if payload["settled"]:
+            self.agenda = Agenda()
+
     def create_classification(self, violence_type, subtype=None, explanations=None, facts_used=None, reasoning=None):
         """
         Cria uma classificação de violência com explicações detalhadas.
@@ -82,10 +225,17 @@ class BaseViolenceEngine(KnowledgeEngine):
             )
         )
     
-    def run(self, steps=None):
+    def run(self, steps=None, top_k=None):
         """
         Executa o motor em modo controlado por fases.
+
+        Com top_k, para assim que as top_k classificações mais graves estiverem
+        estabelecidas, deixando as ativações restantes na agenda (um run
+        posterior as dispara). Exige a SeverityStrategy.
         """
+        if top_k is not None and not isinstance(self.strategy, SeverityStrategy):
+            raise ValueError("top_k exige a SeverityStrategy como estratégia do motor")
+
         print("\nIniciando análise com motor de inferência...")
 
         # Limitar o número máximo de iterações para evitar loops infinitos
@@ -100,13 +250,41 @@ class BaseViolenceEngine(KnowledgeEngine):
             # Sair se não houver mais regras para acionar
             if not self.agenda:
                 break
+
+            if top_k is not None and self._top_k_established(top_k):
+                print(f"   • Parada antecipada: {top_k} classificação(ões) mais grave(s) estabelecida(s)")
+                break
         
         self.consolidate_results()
 
+    def _top_k_established(self, top_k):
+        """
+        True se nenhuma ativação pendente pode entrar entre as top_k mais graves.
+
+        A agenda dispara em ordem decrescente de gravidade, então basta comparar
+        as classificações já declaradas com a ativação pendente mais grave.
+        """
+        added, removed = self.get_activations()
+        self.strategy.update_agenda(self.agenda, added, removed)
+        if not self.agenda.activations:
+            return True
+
+        pending = self.strategy.rule_severity(self.agenda.activations[-1].rule)
+        established = 0
+        for fact_id in self.get_matching_facts(ViolenceClassification):
+            fact = self.facts[fact_id]
+            if get_weight_matrix(self.institution).severity_of(fact["violence_type"], fact["subtype"]) >= pending:
+                established += 1
+        return established >= top_k
+
     def consolidate_results(self):
         """
         Consolida os resultados de todas as classificações.
         """
+        # Em análises incrementais um resultado anterior pode já existir
+        for fact_id in self.get_matching_facts(AnalysisResult):
+            self.retract(fact_id)
+
         all_classifications = []
         for fact_id in self.get_matching_facts(ViolenceClassification):
             fact = self.facts[fact_id]
@@ -130,7 +308,8 @@ class BaseViolenceEngine(KnowledgeEngine):
         # Reportar múltiplos se houver mais de um
         report_multiple = len(all_classifications) > 1
         
-        # Primeiro resultado como principal
+        # Ranquear pelos pesos das palavras-chave identificadas; o mais pontuado é o principal
+        all_classifications = get_weight_matrix(self.institution).rank(all_classifications, self.get_declared_keywords())
         primary_result = all_classifications[0]
         
         self.declare(
@@ -157,6 +336,11 @@ class BaseViolenceEngine(KnowledgeEngine):
         key = f"{violence_type}_{subtype}" if subtype else violence_type
         return self.explanations.get(key, [])
     
+    def get_declared_keywords(self):
+        return [(fact["category"], fact["keyword"])
+                for fact in self.facts.values()
+                if isinstance(fact, KeywordFact)]
+
     def get_matching_facts(self, fact_type):
         return [fact_id for fact_id, fact in self.facts.items() 
                 if isinstance(fact, fact_type)]
@@ -165,10 +349,10 @@ class BaseViolenceEngine(KnowledgeEngine):
             print(f"\n{len(self.facts)} fatos carregados no motor de inferência")
 
 
-    def reset(self):
+    def reset(self, **kwargs):
         self.explanations = {}
         
-        super().reset()
+        super().reset(**kwargs)
         print("Motor de regras reiniciado completamente")
 
     def format_detailed_explanation(self, facts_used, conclusion, reasoning=None):
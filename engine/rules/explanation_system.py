@@ -1,5 +1,6 @@
-from typing import Dict, List, Any
-from knowledge_base.violence_types import VIOLENCE_TYPES
+from typing import Dict, List, Any, Tuple
+from knowledge_base.guidance import get_guidance
+from knowledge_base.institutions import DEFAULT_INSTITUTION
 
 
 class ExplanationSystem:
@@ -7,73 +8,48 @@ class ExplanationSystem:
     Sistema responsável por gerar explicações detalhadas sobre as classificações de violência.
     """
     
+    # Cada consulta é uma busca na tabela de orientações (knowledge_base/guidance.py),
+    # com o fallback do subtipo para o tipo já resolvido
     @staticmethod
-    def get_violence_definition(violence_type: str, subtype: str = None) -> str:
+    def get_violence_definition(violence_type: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> str:
         """
         Retorna a definição de um tipo/subtipo de violência.
         """
-        info = VIOLENCE_TYPES.get(violence_type, {})
-        
-        if subtype and 'subtipos' in info and subtype in info['subtipos']:
-            return info['subtipos'][subtype].get('definicao', '')
-        
-        return info.get('definicao', '')
+        return get_guidance(violence_type, subtype, institution).definition
     
     @staticmethod
-    def get_legal_context(violence_type: str, subtype: str = None) -> str:
-        info = VIOLENCE_TYPES.get(violence_type, {})
-        
-        if subtype and 'subtipos' in info and subtype in info['subtipos']:
-            subtype_info = info['subtipos'][subtype]
-            return subtype_info.get('contexto_legal', info.get('contexto_legal', ''))
-        
-        return info.get('contexto_legal', '')
+    def get_legal_context(violence_type: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> str:
+        return get_guidance(violence_type, subtype, institution).legal_context
     
     @staticmethod
-    def get_severity_level(violence_type: str, subtype: str = None) -> str:
-        info = VIOLENCE_TYPES.get(violence_type, {})
-        
-        if subtype and 'subtipos' in info and subtype in info['subtipos']:
-            subtype_info = info['subtipos'][subtype]
-            return subtype_info.get('gravidade', info.get('gravidade', ''))
-        
-        return info.get('gravidade', '')
+    def get_severity_level(violence_type: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> str:
+        return get_guidance(violence_type, subtype, institution).severity
     
     @staticmethod
-    def get_recommendations(violence_type: str, subtype: str = None) -> List[str]:
-        info = VIOLENCE_TYPES.get(violence_type, {})
-        
-        if subtype and 'subtipos' in info and subtype in info['subtipos']:
-            subtype_info = info['subtipos'][subtype]
-            return subtype_info.get('recomendacoes', info.get('recomendacoes', []))
-        
-        return info.get('recomendacoes', [])
+    def get_recommendations(violence_type: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> Tuple[str, ...]:
+        return get_guidance(violence_type, subtype, institution).recommendations
     
     @staticmethod
-    def get_reporting_channels(violence_type: str, subtype: str = None) -> List[str]:
-        info = VIOLENCE_TYPES.get(violence_type, {})
-        
-        if subtype and 'subtipos' in info and subtype in info['subtipos']:
-            subtype_info = info['subtipos'][subtype]
-            return subtype_info.get('canais_denuncia', info.get('canais_denuncia', []))
-        
-        return info.get('canais_denuncia', [])
+    def get_reporting_channels(violence_type: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> Tuple[str, ...]:
+        return get_guidance(violence_type, subtype, institution).reporting_channels
     
     @staticmethod
     def format_complete_explanation(violence_type: str, subtype: str = None, 
-                                    facts_used: Dict = None, reasoning: str = None) -> Dict[str, Any]:
+                                    facts_used: Dict = None, reasoning: str = None,
+                                    institution: str = DEFAULT_INSTITUTION) -> Dict[str, Any]:
         """
         Formata uma explicação completa incluindo definição, contexto legal, 
         recomendações e análise dos fatos.
         """
+        guidance = get_guidance(violence_type, subtype, institution)
         explanation = {
             'type': violence_type,
             'subtype': subtype or '',
-            'definition': ExplanationSystem.get_violence_definition(violence_type, subtype),
-            'legal_context': ExplanationSystem.get_legal_context(violence_type, subtype),
-            'severity': ExplanationSystem.get_severity_level(violence_type, subtype),
-            'recommendations': ExplanationSystem.get_recommendations(violence_type, subtype),
-            'reporting_channels': ExplanationSystem.get_reporting_channels(violence_type, subtype),
+            'definition': guidance.definition,
+            'legal_context': guidance.legal_context,
+            'severity': guidance.severity,
+            'recommendations': list(guidance.recommendations),
+            'reporting_channels': list(guidance.reporting_channels),
             'analysis': ExplanationSystem.format_fact_analysis(facts_used) if facts_used else [],
             'reasoning': reasoning or ''
         }
@@ -0,0 +1,177 @@
+"""
+Modo multi-caso: vários relatos na mesma memória de trabalho.
+
+Cada fato de entrada recebe um campo case_id e os padrões das regras ganham
+a variável case_id=MATCH.case_id, de modo que a rede Rete só junta fatos do
+mesmo relato. Milhares de relatos podem ser declarados de uma vez e
+resolvidos em um único run; as classificações são separadas por caso ao final.
+
+Os corpos das regras não mudam: ao disparar uma ativação o motor entra no
+caso dela, e get_matching_facts, as explicações e a deduplicação de
+create_classification passam a enxergar apenas os fatos desse caso.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List
+
+from experta import MATCH
+from experta.conditionalelement import OR
+from experta.rule import Rule
+
+from ..facts import KeywordFact, ViolenceClassification
+from .rule_analyzer import KEYWORD_FACT_FIELDS, collect_rules
+
+from knowledge_base.weight_matrix import get_weight_matrix
+
+CASE_FIELD = "case_id"
+CASE_FACT_CLASSES = (KeywordFact, *KEYWORD_FACT_FIELDS)
+
+
+def _tag_pattern(pattern):
+    if isinstance(pattern, OR):
+        return OR(*[_tag_pattern(alternative) for alternative in pattern])
+    if type(pattern) in CASE_FACT_CLASSES:
+        return type(pattern)(**pattern.as_dict(), **{CASE_FIELD: MATCH.case_id})
+    return pattern
+
+
+def case_scoped_rule(rule: Rule) -> Rule:
+    """Mesma regra, com os padrões de entrada unidos pelo case_id."""
+    return Rule(*[_tag_pattern(element) for element in rule], salience=rule.salience)(rule._wrapped)
+
+
+def tag_facts(case_id: Hashable, facts: List) -> List:
+    """Cópias dos fatos de entrada com o case_id do relato."""
+    return [
+        type(fact)(**fact.as_dict(), **{CASE_FIELD: case_id})
+        for fact in facts
+        if type(fact) in CASE_FACT_CLASSES
+    ]
+
+
+class MultiCaseMixin:
+    """Gerencia os casos de um motor multi-caso (ver make_multi_case_engine)."""
+
+    # Lido pelo compilador de regras para trocar a junção por índices por caso
+    partition_field = CASE_FIELD
+    _current_case = None
+
+    def load_cases(self, cases: Dict[Hashable, List]):
+        """
+        Reinicia o motor na fase de análise e declara os fatos de todos os casos.
+
+        cases mapeia case_id -> fatos de entrada do relato (os mesmos que
+        TextProcessor.build_keyword_facts produz).
+        """
+        self.reset(phase="analysis")
+        self._case_facts = {case_id: [] for case_id in cases}
+        self._case_explanations = {case_id: {} for case_id in cases}
+
+        tagged = []
+        for case_id, facts in cases.items():
+            tagged.extend(tag_facts(case_id, facts))
+        if tagged:
+            self.declare(*tagged)
+
+        for fact_id, fact in self.facts.items():
+            if CASE_FIELD in fact:
+                self._case_facts[fact[CASE_FIELD]].append(fact_id)
+
+    def run_cases(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Dispara todas as ativações de todos os casos e devolve os resultados por caso."""
+        print(f"\nIniciando análise de {len(self._case_facts)} relatos com motor de inferência...")
+
+        self.running = True
+        try:
+            while True:
+                added, removed = self.get_activations()
+                self.strategy.update_agenda(self.agenda, added, removed)
+                activation = self.agenda.get_next()
+                if activation is None:
+                    break
+
+                self._enter_case(activation.context.get(CASE_FIELD))
+                activation.rule(self, **{
+                    key: value for key, value in activation.context.items()
+                    if not key.startswith("__")
+                })
+        finally:
+            self._enter_case(None)
+            self.running = False
+
+        return self.collect_cases()
+
+    def collect_cases(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Separa as classificações por caso, no mesmo formato de ExpertSystem."""
+        results = {}
+        for case_id, fact_ids in self._case_facts.items():
+            explanations = self._case_explanations[case_id]
+            classifications = []
+            keywords = []
+            for fact_id in fact_ids:
+                fact = self.facts[fact_id]
+                if isinstance(fact, ViolenceClassification):
+                    key = (f"{fact['violence_type']}_{fact['subtype']}"
+                           if fact["subtype"] else fact["violence_type"])
+                    classifications.append({
+                        "violence_type": fact["violence_type"],
+                        "subtype": fact["subtype"] or "",
+                        "explanation": explanations.get(key, [])
+                    })
+                elif isinstance(fact, KeywordFact):
+                    keywords.append((fact["category"], fact["keyword"]))
+
+            if classifications:
+                classifications = get_weight_matrix(self.institution).rank(classifications, keywords)
+                primary_result = classifications[0]
+            else:
+                primary_result = {"violence_type": "", "subtype": ""}
+
+            results[case_id] = {
+                "classifications": classifications,
+                "primary_result": primary_result,
+                "multiple_types": len(classifications) > 1
+            }
+        return results
+
+    def _enter_case(self, case_id):
+        self._current_case = case_id
+        if case_id is not None:
+            self.explanations = self._case_explanations[case_id]
+
+    def get_matching_facts(self, fact_type):
+        if self._current_case is None:
+            return super().get_matching_facts(fact_type)
+        return [fact_id for fact_id in self._case_facts[self._current_case]
+                if isinstance(self.facts[fact_id], fact_type)]
+
+    def _declare_classification_fact(self, violence_type, subtype, key):
+        if self._current_case is None:
+            return super()._declare_classification_fact(violence_type, subtype, key)
+
+        fact = self.declare(
+            ViolenceClassification(
+                violence_type=violence_type,
+                subtype=subtype,
+                explanation=self.explanations.get(key, []).copy(),
+                **{CASE_FIELD: self._current_case}
+            )
+        )
+        if fact is not None:
+            self._case_facts[self._current_case].append(fact.__factid__)
+
+
+@lru_cache(maxsize=None)
+def make_multi_case_engine(engine_class):
+    """
+    Subclasse de engine_class com as regras unidas por case_id.
+
+    Com a rede Rete do experta a junção por case_id percorre as memórias de
+    todos os casos, então o custo por caso cresce com o lote; com
+    compile_engine(ViolenceRules) cada caso é casado em sua própria partição.
+    """
+    rules = {spec.name: case_scoped_rule(spec.rule) for spec in collect_rules(engine_class)}
+    return type(
+        f"MultiCase{engine_class.__name__}",
+        (MultiCaseMixin, engine_class),
+        {**rules, "__module__": engine_class.__module__}
+    )
@@ -0,0 +1,273 @@
+"""
+Análise estática da base de regras.
+
+Lê os padrões declarados com @Rule nos mixins de regras e a conclusão de cada
+regra (a chamada a create_classification no corpo) para apontar:
+
+- regras duplicadas: mesmas condições e mesma conclusão de outra regra;
+- regras subsumidas: outra regra com a mesma conclusão dispara sempre que
+  esta dispara (por exemplo, detect_perseguicao_com_medo e detect_perseguicao);
+- regras inalcançáveis: exigem uma palavra-chave que o validador do Groq nunca
+  deixa passar, então a condição não pode ser satisfeita.
+
+Também compila uma versão podada do motor, sem essas regras, que produz o mesmo
+conjunto de classificações com menos nós na rede e menos ativações.
+
+Uso: python -m engine.rules.rule_analyzer
+"""
+import ast
+import inspect
+import textwrap
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from experta import Fact
+from experta.conditionalelement import OR
+from experta.rule import Rule
+
+from ..facts import (
+    KeywordFact, ViolenceBehavior, ContextFact, FrequencyFact,
+    TargetFact, RelationshipFact, ImpactFact
+)
+
+# Fatos derivados declarados pelo TextProcessor junto de cada KeywordFact:
+# classe do fato -> (campo, categoria do KeywordFact equivalente)
+KEYWORD_FACT_FIELDS = {
+    ViolenceBehavior: ("behavior_type", "action_type"),
+    ContextFact: ("location", "context"),
+    FrequencyFact: ("value", "frequency"),
+    TargetFact: ("characteristic", "target"),
+    RelationshipFact: ("type", "relationship"),
+    ImpactFact: ("type", "impact"),
+}
+
+Atom = Tuple[str, str]
+
+
+@dataclass
+class RuleSpec:
+    """Forma normalizada de uma regra: grupos de alternativas (E de OUs)."""
+    name: str
+    rule: Rule
+    groups: Tuple[FrozenSet[Atom], ...]
+    control: FrozenSet[Tuple[str, Tuple]] = field(default_factory=frozenset)
+    conclusion: Optional[Tuple[str, str]] = None
+
+    @property
+    def keywords(self) -> FrozenSet[Atom]:
+        return frozenset(atom for group in self.groups for atom in group)
+
+
+def _pattern_to_atom(pattern: Fact) -> Optional[Atom]:
+    if isinstance(pattern, KeywordFact):
+        return (pattern["category"], pattern["keyword"])
+    for fact_class, (field_name, category) in KEYWORD_FACT_FIELDS.items():
+        if isinstance(pattern, fact_class):
+            return (category, pattern[field_name])
+    return None
+
+
+def _control_key(pattern: Fact) -> Tuple[str, Tuple]:
+    return (type(pattern).__name__, tuple(sorted(pattern.as_dict().items())))
+
+
+def find_conclusion(function) -> Optional[Tuple[str, str]]:
+    """Extrai (tipo, subtipo) da chamada literal a create_classification."""
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+    except (OSError, TypeError, SyntaxError):
+        return None
+
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "create_classification"
+                and len(node.args) >= 2
+                and all(isinstance(arg, ast.Constant) for arg in node.args[:2])):
+            return (node.args[0].value, node.args[1].value or "")
+    return None
+
+
+def parse_rule(name: str, rule: Rule) -> RuleSpec:
+    groups = []
+    control = set()
+    for element in rule:
+        alternatives = element if isinstance(element, OR) else (element,)
+        atoms = [_pattern_to_atom(pattern) for pattern in alternatives]
+        if all(atom is not None for atom in atoms):
+            groups.append(frozenset(atoms))
+        else:
+            for pattern in alternatives:
+                control.add(_control_key(pattern))
+
+    return RuleSpec(
+        name=name,
+        rule=rule,
+        groups=tuple(groups),
+        control=frozenset(control),
+        conclusion=find_conclusion(rule._wrapped)
+    )
+
+
+def collect_rules(engine_class) -> List[RuleSpec]:
+    """Regras do motor na ordem de definição, seguindo a MRO da classe."""
+    seen = set()
+    specs = []
+    for cls in engine_class.__mro__:
+        for name, value in vars(cls).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if isinstance(value, Rule):
+                specs.append(parse_rule(name, value))
+    return specs
+
+
+class RuleBaseAnalyzer:
+    """Detecta regras duplicadas, subsumidas e inalcançáveis em um motor."""
+
+    def __init__(self, engine_class, vocabulary: Dict[str, List[str]]):
+        self.engine_class = engine_class
+        self.vocabulary = {
+            (category, keyword)
+            for category, keywords in vocabulary.items()
+            if isinstance(keywords, (list, tuple, set))
+            for keyword in keywords
+        }
+        self.rules = collect_rules(engine_class)
+        self._order = {spec.name: index for index, spec in enumerate(self.rules)}
+
+    def effective_groups(self, spec: RuleSpec) -> Tuple[FrozenSet[Atom], ...]:
+        """Grupos sem as alternativas que nunca chegam ao motor."""
+        return tuple(group & self.vocabulary for group in spec.groups)
+
+    def is_unreachable(self, spec: RuleSpec) -> bool:
+        return any(not group for group in self.effective_groups(spec))
+
+    def covers(self, general: RuleSpec, specific: RuleSpec) -> bool:
+        """True se `general` dispara sempre que `specific` dispara."""
+        if not general.control <= specific.control:
+            return False
+        specific_groups = self.effective_groups(specific)
+        return all(
+            any(group <= general_group for group in specific_groups)
+            for general_group in self.effective_groups(general)
+        )
+
+    def find_unreachable(self) -> List[Dict]:
+        report = []
+        for spec in self.rules:
+            if self.is_unreachable(spec):
+                missing = [
+                    sorted(group) for group in spec.groups
+                    if not group & self.vocabulary
+                ]
+                report.append({"rule": spec.name, "missing_keywords": missing})
+        return report
+
+    def find_duplicates(self) -> List[Dict]:
+        report = []
+        for spec in self.rules:
+            for other in self.rules:
+                if (self._order[other.name] < self._order[spec.name]
+                        and self._same_conclusion(spec, other)
+                        and self.covers(spec, other) and self.covers(other, spec)):
+                    report.append({"rule": spec.name, "duplicate_of": other.name})
+                    break
+        return report
+
+    def find_subsumed(self) -> List[Dict]:
+        report = []
+        for spec in self.rules:
+            if self.is_unreachable(spec):
+                continue
+            for other in self.rules:
+                if (other is not spec
+                        and not self.is_unreachable(other)
+                        and self._same_conclusion(spec, other)
+                        and self.covers(other, spec)
+                        and not self.covers(spec, other)):
+                    report.append({
+                        "rule": spec.name,
+                        "subsumed_by": other.name,
+                        "conclusion": spec.conclusion
+                    })
+                    break
+        return report
+
+    def prunable_rules(self) -> List[str]:
+        """
+        Regras que podem ser removidas sem mudar o conjunto de classificações.
+
+        A relação "cobre" é transitiva, então remover toda regra coberta por
+        outra mantém ao menos a mais geral de cada cadeia; entre regras
+        equivalentes fica a primeira definida.
+        """
+        pruned = []
+        for spec in self.rules:
+            if self.is_unreachable(spec):
+                pruned.append(spec.name)
+                continue
+            for other in self.rules:
+                if (other is spec
+                        or self.is_unreachable(other)
+                        or not self._same_conclusion(spec, other)
+                        or not self.covers(other, spec)):
+                    continue
+                equivalent = self.covers(spec, other)
+                if not equivalent or self._order[other.name] < self._order[spec.name]:
+                    pruned.append(spec.name)
+                    break
+        return pruned
+
+    def report(self) -> Dict[str, List]:
+        return {
+            "rules": [spec.name for spec in self.rules],
+            "duplicates": self.find_duplicates(),
+            "subsumed": self.find_subsumed(),
+            "unreachable": self.find_unreachable(),
+            "prunable": self.prunable_rules()
+        }
+
+    def compile_pruned(self):
+        """
+        Gera uma subclasse do motor sem as regras podáveis.
+
+        As classificações produzidas são as mesmas; as explicações podem vir da
+        regra mais geral, já que apenas a primeira regra a classificar um par
+        (tipo, subtipo) registra sua explicação.
+        """
+        removed = {name: None for name in self.prunable_rules()}
+        return type(f"Pruned{self.engine_class.__name__}", (self.engine_class,), removed)
+
+    @staticmethod
+    def _same_conclusion(spec: RuleSpec, other: RuleSpec) -> bool:
+        return spec.conclusion is not None and spec.conclusion == other.conclusion
+
+
+def format_report(report: Dict[str, List]) -> str:
+    lines = [f"{len(report['rules'])} regras analisadas"]
+
+    lines.append(f"\nDuplicadas ({len(report['duplicates'])}):")
+    for item in report["duplicates"]:
+        lines.append(f"   • {item['rule']} duplica {item['duplicate_of']}")
+
+    lines.append(f"\nSubsumidas ({len(report['subsumed'])}):")
+    for item in report["subsumed"]:
+        violence_type, subtype = item["conclusion"]
+        conclusion = f"{violence_type}/{subtype}" if subtype else violence_type
+        lines.append(f"   • {item['rule']} coberta por {item['subsumed_by']} ({conclusion})")
+
+    lines.append(f"\nInalcançáveis ({len(report['unreachable'])}):")
+    for item in report["unreachable"]:
+        lines.append(f"   • {item['rule']} exige {item['missing_keywords']}")
+
+    lines.append(f"\nPodáveis ({len(report['prunable'])}): {', '.join(report['prunable'])}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+    from .violence_rules import ViolenceRules
+
+    print(format_report(RuleBaseAnalyzer(ViolenceRules, KEYWORDS_DICT).report()))
@@ -0,0 +1,284 @@
+"""
+Compilador da base de regras para um avaliador Python especializado.
+
+Lê os padrões declarados com @Rule nos mixins de regras e gera o código-fonte
+de um módulo com uma função de casamento por regra. Cada função testa a regra
+com verificações de pertinência em um índice (classe, campos, valores) → ids
+de fatos e devolve as combinações de fatos que a satisfazem.
+
+O módulo gerado substitui a rede Rete do experta como __matcher__ do motor:
+a lista de fatos, a agenda, a estratégia e os corpos das regras (e portanto
+create_classification) continuam os mesmos, então a saída é idêntica.
+
+Motores com partition_field (o modo multi-caso) têm padrões unidos por uma
+variável nesse campo. O compilador troca essa junção por um índice separado
+por valor do campo, e cada mudança só reavalia as partições tocadas.
+
+Uso: python -m engine.rules.rule_compiler  (imprime o módulo gerado)
+"""
+import types
+from functools import lru_cache
+from typing import Dict, Hashable, List, Tuple
+
+from experta import Fact
+from experta.abstract import Matcher
+from experta.fieldconstraint import W
+from experta.activation import Activation
+from experta.conditionalelement import OR
+
+from .rule_analyzer import collect_rules
+
+PatternKey = Tuple[str, Tuple, Tuple]
+
+
+class UnsupportedRuleError(ValueError):
+    """A regra usa um padrão que o compilador não sabe avaliar."""
+
+
+def _is_partition_binding(value, partition_field) -> bool:
+    return (partition_field is not None
+            and isinstance(value, W) and value.__bind__ == partition_field)
+
+
+def _pattern_key(pattern, partition_field=None) -> PatternKey:
+    """Chave do índice para um padrão: (classe, campos, valores)."""
+    if not isinstance(pattern, Fact):
+        raise UnsupportedRuleError(
+            f"Padrão não suportado pelo compilador de regras: {pattern!r}"
+        )
+    fields = {
+        name: value for name, value in pattern.as_dict().items()
+        if not (name == partition_field and _is_partition_binding(value, partition_field))
+    }
+    if type(pattern)(**fields).has_field_constraints():
+        raise UnsupportedRuleError(
+            f"Padrão não suportado pelo compilador de regras: {pattern!r}"
+        )
+    items = sorted(fields.items(), key=lambda item: str(item[0]))
+    fields = tuple(name for name, _ in items)
+    values = tuple(value for _, value in items)
+    return (type(pattern).__name__, fields, values)
+
+
+def _rule_groups(rule, partition_field=None) -> Tuple[List[List[PatternKey]], bool]:
+    """
+    Grupos de alternativas da regra (E de OUs), na ordem declarada, e se a
+    regra une seus fatos pelo campo de partição.
+    """
+    if not len(rule):
+        raise UnsupportedRuleError(f"Regra sem condições: {rule._wrapped.__name__}")
+
+    groups = []
+    partitioned = False
+    for element in rule:
+        alternatives = element if isinstance(element, OR) else (element,)
+        groups.append([_pattern_key(pattern, partition_field) for pattern in alternatives])
+        partitioned = partitioned or any(
+            _is_partition_binding(pattern.get(partition_field), partition_field)
+            for pattern in alternatives
+        )
+    return groups, partitioned
+
+
+def _group_expression(group: List[PatternKey]) -> Tuple[str, str]:
+    """Retorna (teste de pertinência, expressão com os ids) para um grupo."""
+    if len(group) == 1:
+        return f"{group[0]!r} in index", f"index[{group[0]!r}]"
+
+    test = " or ".join(f"{key!r} in index" for key in group)
+    ids = " + ".join(f"index.get({key!r}, ())" for key in group)
+    return f"({test})", ids
+
+
+def generate_rule_module(engine_class) -> str:
+    """Gera o código-fonte do avaliador especializado para engine_class."""
+    partition_field = getattr(engine_class, "partition_field", None)
+    specs = collect_rules(engine_class)
+    indexed_fields: Dict[str, List[Tuple]] = {}
+    functions = []
+    table = []
+
+    for spec in specs:
+        groups, partitioned = _rule_groups(spec.rule, partition_field)
+        for group in groups:
+            for class_name, fields, _ in group:
+                shapes = indexed_fields.setdefault(class_name, [])
+                if fields not in shapes:
+                    shapes.append(fields)
+
+        expressions = [_group_expression(group) for group in groups]
+        tests = "\n            and ".join(test for test, _ in expressions)
+        ids = ",\n        ".join(ids for _, ids in expressions)
+        function_name = f"match_{spec.name}"
+        functions.append(
+            f"def {function_name}(index):\n"
+            f"    if not ({tests}):\n"
+            f"        return ()\n"
+            f"    return product(\n"
+            f"        {ids}\n"
+            f"    )\n"
+        )
+        table.append(f"    ({spec.name!r}, {function_name}, {partitioned}),")
+
+    shapes_source = "\n".join(
+        f"    {class_name!r}: {tuple(shapes)!r},"
+        for class_name, shapes in indexed_fields.items()
+    )
+
+    return (
+        f'"""Avaliador gerado a partir de {engine_class.__name__} por '
+        f'engine/rules/rule_compiler.py. Não editar."""\n'
+        "from itertools import product\n\n"
+        f"PARTITION_FIELD = {partition_field!r}\n\n"
+        "# Classe do fato -> combinações de campos consultadas pelas regras\n"
+        f"INDEXED_FIELDS = {{\n{shapes_source}\n}}\n\n\n"
+        + "\n\n".join(functions)
+        + "\n\n# (regra, função de casamento, unida pelo campo de partição)\n"
+        + "RULES = (\n" + "\n".join(table) + "\n)\n"
+    )
+
+
+@lru_cache(maxsize=None)
+def load_rule_module(engine_class) -> types.ModuleType:
+    """Gera e carrega (uma vez por classe) o avaliador especializado."""
+    source = generate_rule_module(engine_class)
+    module = types.ModuleType(f"{engine_class.__module__}._compiled_{engine_class.__name__}")
+    module.__source__ = source
+    exec(compile(source, f"<compiled {engine_class.__name__}>", "exec"), module.__dict__)
+    return module
+
+
+class CompiledMatcher(Matcher):
+    """
+    Matcher do experta baseado no avaliador gerado.
+
+    Mantém um índice dos fatos que aparecem em algum padrão e o conjunto de
+    combinações que casam com cada regra. A cada mudança recalcula as
+    combinações e devolve as novas como ativações e as desfeitas como
+    removidas, como a rede Rete faria.
+
+    Com campo de partição, o índice é separado por valor do campo: fatos sem
+    o campo ficam na partição compartilhada (None), visível a todas. Regras
+    unidas pela partição são avaliadas dentro de cada partição tocada; as
+    demais, só na compartilhada.
+    """
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        module = load_rule_module(type(engine))
+        rules = {spec.name: spec.rule for spec in collect_rules(type(engine))}
+        self.partition_field = module.PARTITION_FIELD
+        self.indexed_fields = module.INDEXED_FIELDS
+        # Cópias sem instância associada, como as que a rede Rete dispara
+        self.rules = [
+            (rules[name].new_conditions(*rules[name]), match, partitioned)
+            for name, match, partitioned in module.RULES
+        ]
+        self.reset()
+
+    def reset(self):
+        self.partitions: Dict[Hashable, Dict[PatternKey, Tuple[int, ...]]] = {None: {}}
+        self.matches: Dict[Hashable, Dict[Tuple[str, frozenset], Activation]] = {}
+
+    def _index_keys(self, fact):
+        class_name = type(fact).__name__
+        for fields in self.indexed_fields.get(class_name, ()):
+            if all(name in fact for name in fields):
+                yield (class_name, fields, tuple(fact[name] for name in fields))
+
+    def _partition_of(self, fact):
+        if self.partition_field is None:
+            return None
+        return fact.get(self.partition_field)
+
+    def changes(self, adding=None, deleting=None):
+        touched = set()
+        for fact in deleting or ():
+            partition = self._partition_of(fact)
+            index = self.partitions.get(partition, {})
+            for key in self._index_keys(fact):
+                remaining = tuple(i for i in index[key] if i != fact.__factid__)
+                if remaining:
+                    index[key] = remaining
+                else:
+                    del index[key]
+                touched.add(partition)
+
+        for fact in adding or ():
+            partition = self._partition_of(fact)
+            index = self.partitions.setdefault(partition, {})
+            for key in self._index_keys(fact):
+                index[key] = index.get(key, ()) + (fact.__factid__,)
+                touched.add(partition)
+
+        # Fatos que nenhuma regra consulta (classificações, resultados) não mudam nada
+        if not touched:
+            return [], []
+
+        if None in touched:
+            touched = set(self.partitions)
+
+        added = []
+        removed = []
+        for partition in touched:
+            partition_added, partition_removed = self._rematch(partition)
+            added.extend(partition_added)
+            removed.extend(partition_removed)
+        return added, removed
+
+    def _rematch(self, partition):
+        """Recalcula as combinações de uma partição e devolve (novas, desfeitas)."""
+        shared = self.partitions[None]
+        if partition is None:
+            index = shared
+            context = {}
+        else:
+            index = dict(self.partitions[partition])
+            for key, ids in shared.items():
+                index[key] = ids + index.get(key, ())
+            context = {self.partition_field: partition}
+
+        facts = self.engine.facts
+        previous = self.matches.get(partition, {})
+        current = {}
+        added = []
+        for rule, match, partitioned in self.rules:
+            if partitioned != (partition is not None):
+                continue
+            for ids in match(index):
+                key = (rule.__name__, frozenset(ids))
+                if key in current:
+                    continue
+                activation = previous.get(key)
+                if activation is None:
+                    activation = Activation(rule, [facts[i] for i in key[1]], dict(context))
+                    added.append(activation)
+                current[key] = activation
+
+        removed = [
+            activation for key, activation in previous.items()
+            if key not in current
+        ]
+        if current:
+            self.matches[partition] = current
+        else:
+            self.matches.pop(partition, None)
+            if partition is not None and not self.partitions[partition]:
+                del self.partitions[partition]
+        return added, removed
+
+
+@lru_cache(maxsize=None)
+def compile_engine(engine_class):
+    """Subclasse de engine_class que usa o avaliador gerado no lugar da rede Rete."""
+    return type(
+        f"Compiled{engine_class.__name__}",
+        (engine_class,),
+        {"__matcher__": CompiledMatcher, "__module__": engine_class.__module__}
+    )
+
+
+if __name__ == "__main__":
+    from .violence_rules import ViolenceRules
+
+    print(generate_rule_module(ViolenceRules))
@@ -0,0 +1,96 @@
+"""
+Serialização compacta da memória de trabalho do motor.
+
+Formato: cabeçalho de 4 bytes (b"VLS" + versão), assinatura HMAC-SHA256 de
+32 bytes e JSON compactado com zlib. Os fatos são gravados como [classe,
+campos], usando apenas classes conhecidas de engine.facts, então restaurar um
+snapshot não executa código.
+
+O snapshot sai do servidor como token de sessão, então a assinatura cobre o
+cabeçalho e o conteúdo: um token alterado ou montado pelo cliente é recusado.
+A chave vem da variável de ambiente SESSION_SECRET (no Streamlit, as chaves de
+primeiro nível de secrets.toml também viram variáveis de ambiente) e precisa
+ser a mesma em todas as réplicas. Sem ela cada processo sorteia a sua, e os
+tokens só valem no processo que os gerou.
+"""
+import hashlib
+import hmac
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from experta import Fact
+
+from . import facts as fact_module
+
+SNAPSHOT_MAGIC = b"VLS"
+SNAPSHOT_VERSION = 2
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+_session_secret: Optional[bytes] = None
+
+FACT_CLASSES = {
+    name: value for name, value in vars(fact_module).items()
+    if isinstance(value, type) and issubclass(value, Fact) and value is not Fact
+}
+
+
+def session_secret() -> bytes:
+    global _session_secret
+    if _session_secret is None:
+        secret = os.environ.get("SESSION_SECRET", "")
+        if not secret:
+            print("SESSION_SECRET não definida: tokens de sessão válidos apenas neste processo")
+        _session_secret = secret.encode("utf-8") if secret else os.urandom(32)
+    return _session_secret
+
+
+def _sign(header: bytes, body: bytes) -> bytes:
+    return hmac.new(session_secret(), header + body, hashlib.sha256).digest()
+
+
+def encode_snapshot(payload: Dict[str, Any]) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    header = SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION])
+    body = zlib.compress(data, 6)
+    return header + _sign(header, body) + body
+
+
+def decode_snapshot(blob: bytes) -> Dict[str, Any]:
+    if len(blob) < 4 + SIGNATURE_SIZE:
+        raise ValueError("Snapshot inválido: truncado")
+    if blob[:3] != SNAPSHOT_MAGIC:
+        raise ValueError("Snapshot inválido: cabeçalho desconhecido")
+    if blob[3] != SNAPSHOT_VERSION:
+        raise ValueError(f"Versão de snapshot não suportada: {blob[3]}")
+    header, signature, body = blob[:4], blob[4:4 + SIGNATURE_SIZE], blob[4 + SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, _sign(header, body)):
+        raise ValueError("Snapshot inválido: assinatura não confere")
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+def pending_snapshot(facts: Iterable[Fact]) -> bytes:
+    """
+    Snapshot de fatos que ainda não passaram pelo motor.
+
+    Ao restaurar, os fatos são declarados e as ativações mantidas, então o
+    próximo run dispara as regras como em uma análise completa.
+    """
+    return encode_snapshot({
+        "phase": "analysis",
+        "facts": [fact_to_record(fact) for fact in facts],
+        "explanations": {},
+        "settled": False
+    })
+
+
+def fact_to_record(fact: Fact):
+    return [type(fact).__name__, fact.as_dict()]
+
+
+def record_to_fact(record) -> Fact:
+    name, fields = record
+    if name not in FACT_CLASSES:
+        raise ValueError(f"Snapshot inválido: classe de fato desconhecida {name!r}")
+    return FACT_CLASSES[name](**fields)
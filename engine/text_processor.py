@@ -1,9 +1,11 @@
 import os
 from typing import Dict, List, Any
 
-from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+from knowledge_base.versioning import active_version
 from utils.groq_integration import GroqAPI
 
+from engine.request_context import new_relato_id
+
 from engine.facts import (
     TextRelato, KeywordFact, ViolenceBehavior, ContextFact, FrequencyFact,
     TargetFact, RelationshipFact, ImpactFact
@@ -22,27 +24,56 @@ class TextProcessor:
         self.conversation_context = []
 
     def create_experta_facts(self, text: str) -> List[Any]:
-        print(f"\nAnalisando relato (primeiros 100 caracteres): {text[:100]}{'...' if len(text) > 100 else ''}")
+        keywords = self.extract_keywords(text)
+        return self.build_facts(new_relato_id(), keywords)
+
+    def extract_keywords(self, text: str, http=None) -> Dict[str, List[str]]:
+        """
+        Consulta o Groq e retorna apenas as palavras-chave validadas do texto.
 
-        facts = [TextRelato(text=text, processed=True)]
+        http é a sessão HTTP da análise (GroqAPI.send_request).
+        """
+        print(f"\nAnalisando relato (primeiros 100 caracteres): {text[:100]}{'...' if len(text) > 100 else ''}")
 
         try:
-            prompt = self.groq_api.build_prompt(text, KEYWORDS_DICT)
-            response = self.groq_api.send_request(prompt)
+            # Dicionário da versão ativa da base (fixada durante a análise)
+            knowledge_base = active_version()
+            prompt = self.groq_api.build_prompt(
+                text, knowledge_base.keywords_dict, knowledge_base.keyword_descriptions
+            )
+            response = self.groq_api.send_request(prompt, http=http)
 
             keywords = self._extract_keywords_from_response(response)
             self._print_keywords_summary(keywords)
 
-            if keywords:
-                print("\nCriando fatos para o motor de inferência...")
-                self._add_keyword_facts(facts, keywords)
-                print(f"{len(facts)} fatos criados para análise")
-            else:
+            if not keywords:
                 print("Nenhum elemento relevante identificado no texto")
+            return keywords
 
         except Exception as e:
             print(f"Erro durante análise: {str(e)}")
+            return {}
+
+    def build_facts(self, relato_id: str, keywords: Dict[str, List[str]]) -> List[Any]:
+        """
+        Converte o relato e as palavras-chave já extraídas em fatos do Experta.
 
+        O texto do relato não entra na memória de trabalho: o fato TextRelato
+        carrega apenas o identificador (engine.request_context.new_relato_id).
+        """
+        facts = [TextRelato(relato_id=relato_id, processed=True)]
+
+        if keywords:
+            print("\nCriando fatos para o motor de inferência...")
+            self._add_keyword_facts(facts, keywords)
+            print(f"{len(facts)} fatos criados para análise")
+
+        return facts
+
+    def build_keyword_facts(self, keywords: Dict[str, List[str]]) -> List[Any]:
+        """Fatos de palavras-chave (sem TextRelato), para reprocessamento em lote."""
+        facts = []
+        self._add_keyword_facts(facts, keywords)
         return facts
 
     def _extract_keywords_from_response(self, response: Dict) -> Dict:
@@ -84,27 +115,49 @@ class TextProcessor:
                 elif category == "impact":
                     facts.append(ImpactFact(type=keyword))
 
-    # Acabamos não usando esse método, mas deixamos aqui para referência futura
-    def _process_followup(self, follow_up_text: str, previous_keywords: Dict, missing_fields: List[str]) -> Dict[str, Any]:
+    def process_followup(self, follow_up_text: str, previous_keywords: Dict[str, List[str]]) -> Dict[str, Any]:
         """
         Processa resposta de follow-up para complementar informações.
+
+        Extrai palavras-chave apenas do texto novo e retorna somente os fatos
+        que ainda não existiam na sessão, para que o motor propague o delta
+        de forma incremental sem reprocessar o relato original.
         """
         self.conversation_context.append({"role": "user", "content": follow_up_text})
-        prompt = self.groq_api.build_prompt(follow_up_text, KEYWORDS_DICT, is_follow_up=True, missing_fields=missing_fields)
-        response = self.groq_api.send_request(prompt)
+        return self.merge_followup(self.extract_keywords(follow_up_text), previous_keywords)
 
-        combined_keywords = self._combine_keywords(previous_keywords, response.get("identified_keywords", {}))
-        facts = self._extract_facts_from_keywords(combined_keywords)
+    def merge_followup(self, new_keywords: Dict[str, List[str]], previous_keywords: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Como process_followup, com as palavras-chave do follow-up já extraídas."""
+        delta = self._diff_keywords(previous_keywords, new_keywords)
 
-        missing = response.get("missing_information", [])
-        questions = response.get("follow_up_questions", [])
-        missing_critical = any(field in missing for field in ["action_type"])
+        facts = []
+        if delta:
+            self._add_keyword_facts(facts, delta)
+            print(f"{len(facts)} novos fatos criados a partir do follow-up")
+        else:
+            print("Nenhum elemento novo identificado no follow-up")
 
         return {
-            "status": "complete" if not missing_critical else "incomplete",
-            "identified_keywords": combined_keywords,
-            "missing_fields": missing,
-            "questions": questions,
+            "identified_keywords": self._combine_keywords(previous_keywords, delta),
+            "new_keywords": delta,
             "facts": facts
         }
-    
\ No newline at end of file
+
+    def _diff_keywords(self, previous_keywords: Dict[str, List[str]], new_keywords: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        delta = {}
+        for category, values in new_keywords.items():
+            known = set(previous_keywords.get(category, []))
+            fresh = []
+            for keyword in values:
+                if keyword not in known:
+                    known.add(keyword)
+                    fresh.append(keyword)
+            if fresh:
+                delta[category] = fresh
+        return delta
+
+    def _combine_keywords(self, previous_keywords: Dict[str, List[str]], new_keywords: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        combined = {category: list(values) for category, values in previous_keywords.items()}
+        for category, values in new_keywords.items():
+            combined.setdefault(category, []).extend(values)
+        return combined
@@ -28,7 +28,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="interrupcoes_constantes",
             definition="Interromper alguém enquanto fala, especialmente quando é um padrão recorrente direcionado a pessoas de grupos marginalizados.",
             keywords=["interromper", "cortar fala", "silenciar", "não deixar falar"],
@@ -36,7 +36,7 @@ class ViolenceTypeFactory:
             severity_score=2
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="questionar_julgamento",
             definition="Sempre questionar julgamentos mesmo que válidos.",
             keywords=["duvidar", "contestar", "questionar capacidade"],
@@ -44,7 +44,7 @@ class ViolenceTypeFactory:
             severity_score=2
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="comentarios_saude_mental",
             definition="Comentários sobre estado de saúde mental ou emocional utilizados para diminuir ou deixar a pessoa desconfortável.",
             keywords=["histérico", "emocional", "sensível", "exagerado"],
@@ -52,7 +52,7 @@ class ViolenceTypeFactory:
             severity_score=3
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="estereotipos",
             definition="Insultos, comentários e piadas sobre estereótipos que a pessoa se encontra.",
             keywords=["piada", "brincadeira", "zoação", "estereótipo"],
@@ -99,7 +99,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="assedio_sexual",
             definition="Condutas de natureza sexual, não consentidas, que causam constrangimento e prejuízo à dignidade, intimidade, privacidade, honra e liberdade sexual.",
             keywords=["natureza sexual", "não consentida", "constrangimento"],
@@ -115,7 +115,7 @@ class ViolenceTypeFactory:
             severity_score=7
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="importunacao_sexual",
             definition="Praticar ato obsceno contra alguém sem consentimento, para satisfazer impulso sexual ou humilhar/intimidar.",
             keywords=["ato obsceno", "sem consentimento", "impulso sexual"],
@@ -131,7 +131,7 @@ class ViolenceTypeFactory:
             severity_score=8
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="estupro",
             definition="Constranger alguém por meio de violência ou ameaças a atos sexuais, ou envolver-se sexualmente com quem não pode consentir (alcoolizada/dormindo).",
             keywords=["constranger", "violência", "ameaças", "sem consentimento"],
@@ -172,7 +172,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="discriminacao_flagrante",
             definition="Acontece de forma aberta através de ações, discursos que defendem práticas discriminatórias.",
             keywords=["explícita", "aberta", "discurso discriminatório"],
@@ -180,7 +180,7 @@ class ViolenceTypeFactory:
             severity_score=5
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="discriminacao_sutil",
             definition="A mais comum. Acontece através de comportamentos insidiosos e naturalizados cujo propósito discriminatório é mantido oculto.",
             keywords=["sutil", "insidioso", "naturalizado", "oculto"],
@@ -254,7 +254,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="barreiras_fisicas",
             definition="Obstáculos estruturais ou arquitetônicos que impedem o acesso e a mobilidade de pessoas com deficiência.",
             keywords=["barreira arquitetônica", "falta de rampa", "acesso físico"],
@@ -262,7 +262,7 @@ class ViolenceTypeFactory:
             severity_score=5
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="barreiras_atitudinais",
             definition="Comportamentos discriminatórios, estereótipos e preconceitos que diminuem as capacidades da pessoa com deficiência.",
             keywords=["pena", "incapaz", "superproteção", "infantilização"],
@@ -291,7 +291,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="cyberbullying",
             definition="Intimidação sistemática em ambiente digital, usando textos, fotos ou vídeos para humilhar ou ameaçar.",
             keywords=["intimidar online", "humilhação digital", "perseguição virtual"],
@@ -307,7 +307,7 @@ class ViolenceTypeFactory:
             severity_score=5
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="exposicao_nao_consentida",
             definition="Compartilhamento de imagens, vídeos ou informações privadas sem consentimento.",
             keywords=["revenge porn", "vazamento", "compartilhar fotos íntimas"],
@@ -347,7 +347,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="ofensa_direta",
             definition="Insultos, desrespeito ou ridicularização explícita de símbolos, práticas ou crenças religiosas.",
             keywords=["insulto religioso", "zombar de religião", "ridicularizar crença"],
@@ -355,7 +355,7 @@ class ViolenceTypeFactory:
             severity_score=4
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="discriminacao_institucional",
             definition="Políticas ou práticas que dificultam ou impedem a observância de preceitos religiosos.",
             keywords=["impedimento de prática", "negação de direito religioso"],
@@ -409,7 +409,7 @@ class ViolenceTypeFactory:
         )
         
         # Subtipos
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="ofensa_direta",
             definition="Insultos, piadas e comentários depreciativos explícitos relacionados à raça/etnia.",
             keywords=["insulto racial", "xingamento", "ofensa"],
@@ -417,7 +417,7 @@ class ViolenceTypeFactory:
             severity_score=7
         ))
         
-        main_type.add_subtype(ViolenceSubtype(
+        main_type = main_type.with_subtype(ViolenceSubtype(
             name="discriminacao_estrutural",
             definition="Exclusão sistemática e barreiras baseadas em raça/etnia.",
             keywords=["exclusão", "barreira", "tratamento diferenciado"],
@@ -0,0 +1,81 @@
+"""
+Impressões digitais do conteúdo da base de conhecimento.
+
+Cada componente (dicionário de palavras-chave, descrições, mapeamento de
+conceitos e dos conceitos para categorias, VIOLENCE_TYPES e gravidades da
+instituição) recebe um sha1 do seu conteúdo em JSON canônico, e a combinação
+deles identifica a base inteira. Tudo o que a matriz de pesos lê para
+ranquear os resultados está coberto. Diferente do
+digest das fontes (versioning.source_digest), mudanças que não alteram os dados,
+como comentários ou formatação, não mudam a impressão digital.
+
+São calculadas uma vez por versão da base e instituição, então comparar a
+impressão digital de um cache ou de um resultado gravado é O(1).
+"""
+import hashlib
+import json
+from collections.abc import Mapping as MappingABC
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from .institutions import DEFAULT_INSTITUTION
+from .versioning import active_version
+from .violence_manager import get_violence_manager, get_violence_types
+
+# Tamanho em hexadecimal, o mesmo da versão da base de regras
+FINGERPRINT_LENGTH = 12
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, MappingABC):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def content_fingerprint(value: Any) -> str:
+    """sha1 (abreviado) do conteúdo de value em JSON canônico."""
+    data = json.dumps(_canonical(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def combine_fingerprints(fingerprints: Mapping[str, str]) -> str:
+    """Impressão digital combinada, independente da ordem dos componentes."""
+    return content_fingerprint(dict(fingerprints))
+
+
+def _severity_scores(institution: str) -> Mapping[str, int]:
+    # Pontuações numéricas, como a matriz de pesos as usa (a escala vem do modelo)
+    scores = {}
+    for vtype_name, vtype in get_violence_manager(institution).get_all_violence_types().items():
+        scores[vtype_name] = vtype.get_severity_score(None)
+        for subtype_name in vtype.subtypes:
+            scores[f"{vtype_name}/{subtype_name}"] = vtype.get_severity_score(subtype_name)
+    return scores
+
+
+def _build_fingerprints(institution: str) -> Mapping[str, str]:
+    version = active_version()
+    fingerprints = {
+        "keywords": content_fingerprint(version.keywords_dict),
+        "descriptions": content_fingerprint(version.keyword_descriptions),
+        "concept_mapping": content_fingerprint(version.concept_mapping),
+        "concept_to_field": content_fingerprint(version.concept_to_field),
+        "violence_types": content_fingerprint(get_violence_types(institution)),
+        "severity": content_fingerprint(_severity_scores(institution)),
+    }
+    fingerprints["knowledge_base"] = combine_fingerprints(fingerprints)
+    return MappingProxyType(fingerprints)
+
+
+def get_fingerprints(institution: str = DEFAULT_INSTITUTION) -> Mapping[str, str]:
+    """
+    Impressões digitais da versão ativa da base: uma por componente e a
+    combinada em "knowledge_base".
+    """
+    return active_version().derived(("fingerprints", institution), lambda: _build_fingerprints(institution))
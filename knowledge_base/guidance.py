@@ -0,0 +1,74 @@
+"""
+Tabela de orientações por classificação.
+
+Para cada (tipo, subtipo) da base, e para cada tipo com subtipo "", guarda a
+definição, o contexto legal, a gravidade, as recomendações e os canais de
+denúncia já resolvidos: o que o subtipo não define (ou deixa vazia, no caso
+da definição) vem do tipo. A tabela é
+montada uma vez por versão da base e instituição, então a orientação
+completa de uma classificação custa uma consulta ao dicionário.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+from .institutions import DEFAULT_INSTITUTION
+from .versioning import active_version
+from .violence_manager import get_violence_types
+
+
+@dataclass(frozen=True)
+class Guidance:
+    """Orientação de um tipo (subtype == "") ou subtipo de violência."""
+    violence_type: str
+    subtype: str = ""
+    name: str = ""
+    definition: str = ""
+    legal_context: str = ""
+    severity: str = ""
+    recommendations: Tuple[str, ...] = ()
+    reporting_channels: Tuple[str, ...] = ()
+
+
+def _resolve(violence_type: str, subtype: str, info: Mapping, parent: Mapping) -> Guidance:
+    return Guidance(
+        violence_type=violence_type,
+        subtype=subtype,
+        name=parent.get('nome', violence_type.replace('_', ' ').title()),
+        definition=info.get('definicao') or parent.get('definicao', ''),
+        legal_context=info.get('contexto_legal', parent.get('contexto_legal', '')),
+        severity=info.get('gravidade', parent.get('gravidade', '')),
+        recommendations=tuple(info.get('recomendacoes', parent.get('recomendacoes', ()))),
+        reporting_channels=tuple(info.get('canais_denuncia', parent.get('canais_denuncia', ()))),
+    )
+
+
+def build_guidance_table(violence_types: Mapping[str, Mapping]) -> Mapping[Tuple[str, str], Guidance]:
+    """Tabela (tipo, subtipo) → Guidance a partir de VIOLENCE_TYPES."""
+    table = {}
+    for vtype_name, info in violence_types.items():
+        table[(vtype_name, "")] = _resolve(vtype_name, "", info, info)
+        for subtype_name, subtype_info in info.get('subtipos', {}).items():
+            table[(vtype_name, subtype_name)] = _resolve(vtype_name, subtype_name, subtype_info, info)
+    return MappingProxyType(table)
+
+
+def get_guidance_table(institution: str = DEFAULT_INSTITUTION) -> Mapping[Tuple[str, str], Guidance]:
+    return active_version().derived(
+        ("guidance", institution), lambda: build_guidance_table(get_violence_types(institution))
+    )
+
+
+def get_guidance(violence_type: str, subtype: str = None,
+                 institution: str = DEFAULT_INSTITUTION) -> Guidance:
+    """
+    Orientação de (tipo, subtipo). Subtipo ausente ou desconhecido devolve a
+    do tipo; tipo desconhecido devolve uma orientação vazia.
+    """
+    table = get_guidance_table(institution)
+    guidance = table.get((violence_type, subtype or ""))
+    if guidance is None:
+        guidance = table.get((violence_type, ""))
+    if guidance is None:
+        guidance = Guidance(violence_type)
+    return guidance
@@ -0,0 +1,34 @@
+"""
+Sobreposições por instituição sobre a base de conhecimento compartilhada.
+
+Cada instituição atendida pela implantação declara apenas o que difere da
+base: contatos dos canais de denúncia, recomendações e subtipos extras. A
+base é montada uma vez por processo e compartilhada; ver
+violence_manager.get_violence_manager(institution).
+"""
+from .models.institution import InstitutionOverlay
+from .models.violence_type import ReportChannel
+
+UFAPE = InstitutionOverlay(
+    name="ufape",
+    report_channels={
+        "Ouvidoria": ReportChannel(
+            name="Ouvidoria",
+            description="Órgão responsável por receber denúncias e encaminhá-las.",
+            contact="ouvidoria@ufape.edu.br",
+            procedure="Enviar e-mail ou comparecer pessoalmente."
+        ),
+        "Comissao_Etica": ReportChannel(
+            name="Comissão de Ética",
+            description="Responsável por analisar casos de violação ética.",
+            contact="etica@ufape.edu.br",
+            procedure="Enviar denúncia formal por escrito."
+        ),
+    }
+)
+
+INSTITUTIONS = {
+    UFAPE.name: UFAPE,
+}
+
+DEFAULT_INSTITUTION = UFAPE.name
@@ -1,3 +1,10 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .normalization import normalize_term
+from .versioning import active_version
+
 # Cria um dicionario de aliases para imprimir no main
 
 KEYWORD_ALIASES = {
@@ -96,13 +103,256 @@ KEYWORD_ALIASES = {
     "comportamento": "comportamento",
 }
 
+def _normalized_aliases() -> dict:
+    # Os aliases da versão ativa da base, que pode ter sido recarregada
+    version = active_version()
+    return version.derived("normalized_aliases", lambda: _normalize_aliases(version.keyword_aliases))
+
+def _normalize_aliases(keyword_aliases: dict) -> dict:
+    aliases = {}
+    for keyword, alias in keyword_aliases.items():
+        aliases.setdefault(normalize_term(keyword), alias)
+    return aliases
+
+def _alias_pattern(keyword: str) -> str:
+    # Boundary para palavras com letras/números, ou posição para caracteres especiais
+    if keyword.replace("_", "").isalnum():
+        return rf'\b{re.escape(keyword)}\b'
+    return re.escape(keyword)
+
+# Caracteres fora do ASCII que o re, sem distinção de caixa, iguala a letras
+# ASCII ("K" de Kelvin e "k", "ſ" e "s", "İ" e "ı" e "i"). Todos são letras e
+# viram uma letra, então o texto dobrado tem o mesmo tamanho e as mesmas
+# fronteiras de palavra que o original.
+_ASCII_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+_FOLDED_CHARS = re.compile("[İıſK]")
+_WORD_CHAR = re.compile(r'\w')
+
+def _fold(text: str) -> str:
+    # translate é lento fora do ASCII; quase nenhum texto tem esses caracteres
+    if text.isascii() or _FOLDED_CHARS.search(text) is None:
+        return text
+    return text.translate(_ASCII_FOLD)
+
+def _is_word(char: str) -> bool:
+    return _WORD_CHAR.match(char) is not None
+
+def _trie_pattern(words: List[str]) -> str:
+    """Alternação das palavras fatorada por prefixo: o re testa só o ramo da letra atual."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and "" not in node else f"(?:{'|'.join(branches)})"
+        # O ? é guloso: a palavra mais longa é tentada primeiro
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+def _spans(text: str, keyword: str) -> List[Tuple[str, str]]:
+    """
+    Contextos (antes, depois), em minúsculas, em que keyword casaria cruzando
+    uma das bordas de text: o texto vizinho terminado em antes e começado em
+    depois.
+    """
+    text, keyword = _fold(text).lower(), keyword.lower()
+    contexts = []
+    for size in range(1, min(len(text), len(keyword) - 1) + 1):
+        if text.endswith(keyword[:size]):
+            contexts.append(("", keyword[size:]))
+        if text.startswith(keyword[-size:]):
+            contexts.append((keyword[:-size], ""))
+    start = keyword.find(text, 1) if text else -1
+    while 0 < start < len(keyword) - len(text):
+        contexts.append((keyword[:start], keyword[start + len(text):]))
+        start = keyword.find(text, start + 1)
+    return contexts
+
+def _continues(folded: str, start: int, end: int, context: Tuple[str, str],
+               previous: int, following: int) -> bool:
+    """
+    True se o texto em volta da ocorrência [start, end) pode completar o
+    contexto. Até as ocorrências vizinhas (previous, following) o texto é o
+    original; o que passa delas já terá virado alias na sequência, então
+    conta como possível. O começo e o fim do texto encerram o contexto.
+    """
+    before, after = context
+    visible = folded[max(start - len(before), previous):start].lower()
+    if not before.endswith(visible) or (previous == 0 and len(visible) < len(before)):
+        return False
+    visible = folded[end:min(end + len(after), following)].lower()
+    return after.startswith(visible) and (following < len(folded) or len(visible) == len(after))
+
+class AliasReplacer:
+    """
+    Substitui palavras-chave pelos aliases com uma única expressão compilada.
+
+    Equivale a aplicar um re.sub (sem distinção de caixa) por alias, das
+    palavras-chave mais longas para as mais curtas. Todas as palavras-chave
+    entram em uma alternação (as com boundary fatoradas por prefixo), o texto
+    é percorrido uma vez e cada ocorrência recebe o alias já com as
+    substituições seguintes da sequência aplicadas.
+
+    A passada única só difere da sequência quando ocorrências se sobrepõem ou
+    se encostam, ou quando o alias, junto com o texto vizinho, forma outra
+    palavra-chave. A montagem registra onde isso pode acontecer e a linha em
+    que acontece passa pela sequência de re.sub.
+
+    As mesmas linhas de explicação voltam a cada rerun do Streamlit, então o
+    resultado por linha também fica guardado (até LINE_CACHE_SIZE linhas).
+    """
+
+    LINE_CACHE_SIZE = 2048
+
+    def __init__(self, keyword_aliases: dict):
+        # Mais longas primeiro; empates mantêm a ordem da tabela
+        ordered = sorted(keyword_aliases.items(), key=lambda item: len(item[0]), reverse=True)
+        self._sequence = [(re.compile(_alias_pattern(keyword), re.IGNORECASE), alias) for keyword, alias in ordered]
+        self._cached = lru_cache(maxsize=self.LINE_CACHE_SIZE)(self._apply)
+
+        # Fora do ASCII as equivalências de caixa do re não se reduzem a lower()
+        self._pattern = None
+        if not ordered or not all(keyword and keyword.isascii() for keyword, _ in ordered):
+            return
+
+        self._bounded = [_alias_pattern(keyword).startswith(r'\b') for keyword, _ in ordered]
+        self._index: Dict[str, int] = {}
+        for index, (keyword, _) in enumerate(ordered):
+            self._index.setdefault(keyword.lower(), index)
+
+        # Alias encadeado e contextos em que uma palavra-chave seguinte
+        # cruzaria a sua borda; alias None manda a linha para a sequência
+        chained = [self._chained_alias(index, ordered) for index in range(len(ordered))]
+        self._aliases = [alias for alias, _ in chained]
+        self._contexts = [contexts for _, contexts in chained]
+
+        # Duas palavras-chave que casam na mesma posição: a alternação escolhe
+        # uma, a sequência aplica a mais longa primeiro
+        for index, (keyword, _) in enumerate(ordered):
+            for other, (prefix, _) in enumerate(ordered):
+                if len(prefix) < len(keyword) and keyword.lower().startswith(prefix.lower()) and (
+                    not self._bounded[other] or not _is_word(keyword[len(prefix)])
+                ):
+                    self._aliases[index] = self._aliases[other] = None
+
+        # Palavras-chave anteriores na sequência que podem começar dentro de
+        # uma ocorrência: (padrão, tamanho do trecho em comum). Entre duas com
+        # boundary não acontece, as duas seriam a mesma palavra do texto
+        self._inner_starts: List[List[Tuple[re.Pattern, int]]] = [[] for _ in ordered]
+        for index, (keyword, _) in enumerate(ordered):
+            for earlier, (other, _) in enumerate(ordered[:index]):
+                if self._bounded[index] and self._bounded[earlier]:
+                    continue
+                for size in range(1, min(len(keyword), len(other) + 1)):
+                    if keyword[-size:].lower() == other[:size].lower():
+                        self._inner_starts[index].append((self._sequence[earlier][0], size))
+
+        # Palavras-chave que pedem alguma verificação do texto em volta
+        self._guarded = [bool(starts or contexts) for starts, contexts in zip(self._inner_starts, self._contexts)]
+
+        unbounded = [re.escape(keyword) for (keyword, _), flag in zip(ordered, self._bounded) if not flag]
+        words = [keyword.lower() for (keyword, _), flag in zip(ordered, self._bounded) if flag]
+        # A classe das primeiras letras na frente deixa o re pular direto
+        # para as posições candidatas
+        first_letters = "".join(sorted({re.escape(keyword[0].lower()) for keyword, _ in ordered}))
+        self._pattern = re.compile(
+            f"(?=[{first_letters}])(?:"
+            + "|".join(unbounded + ([rf'\b{_trie_pattern(words)}\b'] if words else []))
+            + ")",
+            re.IGNORECASE
+        )
+
+    def _chained_alias(self, index: int, ordered: list) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        keyword, alias = ordered[index]
+        contexts: List[Tuple[str, str]] = []
+        # Modelos do re.sub (grupos, escapes) dependem do texto casado; um
+        # alias vazio junta os vizinhos
+        if not alias or "\\" in alias:
+            return None, contexts
+        # Em _apply a ocorrência fica isolada: vizinhos que não são letras e
+        # fora de outras ocorrências. Casar na borda do alias isolado é então
+        # o mesmo que casar no texto, e só palavras-chave sem boundary podem
+        # cruzar a borda
+        for later in range(index + 1, len(ordered)):
+            pattern, later_alias = self._sequence[later]
+            if not self._bounded[later]:
+                contexts.extend(_spans(alias, ordered[later][0]))
+            alias = pattern.sub(later_alias, alias)
+        return alias, contexts
+
+    def __call__(self, text: str) -> str:
+        return self._cached(text)
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+
+    def _apply(self, text: str) -> str:
+        if self._pattern is None:
+            return self._apply_sequence(text)
+        folded = _fold(text)
+        matches = list(self._pattern.finditer(folded))
+        if not matches:
+            return text
+
+        parts = []
+        position = 0
+        length = len(folded)
+        for number, match in enumerate(matches, 1):
+            start, end = match.span()
+            following = matches[number].start() if number < len(matches) else length
+            index = self._index[match.group().lower()]
+            alias = self._aliases[index]
+            # Ocorrências encostadas: o alias de uma muda a fronteira da outra
+            if alias is None or (start == position and number > 1) or (end == following and following < length):
+                return self._apply_sequence(text)
+            # Sem boundary a ocorrência pode estar no meio de uma palavra
+            if not self._bounded[index] and (
+                (start > 0 and _is_word(folded[start - 1])) or (end < length and _is_word(folded[end]))
+            ):
+                return self._apply_sequence(text)
+            if self._guarded[index] and self._crossed(folded, index, start, end, position, following):
+                return self._apply_sequence(text)
+            parts.append(text[position:start])
+            parts.append(alias)
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _crossed(self, folded: str, index: int, start: int, end: int, previous: int, following: int) -> bool:
+        """True se outra palavra-chave pode casar sobre a ocorrência ou a borda do alias."""
+        return any(
+            pattern.match(folded, end - size) for pattern, size in self._inner_starts[index]
+        ) or any(
+            _continues(folded, start, end, context, previous, following) for context in self._contexts[index]
+        )
+
+    def _apply_sequence(self, text: str) -> str:
+        for pattern, alias in self._sequence:
+            text = pattern.sub(alias, text)
+        return text
+
+def get_alias_replacer() -> AliasReplacer:
+    """Substituidor compilado para os aliases da versão ativa da base."""
+    version = active_version()
+    return version.derived("alias_replacer", lambda: AliasReplacer(version.keyword_aliases))
+
 def get_keyword_alias(keyword: str) -> str:
     """
     Retorna o alias amigável para uma palavra-chave.
+    Aceita variações de caixa, acento e separador ("Ameaça" → "ameaca").
     Se não houver alias, retorna a palavra-chave formatada.
     """
-    if keyword in KEYWORD_ALIASES:
-        return KEYWORD_ALIASES[keyword]
+    alias = _normalized_aliases().get(normalize_term(keyword))
+    if alias is not None:
+        return alias
     
     # Fallback: formatar a palavra-chave removendo underscores e capitalizando
     return keyword.replace("_", " ").title()
@@ -0,0 +1,94 @@
+"""
+Índice invertido das palavras-chave da base de conhecimento.
+
+Uma palavra da consulta casa com um tipo (ou subtipo) quando é substring de
+alguma das palavras-chave dele. Em vez de varrer todos os tipos e subtipos a
+cada consulta, o índice guarda, uma vez por base:
+
+- o vocabulário de palavras-chave distintas, normalizadas (normalization.py);
+- trigramas → palavras do vocabulário que os contêm;
+- palavra do vocabulário → entradas (tipo, subtipo) que a declaram.
+
+Os candidatos de uma consulta são a interseção das listas de seus trigramas,
+confirmados com o teste de substring original; consultas com menos de três
+letras percorrem só o vocabulário.
+"""
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models.violence_type import ViolenceType
+from .normalization import normalize_term
+
+NGRAM = 3
+
+Entry = Tuple[str, Optional[str]]
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class KeywordIndex:
+    """Busca por palavras-chave em tempo proporcional à consulta."""
+
+    def __init__(self, violence_types: Dict[str, ViolenceType]):
+        # Entradas na ordem de varredura da busca original (tipo, depois subtipos)
+        self.entries: List[Entry] = []
+        self.vocabulary: List[str] = []
+        self.postings: List[Set[int]] = []
+        self.ngrams: Dict[str, Set[int]] = {}
+        vocabulary_index: Dict[str, int] = {}
+
+        def _add(entry: Entry, keywords: List[str]):
+            entry_id = len(self.entries)
+            self.entries.append(entry)
+            for keyword in keywords:
+                keyword = normalize_term(keyword)
+                word_id = vocabulary_index.get(keyword)
+                if word_id is None:
+                    word_id = vocabulary_index[keyword] = len(self.vocabulary)
+                    self.vocabulary.append(keyword)
+                    self.postings.append(set())
+                    for ngram in _ngrams(keyword):
+                        self.ngrams.setdefault(ngram, set()).add(word_id)
+                self.postings[word_id].add(entry_id)
+
+        for vtype_name, vtype in violence_types.items():
+            _add((vtype_name, None), vtype.keywords)
+            for subtype_name, subtype in vtype.subtypes.items():
+                _add((vtype_name, subtype_name), subtype.keywords)
+
+    def _matching_words(self, query: str) -> List[int]:
+        grams = _ngrams(query)
+        if not grams:
+            return [word_id for word_id, word in enumerate(self.vocabulary) if query in word]
+
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.ngrams.get(g, ()))):
+            words = self.ngrams.get(gram)
+            if not words:
+                return []
+            candidates = set(words) if candidates is None else candidates & words
+            if not candidates:
+                return []
+        return [word_id for word_id in candidates if query in self.vocabulary[word_id]]
+
+    def matching_entries(self, query: str) -> Set[int]:
+        """Entradas com alguma palavra-chave que contém query (já normalizada)."""
+        entries = set()
+        for word_id in self._matching_words(query):
+            entries |= self.postings[word_id]
+        return entries
+
+    def search(self, keywords: List[str]) -> List[tuple]:
+        """
+        Tuplas (tipo, subtipo ou None, número de palavras da consulta que
+        casaram), da mais relevante para a menos, empates na ordem da base.
+        Consulta e base são comparadas na forma normalizada.
+        """
+        counts: Dict[int, int] = {}
+        for keyword in keywords:
+            for entry_id in self.matching_entries(normalize_term(keyword)):
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(*self.entries[entry_id], matches) for entry_id, matches in ranked]
@@ -1,5 +1,4 @@
-from knowledge_base.violence_types import VIOLENCE_TYPES, CRITERION_WEIGHTS
-from typing import Dict, List
+from knowledge_base import violence_types
 from knowledge_base.violence_types import CRITERION_WEIGHTS
 from typing import Dict, List
 
@@ -303,9 +302,19 @@ CONCEPT_MAPPING = {
     }
 }
 
+# Mapeamento entre categorias de conceito e campos de formulário
+CONCEPT_TO_FIELD = {
+    "comportamentos": "action_type",
+    "frequencia": "frequency",
+    "contexto": "context",
+    "caracteristicas_alvo": "target",
+    "relacionamento": "relationship",
+    "impacto": "impact"
+}
+
 KEYWORD_DESCRIPTIONS = {
     # action_type
-    "interrupcao": "Identificada quando há dúvidas explícitas sobre a competência da pessoa baseadas em características pessoais",
+    "interrupcao": "Identificada quando há padrão de cortar a fala de alguém de forma repetitiva.",
     "questionamento_capacidade": "Identificada quando há comentários ou questionamentos sobre a capacidade de alguém.",
     "comentarios_saude_mental": "Identificada quando há comentários ou piadas sobre a saúde mental de alguém.",
     "piadas_estereotipos": "Identificada quando há piadas ou comentários que reforçam estereótipos negativos.",
@@ -320,6 +329,7 @@ KEYWORD_DESCRIPTIONS = {
     "ato_obsceno": "Identificada quando há comportamentos ou expressões obscenas.",
     "coercao_sexual": "Identificada quando a vitima é claramente forçada a ter relações sexuais, ou seja, um estupro.",
     "comentarios_sobre_peso": "Identificada quando há comentários negativos ou piadas sobre o peso de alguém.",
+    "exclusao_por_peso": "Identificada quando alguém é excluído ou deixado de lado por causa do seu peso.",
     "negacao_acessibilidade": "Identificada quando há barreiras físicas ou atitudinais que impedem o acesso de pessoas com deficiência.",
     "infantilizacao": "Identificada quando alguém é tratado de forma condescendente ou infantilizada.",
     "cyberbullying": "Identificada quando há comportamentos de bullying online.",
@@ -385,7 +395,7 @@ def extract_keywords_from_violence_types() -> dict:
         if items:
             target_set.update(items)
 
-    for vtype_data in VIOLENCE_TYPES.values():
+    for vtype_data in violence_types.VIOLENCE_TYPES.values():
         # Tipo principal
         _add_keywords(keywords["action_type"], vtype_data.get("palavras_chave"))
         # Subtipos
@@ -409,19 +419,9 @@ def extract_keywords_from_concept_mapping():
         "impact": []
     }
     
-    # Mapeamento entre categorias de conceito e campos de formulário
-    concept_to_field = {
-        "comportamentos": "action_type",
-        "frequencia": "frequency",
-        "contexto": "context",
-        "caracteristicas_alvo": "target",
-        "relacionamento": "relationship",
-        "impacto": "impact"
-    }
-    
     # Extrair chaves como palavras-chave
     for concept, mappings in CONCEPT_MAPPING.items():
-        field = concept_to_field.get(concept)
+        field = CONCEPT_TO_FIELD.get(concept)
         if field and field in keywords:
             keywords[field].extend(mappings.keys())
     
@@ -445,7 +445,7 @@ def build_keywords_dictionary():
         ],
         "frequency": [
             "unica_vez", "algumas_vezes", "repetidamente", "continuamente"
-        ],"interrupcao": "Identificada quando há padrão de cortar a fala de alguém de forma repetitiva",
+        ],
         "context": [
             "sala_aula", "ambiente_administrativo", "local_trabalho",
             "espaco_publico_campus", "ambiente_online", "evento_academico",
@@ -469,4 +469,18 @@ def build_keywords_dictionary():
     return keywords
 
 # Construir e exportar o dicionário de palavras-chave
-KEYWORDS_DICT = build_keywords_dictionary()
\ No newline at end of file
+KEYWORDS_DICT = build_keywords_dictionary()
+
+# Divergências conhecidas entre KEYWORDS_DICT e CONCEPT_MAPPING, aceitas pela
+# verificação do vocabulário (knowledge_base/vocabulary.py); qualquer outra
+# divergência impede a montagem da base.
+# Palavras-chave oferecidas ao Groq que só as regras usam, sem peso no ranking
+UNWEIGHTED_KEYWORDS = {
+    "action_type": ["comentarios_sobre_peso", "exclusao_por_peso", "insulto", "insulto_racial"],
+}
+# Conceitos com peso no ranking que ainda não são oferecidos ao Groq
+UNOFFERED_CONCEPTS = {
+    "action_type": ["mensagens_ofensivas", "vigilancia"],
+    "context": ["redes_sociais"],
+    "impact": ["exposicao_indesejada"],
+}
\ No newline at end of file
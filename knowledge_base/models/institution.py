@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import Mapping, Optional, Tuple
+
+from .violence_type import ViolenceSubtype, ReportChannel
+
+
+@dataclass(frozen=True)
+class InstitutionOverlay:
+    """
+    Diferenças de uma instituição em relação à base compartilhada.
+
+    report_channels acrescenta ou substitui canais pelo identificador;
+    recommendations substitui as recomendações de (tipo, subtipo ou None);
+    extra_subtypes acrescenta subtipos a um tipo existente.
+    """
+    name: str
+    report_channels: Mapping[str, ReportChannel] = field(default_factory=dict)
+    recommendations: Mapping[Tuple[str, Optional[str]], Tuple[str, ...]] = field(default_factory=dict)
+    extra_subtypes: Mapping[str, Tuple[ViolenceSubtype, ...]] = field(default_factory=dict)
@@ -0,0 +1,113 @@
+"""
+Visões no formato de dicionário sobre os modelos da base de conhecimento.
+
+VIOLENCE_TYPES e REPORT_CONTACT expõem as chaves em português usadas pelo
+restante do sistema ("definicao", "subtipos", "contato", ...), mas não copiam
+os dados: cada visão lê os campos do modelo congelado correspondente.
+Chaves opcionais só aparecem quando o campo tem valor, como no formato
+original em dicionários.
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .violence_type import ViolenceType
+
+_MISSING = object()
+
+
+class _ModelView(Mapping):
+    """Mapeia chaves do formato de dicionário para campos do modelo."""
+
+    __slots__ = ("_model",)
+
+    # (chave, atributo, sempre presente)
+    KEYS = ()
+
+    def __init__(self, model):
+        self._model = model
+
+    def _value(self, attribute):
+        return getattr(self._model, attribute)
+
+    def _lookup(self, key):
+        for name, attribute, required in self.KEYS:
+            if name == key:
+                value = self._value(attribute)
+                return value if required or value else _MISSING
+        return _MISSING
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for name, attribute, required in self.KEYS:
+            if required or self._value(attribute):
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class SubtypeView(_ModelView):
+    __slots__ = ()
+
+    KEYS = (
+        ("definicao", "definition", True),
+        ("palavras_chave", "keywords", True),
+        ("comportamentos", "behaviors", False),
+        ("gravidade", "severity_value", False),
+        ("canais_denuncia", "report_channels", False),
+        ("recomendacoes", "recommendations", False),
+    )
+
+    def _value(self, attribute):
+        if attribute == "severity_value":
+            severity = self._model.severity
+            return severity.value if severity else None
+        return getattr(self._model, attribute)
+
+
+class ViolenceTypeView(_ModelView):
+    __slots__ = ("_subtypes",)
+
+    KEYS = (
+        ("nome", "display_name", True),
+        ("definicao", "definition", True),
+        ("gravidade", "severity_value", True),
+        ("palavras_chave", "keywords", True),
+        ("canais_denuncia", "report_channels", True),
+        ("recomendacoes", "recommendations", True),
+        ("alvos_comuns", "common_targets", False),
+        ("subtipos", "subtype_views", False),
+    )
+
+    def __init__(self, model: ViolenceType):
+        super().__init__(model)
+        self._subtypes = MappingProxyType({
+            name: SubtypeView(subtype) for name, subtype in model.subtypes.items()
+        })
+
+    def _value(self, attribute):
+        if attribute == "display_name":
+            return self._model.name.replace('_', ' ').title()
+        if attribute == "severity_value":
+            return self._model.severity.value
+        if attribute == "subtype_views":
+            return self._subtypes
+        return getattr(self._model, attribute)
+
+
+class ReportChannelView(_ModelView):
+    __slots__ = ()
+
+    KEYS = (
+        ("descricao", "description", True),
+        ("contato", "contact", True),
+        ("procedimento", "procedure", True),
+    )
@@ -1,5 +1,7 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+import sys
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
 from enum import Enum
 
 
@@ -13,40 +15,95 @@ class Severity(Enum):
     GRAVISSIMA = "gravissima"
 
 
-@dataclass
+def _interned(values) -> Tuple[str, ...]:
+    # Tuplas já vêm de outro modelo (replace, sobreposições): reaproveitar
+    if isinstance(values, tuple):
+        return values
+    return tuple(sys.intern(value) for value in values)
+
+
+def _model(cls):
+    """
+    Dataclass congelada com __slots__ (sem __dict__ por instância).
+
+    Equivale a dataclass(frozen=True, slots=True), que só existe a partir do
+    Python 3.10.
+    """
+    cls = dataclass(frozen=True)(cls)
+    names = tuple(item.name for item in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+
+    def __getstate__(self):
+        return [
+            dict(value) if isinstance(value, MappingProxyType) else value
+            for value in (getattr(self, name) for name in names)
+        ]
+
+    def __setstate__(self, state):
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+        self.__post_init__()
+
+    namespace["__getstate__"] = __getstate__
+    namespace["__setstate__"] = __setstate__
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_model
 class ViolenceSubtype:
     """Representa um subtipo de violência."""
     name: str
     definition: str
-    keywords: List[str] = field(default_factory=list)
-    behaviors: List[str] = field(default_factory=list)
+    keywords: Tuple[str, ...] = ()
+    behaviors: Tuple[str, ...] = ()
     severity: Optional[Severity] = None
-    report_channels: List[str] = field(default_factory=list)
-    recommendations: List[str] = field(default_factory=list)
+    report_channels: Tuple[str, ...] = ()
+    recommendations: Tuple[str, ...] = ()
     severity_score: int = 0
 
+    def __post_init__(self):
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "keywords", _interned(self.keywords))
+        object.__setattr__(self, "behaviors", _interned(self.behaviors))
+        object.__setattr__(self, "report_channels", _interned(self.report_channels))
+        object.__setattr__(self, "recommendations", tuple(self.recommendations))
+
 
-@dataclass
+@_model
 class ViolenceType:
     """Representa um tipo principal de violência."""
     name: str
     definition: str
     severity: Severity
-    keywords: List[str] = field(default_factory=list)
-    common_targets: List[str] = field(default_factory=list)
-    report_channels: List[str] = field(default_factory=list)
-    recommendations: List[str] = field(default_factory=list)
-    subtypes: Dict[str, ViolenceSubtype] = field(default_factory=dict)
+    keywords: Tuple[str, ...] = ()
+    common_targets: Tuple[str, ...] = ()
+    report_channels: Tuple[str, ...] = ()
+    recommendations: Tuple[str, ...] = ()
+    subtypes: Mapping[str, ViolenceSubtype] = field(default_factory=dict)
     severity_score: int = 0
 
-    def add_subtype(self, subtype: ViolenceSubtype) -> None:
-        self.subtypes[subtype.name] = subtype
+    def __post_init__(self):
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "keywords", _interned(self.keywords))
+        object.__setattr__(self, "common_targets", tuple(self.common_targets))
+        object.__setattr__(self, "report_channels", _interned(self.report_channels))
+        object.__setattr__(self, "recommendations", tuple(self.recommendations))
+        if not isinstance(self.subtypes, MappingProxyType):
+            object.__setattr__(self, "subtypes", MappingProxyType(dict(self.subtypes)))
+
+    def with_subtype(self, subtype: ViolenceSubtype) -> "ViolenceType":
+        """Cópia deste tipo com o subtipo acrescentado (os modelos são imutáveis)."""
+        return replace(self, subtypes={**self.subtypes, subtype.name: subtype})
 
     def get_subtype(self, name: str) -> Optional[ViolenceSubtype]:
         return self.subtypes.get(name)
 
     def get_all_keywords(self) -> List[str]:
-        all_keywords = self.keywords.copy()
+        all_keywords = list(self.keywords)
         for subtype in self.subtypes.values():
             all_keywords.extend(subtype.keywords)
         return list(set(all_keywords))
@@ -57,9 +114,12 @@ class ViolenceType:
         return self.severity_score
 
 
-@dataclass
+@_model
 class ReportChannel:
     name: str
     description: str
     contact: str = ""
     procedure: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "name", sys.intern(self.name))
@@ -0,0 +1,46 @@
+"""
+Normalização compartilhada de termos da base de conhecimento.
+
+A base mistura formas acentuadas e sem acento ("histérico", "ameaçar",
+"não deixar falar") e a extração devolve chaves ASCII em snake_case
+("ameaca", "humilhacao"). normalize_term leva todas ao mesmo formato:
+casefold, decomposição NFKD sem marcas de acento e sequências de espaços ou
+sublinhados reduzidas a um espaço. O resultado é calculado uma vez por termo
+e internado, então as comparações viram buscas em dicionário.
+"""
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+_SEPARATORS = re.compile(r"[\s_]+")
+
+
+@lru_cache(maxsize=8192)
+def normalize_term(term: str) -> str:
+    """Forma normalizada (e internada) de um termo."""
+    decomposed = unicodedata.normalize("NFKD", term.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return sys.intern(_SEPARATORS.sub(" ", stripped).strip())
+
+
+class TermSet:
+    """Termos canônicos indexados pela forma normalizada."""
+
+    def __init__(self, terms: Iterable[str]):
+        self._canonical: Dict[str, str] = {}
+        for term in terms:
+            self._canonical.setdefault(normalize_term(term), term)
+
+    def canonical(self, term) -> Optional[str]:
+        """Termo canônico equivalente a term, ou None se não houver."""
+        if not isinstance(term, str):
+            return None
+        return self._canonical.get(normalize_term(term))
+
+    def __contains__(self, term) -> bool:
+        return self.canonical(term) is not None
+
+    def __len__(self) -> int:
+        return len(self._canonical)
@@ -0,0 +1,224 @@
+"""
+Versões da base de conhecimento e recarga a quente.
+
+Uma KnowledgeBaseVersion reúne o que vem das fontes da base (gerenciador de
+tipos, dicionário de palavras-chave e seu vocabulário compilado, descrições,
+mapeamento de conceitos e aliases) e guarda os dados derivados dela (sobreposições de instituição,
+visões, matriz de pesos, aliases normalizados), montados no primeiro uso.
+Uma versão nunca muda depois de publicada.
+
+reload_knowledge_base executa de novo factories/violence_factory.py,
+keywords_dictionary.py e keyword_aliases.py em módulos novos, sem tocar nos
+já importados, monta a versão nova inteira e só então a publica com uma
+única atribuição. Quem fixou a versão anterior com pinned() (uma análise em
+andamento) continua lendo a versão anterior até terminar. Os caches que
+dependem da base (prompt e validação do Groq, resultados do ExpertSystem,
+gravidade das regras) comparam a identidade da versão e se refazem sozinhos;
+o motor de regras não é recompilado.
+
+Mudanças nos modelos ou em violence_manager.py continuam exigindo reinício,
+por isso o digest que decide a recarga (source_digest) cobre só as fontes
+recarregáveis.
+"""
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable, Optional
+
+from .vocabulary import build_vocabulary
+
+# Módulos executados de novo a cada recarga
+RELOADABLE_MODULES = (
+    "knowledge_base.factories.violence_factory",
+    "knowledge_base.keywords_dictionary",
+    "knowledge_base.keyword_aliases",
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fontes desses módulos, relativas a knowledge_base/
+RELOADABLE_SOURCES = tuple(
+    os.path.join(*name.split(".")[1:]) + ".py" for name in RELOADABLE_MODULES
+)
+
+_MISSING = object()
+
+
+class KnowledgeBaseVersion:
+    """Uma versão completa e imutável da base de conhecimento."""
+
+    def __init__(self, number: int, digest: str, manager, keywords_module, aliases_module):
+        self.number = number
+        # sha1 das fontes recarregáveis no momento da montagem
+        self.digest = digest
+        self.manager = manager
+        self.keywords_dict = keywords_module.KEYWORDS_DICT
+        self.keyword_descriptions = keywords_module.KEYWORD_DESCRIPTIONS
+        self.concept_mapping = keywords_module.CONCEPT_MAPPING
+        self.concept_to_field = keywords_module.CONCEPT_TO_FIELD
+        self.keyword_aliases = aliases_module.KEYWORD_ALIASES
+        # Verifica o dicionário: uma versão inconsistente não chega a ser publicada
+        self.vocabulary = build_vocabulary(keywords_module)
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def derived(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Valor derivado desta versão, montado uma vez por build.
+
+        Durante a montagem a versão fica fixada, então as funções de acesso
+        chamadas por build leem esta versão mesmo que outra já tenha sido
+        publicada.
+        """
+        value = self._derived.get(key, _MISSING)
+        if value is _MISSING:
+            with self._lock, pinned(self):
+                value = self._derived.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._derived[key] = build()
+        return value
+
+    def __repr__(self):
+        return f"KnowledgeBaseVersion({self.number}, {self.digest[:12]})"
+
+
+_current: Optional[KnowledgeBaseVersion] = None
+_pinned: ContextVar = ContextVar("knowledge_base_version", default=None)
+_reload_lock = threading.Lock()
+_watcher: Optional[threading.Thread] = None
+
+
+def source_digest() -> str:
+    """sha1 do conteúdo das fontes recarregáveis (RELOADABLE_SOURCES)."""
+    digest = hashlib.sha1()
+    for relative_path in RELOADABLE_SOURCES:
+        with open(os.path.join(BASE_DIR, relative_path), "rb") as source:
+            digest.update(relative_path.encode("utf-8") + b"\0" + source.read())
+    return digest.hexdigest()
+
+
+def current_version() -> KnowledgeBaseVersion:
+    """Última versão publicada; a primeira é montada no primeiro acesso."""
+    if _current is None:
+        with _reload_lock:
+            if _current is None:
+                _publish(_build_version(1, source_digest(), fresh=False))
+    return _current
+
+
+def active_version() -> KnowledgeBaseVersion:
+    """Versão fixada no contexto atual ou, sem fixação, a publicada."""
+    version = _pinned.get()
+    return version if version is not None else current_version()
+
+
+@contextmanager
+def pinned(version: KnowledgeBaseVersion = None):
+    """
+    Fixa uma versão para o contexto atual (thread ou tarefa asyncio).
+
+    Sem argumento fixa a versão ativa, de modo que fixações aninhadas mantêm
+    a de fora. Também funciona como decorador: @pinned().
+    """
+    token = _pinned.set(version if version is not None else active_version())
+    try:
+        yield _pinned.get()
+    finally:
+        _pinned.reset(token)
+
+
+def reload_knowledge_base(force: bool = False) -> KnowledgeBaseVersion:
+    """
+    Monta uma versão nova a partir das fontes e a publica.
+
+    Sem force, nada é feito se as fontes não mudaram desde a versão atual.
+    Uma falha ao executar as fontes mantém a versão atual e é propagada.
+    """
+    with _reload_lock:
+        digest = source_digest()
+        if _current is not None and not force and digest == _current.digest:
+            return _current
+        number = _current.number + 1 if _current is not None else 1
+        version = _build_version(number, digest, fresh=True)
+        _publish(version)
+        print(f"Base de conhecimento recarregada: versão {version.number} (fontes {version.digest[:12]})")
+        return version
+
+
+def reload_in_background(force: bool = False) -> threading.Thread:
+    """Executa reload_knowledge_base em uma thread; as análises não esperam."""
+    thread = threading.Thread(
+        target=_reload_logging_errors, kwargs={"force": force},
+        name="knowledge-base-reload", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def watch_sources(interval: float = 2.0) -> threading.Thread:
+    """
+    Verifica as fontes a cada interval segundos e recarrega quando mudarem.
+
+    Só um observador roda por processo; chamadas seguintes devolvem o mesmo.
+    """
+    global _watcher
+    with _reload_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(
+                target=_watch, args=(interval,), name="knowledge-base-watcher", daemon=True
+            )
+            _watcher.start()
+    return _watcher
+
+
+def _watch(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            changed = source_digest() != current_version().digest
+        except OSError:
+            continue
+        if changed:
+            _reload_logging_errors()
+
+
+def _reload_logging_errors(force: bool = False):
+    try:
+        reload_knowledge_base(force=force)
+    except Exception as e:
+        print(f"Erro ao recarregar a base de conhecimento (versão atual mantida): {str(e)}")
+
+
+def _publish(version: KnowledgeBaseVersion):
+    global _current
+    _current = version
+
+
+def _build_version(number: int, digest: str, fresh: bool) -> KnowledgeBaseVersion:
+    # Importados aqui: esses módulos leem a versão ativa
+    from .violence_manager import ViolenceTypeManager
+
+    if fresh:
+        factory_module, keywords_module, aliases_module = (
+            _fresh_module(name) for name in RELOADABLE_MODULES
+        )
+        manager = ViolenceTypeManager(factory=factory_module.ViolenceTypeFactory())
+    else:
+        from . import keywords_dictionary as keywords_module
+        from . import keyword_aliases as aliases_module
+        manager = ViolenceTypeManager()
+    return KnowledgeBaseVersion(number, digest, manager, keywords_module, aliases_module)
+
+
+def _fresh_module(name: str):
+    """Executa a fonte atual do módulo em um objeto novo, fora de sys.modules."""
+    importlib.import_module(name)
+    spec = importlib.util.spec_from_file_location(name, sys.modules[name].__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -1,19 +1,34 @@
-from typing import Dict, List, Optional
+from collections import ChainMap
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 from .models.violence_type import ViolenceType, ViolenceSubtype, Severity, ReportChannel
 from .models.criteria import CriterionWeights
-from .factories.violence_factory import ViolenceTypeFactory
+from .models.views import ViolenceTypeView, ReportChannelView
+from .models.institution import InstitutionOverlay
+from .institutions import INSTITUTIONS, DEFAULT_INSTITUTION
+from .keyword_index import KeywordIndex
+from .versioning import active_version
 
 class ViolenceTypeManager:
     """Gerenciador central para todos os tipos de violência."""
     
-    def __init__(self):
+    def __init__(self, factory=None):
+        """
+        factory substitui a ViolenceTypeFactory importada (a recarga a quente
+        passa a fábrica recém-executada).
+        """
         self._violence_types: Dict[str, ViolenceType] = {}
         self._report_channels: Dict[str, ReportChannel] = {}
-        self._initialize_violence_types()
+        self._keyword_index: Optional[KeywordIndex] = None
+        self._type_views: Optional[Dict[str, ViolenceTypeView]] = None
+        self._initialize_violence_types(factory)
         self._initialize_report_channels()
     
-    def _initialize_violence_types(self):
-        factory = ViolenceTypeFactory()
+    def _initialize_violence_types(self, factory=None):
+        if factory is None:
+            from .factories.violence_factory import ViolenceTypeFactory
+            factory = ViolenceTypeFactory()
         
         self._violence_types["microagressoes"] = factory.create_microagressoes()
         self._violence_types["perseguicao"] = factory.create_perseguicao()
@@ -28,17 +43,16 @@ class ViolenceTypeManager:
         self._violence_types["discriminacao_racial"] = factory.create_discriminacao_racial()
     
     def _initialize_report_channels(self):
+        # Contatos específicos de cada instituição ficam em institutions.py
         self._report_channels = {
             "Ouvidoria": ReportChannel(
                 name="Ouvidoria",
                 description="Órgão responsável por receber denúncias e encaminhá-las.",
-                contact="ouvidoria@ufape.edu.br",
                 procedure="Enviar e-mail ou comparecer pessoalmente."
             ),
             "Comissao_Etica": ReportChannel(
                 name="Comissão de Ética",
                 description="Responsável por analisar casos de violação ética.",
-                contact="etica@ufape.edu.br",
                 procedure="Enviar denúncia formal por escrito."
             ),
             "Policia": ReportChannel(
@@ -113,28 +127,14 @@ class ViolenceTypeManager:
         return vtype.get_severity_score(subtype_name)
     
     def search_by_keywords(self, keywords: List[str]) -> List[tuple]:
-        results = []
-        keywords_lower = [k.lower() for k in keywords]
-        
-        for vtype_name, vtype in self._violence_types.items():
-            # Verifica palavras-chave do tipo principal
-            vtype_keywords = [k.lower() for k in vtype.keywords]
-            main_matches = sum(1 for k in keywords_lower if any(k in vk for vk in vtype_keywords))
-            
-            if main_matches > 0:
-                results.append((vtype_name, None, main_matches))
-            
-            # Verifica palavras-chave dos subtipos
-            for subtype_name, subtype in vtype.subtypes.items():
-                subtype_keywords = [k.lower() for k in subtype.keywords]
-                sub_matches = sum(1 for k in keywords_lower if any(k in sk for sk in subtype_keywords))
-                
-                if sub_matches > 0:
-                    results.append((vtype_name, subtype_name, sub_matches))
-        
-        # Ordena por relevância (mais matches primeiro)
-        results.sort(key=lambda x: x[2], reverse=True)
-        return results
+        """
+        Tipos e subtipos cujas palavras-chave contêm as da consulta (sem
+        diferenciar maiúsculas, acentos ou sublinhados), como tuplas
+        (tipo, subtipo ou None, matches), mais matches primeiro.
+        """
+        if self._keyword_index is None:
+            self._keyword_index = KeywordIndex(self._violence_types)
+        return self._keyword_index.search(keywords)
     
     def get_recommendations(self, violence_type: str, subtype_name: str = None) -> List[str]:
         vtype = self.get_violence_type(violence_type)
@@ -164,68 +164,148 @@ class ViolenceTypeManager:
         
         return [self._report_channels[name] for name in channel_names if name in self._report_channels]
 
-def to_dict_format(self) -> Dict:
-    """Converte para o formato de dicionário utilizado pelo sistema."""
-    def _subtype_to_dict(subtype):
-        subtype_dict = {
-            "definicao": subtype.definition,
-            "palavras_chave": subtype.keywords,
-        }
-        if getattr(subtype, "behaviors", None):
-            subtype_dict["comportamentos"] = subtype.behaviors
-        if getattr(subtype, "severity", None):
-            subtype_dict["gravidade"] = subtype.severity.value
-        if getattr(subtype, "report_channels", None):
-            subtype_dict["canais_denuncia"] = subtype.report_channels
-        if getattr(subtype, "recommendations", None):
-            subtype_dict["recomendacoes"] = subtype.recommendations
-        return subtype_dict
-
-    def _type_to_dict(vtype_name, vtype):
-        vtype_dict = {
-            "nome": vtype_name.replace('_', ' ').title(),
-            "definicao": vtype.definition,
-            "gravidade": vtype.severity.value,
-            "palavras_chave": vtype.keywords,
-            "canais_denuncia": vtype.report_channels,
-            "recomendacoes": vtype.recommendations
-        }
-        if getattr(vtype, "common_targets", None):
-            vtype_dict["alvos_comuns"] = vtype.common_targets
-        if vtype.subtypes:
-            vtype_dict["subtipos"] = {
-                subtype_name: _subtype_to_dict(subtype)
-                for subtype_name, subtype in vtype.subtypes.items()
+    def to_dict_format(self) -> Dict[str, Mapping]:
+        """
+        Formato de dicionário utilizado pelo sistema, como visões somente
+        leitura sobre os modelos (sem copiar os dados).
+        """
+        if self._type_views is None:
+            self._type_views = {
+                vtype_name: ViolenceTypeView(vtype)
+                for vtype_name, vtype in self._violence_types.items()
             }
-        return vtype_dict
+        return dict(self._type_views)
+
+class InstitutionViolenceTypeManager(ViolenceTypeManager):
+    """
+    Base compartilhada vista através da sobreposição de uma instituição.
+
+    Tipos e canais ficam em ChainMaps (sobreposição → base), então as
+    consultas continuam O(1). Só os tipos tocados pela sobreposição são
+    recriados, com dataclasses.replace, reaproveitando os campos e subtipos
+    que não mudaram: a memória por instituição cresce apenas com o tamanho
+    da sobreposição.
+    """
+
+    def __init__(self, base: ViolenceTypeManager, overlay: InstitutionOverlay):
+        self.base = base
+        self.overlay = overlay
+        self._violence_types = ChainMap(self._overlay_types(base, overlay), base._violence_types)
+        self._report_channels = ChainMap(dict(overlay.report_channels), base._report_channels)
+        self._keyword_index = None
+        self._type_views = None
 
-    return {
-        vtype_name: _type_to_dict(vtype_name, vtype)
-        for vtype_name, vtype in self._violence_types.items()
-    }
+    @staticmethod
+    def _overlay_types(base: ViolenceTypeManager, overlay: InstitutionOverlay) -> Dict[str, ViolenceType]:
+        changed: Dict[str, ViolenceType] = {}
 
-# Funções de compatibilidade para a refatoração
-_violence_manager = ViolenceTypeManager()
+        def _current(vtype_name):
+            vtype = changed.get(vtype_name) or base.get_violence_type(vtype_name)
+            if vtype is None:
+                raise ValueError(f"Sobreposição {overlay.name!r}: tipo desconhecido {vtype_name!r}")
+            return vtype
 
-def get_severity(vtype: str, subtype: str = None) -> int:
-    return _violence_manager.get_severity_score(vtype, subtype)
+        for vtype_name, subtypes in overlay.extra_subtypes.items():
+            vtype = _current(vtype_name)
+            for subtype in subtypes:
+                vtype = vtype.with_subtype(subtype)
+            changed[vtype_name] = vtype
 
-def get_violence_types() -> Dict[str, Dict]:
-    return _violence_manager.to_dict_format()
+        for (vtype_name, subtype_name), recommendations in overlay.recommendations.items():
+            vtype = _current(vtype_name)
+            if subtype_name is None:
+                vtype = replace(vtype, recommendations=tuple(recommendations))
+            else:
+                subtype = vtype.get_subtype(subtype_name)
+                if subtype is None:
+                    raise ValueError(
+                        f"Sobreposição {overlay.name!r}: subtipo desconhecido {vtype_name}/{subtype_name}"
+                    )
+                vtype = vtype.with_subtype(replace(subtype, recommendations=tuple(recommendations)))
+            changed[vtype_name] = vtype
+
+        return changed
+
+    def get_all_violence_types(self) -> Dict[str, ViolenceType]:
+        return dict(self._violence_types)
+
+    def get_all_report_channels(self) -> Dict[str, ReportChannel]:
+        return dict(self._report_channels)
+
+    def to_dict_format(self) -> Dict[str, Mapping]:
+        # Tipos não tocados pela sobreposição reaproveitam as visões da base
+        if self._type_views is None:
+            base_views = self.base.to_dict_format()
+            self._type_views = {
+                vtype_name: base_views[vtype_name]
+                if vtype is self.base.get_violence_type(vtype_name) else ViolenceTypeView(vtype)
+                for vtype_name, vtype in self._violence_types.items()
+            }
+        return dict(self._type_views)
+
+    def search_by_keywords(self, keywords: List[str]) -> List[tuple]:
+        # Sem subtipos extras as palavras-chave são as da base: usar o mesmo índice
+        if not self.overlay.extra_subtypes:
+            return self.base.search_by_keywords(keywords)
+        return super().search_by_keywords(keywords)
+
+# Funções de compatibilidade para a refatoração.
+# A base é montada no primeiro acesso e compartilhada pelo processo inteiro;
+# cada instituição a vê através da sua sobreposição (institutions.py). Os
+# nomes de módulo (VIOLENCE_TYPES, REPORT_CONTACT, ...) continuam funcionando
+# via __getattr__ e devolvem visões somente leitura da instituição padrão.
+# Tudo é lido da versão ativa da base (versioning.py), que guarda os valores
+# derivados; uma recarga a quente troca a versão inteira de uma vez.
+def get_base_manager() -> ViolenceTypeManager:
+    """Base compartilhada, sem sobreposição de instituição."""
+    return active_version().manager
+
+def get_violence_manager(institution: str = DEFAULT_INSTITUTION) -> ViolenceTypeManager:
+    return active_version().derived(("manager", institution), lambda: _institution_manager(institution))
+
+def _institution_manager(institution: str) -> ViolenceTypeManager:
+    overlay = INSTITUTIONS.get(institution)
+    if overlay is None:
+        raise ValueError(f"Instituição desconhecida: {institution}")
+    return InstitutionViolenceTypeManager(get_base_manager(), overlay)
+
+def get_severity(vtype: str, subtype: str = None, institution: str = DEFAULT_INSTITUTION) -> int:
+    return get_violence_manager(institution).get_severity_score(vtype, subtype)
+
+def get_violence_types(institution: str = DEFAULT_INSTITUTION) -> Mapping[str, Mapping]:
+    return active_version().derived(("violence_types", institution), lambda: _violence_types_of(institution))
+
+def _violence_types_of(institution: str) -> Mapping[str, Mapping]:
+    return MappingProxyType(get_violence_manager(institution).to_dict_format())
 
 def get_criterion_weights() -> Dict[str, Dict[str, int]]:
     return CriterionWeights.get_all_weights()
 
-VIOLENCE_TYPES = _violence_manager.to_dict_format()
-CRITERION_WEIGHTS = CriterionWeights.get_all_weights()
+def get_report_contact(institution: str = DEFAULT_INSTITUTION) -> Mapping[str, Mapping[str, str]]:
+    return active_version().derived(("report_contact", institution), lambda: _report_contact_of(institution))
 
-REPORT_CONTACT = {}
-for name, channel in _violence_manager.get_all_report_channels().items():
-    REPORT_CONTACT[name] = {
-        "descricao": channel.description,
-        "contato": channel.contact,
-        "procedimento": channel.procedure
-    }
+def _report_contact_of(institution: str) -> Mapping[str, Mapping[str, str]]:
+    return MappingProxyType({
+        name: ReportChannelView(channel)
+        for name, channel in get_violence_manager(institution).get_all_report_channels().items()
+    })
+
+def get_severity_ranking(institution: str = DEFAULT_INSTITUTION) -> Mapping[str, object]:
+    return active_version().derived(("severity_ranking", institution), lambda: _severity_ranking_of(institution))
+
+def _severity_ranking_of(institution: str) -> Mapping[str, object]:
+    ranking = {}
+    for vtype_name, vtype in get_violence_manager(institution).get_all_violence_types().items():
+        if vtype.subtypes:
+            ranking[vtype_name] = {
+                subtype_name: subtype.severity_score
+                for subtype_name, subtype in vtype.subtypes.items()
+            }
+        else:
+            ranking[vtype_name] = vtype.severity_score
+    return MappingProxyType(ranking)
+
+CRITERION_WEIGHTS = CriterionWeights.get_all_weights()
 
 SEVERITY_LEVEL = {
     "baixa": "Comportamento inadequado que requer atenção e orientação.",
@@ -237,12 +317,14 @@ SEVERITY_LEVEL = {
     "gravissima": "Violação extremamente grave que constitui crime passível de expulsão."
 }
 
-SEVERITY_RANKING = {}
-for vtype_name, vtype in _violence_manager.get_all_violence_types().items():
-    if vtype.subtypes:
-        SEVERITY_RANKING[vtype_name] = {
-            subtype_name: subtype.severity_score 
-            for subtype_name, subtype in vtype.subtypes.items()
-        }
-    else:
-        SEVERITY_RANKING[vtype_name] = vtype.severity_score
+LAZY_ATTRIBUTES = {
+    "_violence_manager": get_violence_manager,
+    "VIOLENCE_TYPES": get_violence_types,
+    "REPORT_CONTACT": get_report_contact,
+    "SEVERITY_RANKING": get_severity_ranking,
+}
+
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        return LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,14 @@
 # Arquivo criado para juntar todas as funções que foram refatoradas em um unico arquivo
 # do contrario, iria quebrar completamente o codigo já existente
+from . import violence_manager
 from .violence_manager import (
-    VIOLENCE_TYPES,
     CRITERION_WEIGHTS, 
     SEVERITY_LEVEL,
-    SEVERITY_RANKING,
-    REPORT_CONTACT,
     get_severity
 )
 
+# VIOLENCE_TYPES, REPORT_CONTACT e SEVERITY_RANKING são montados no primeiro acesso
+def __getattr__(name):
+    if name in violence_manager.LAZY_ATTRIBUTES:
+        return getattr(violence_manager, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
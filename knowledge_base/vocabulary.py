@@ -0,0 +1,147 @@
+"""
+Vocabulário compilado de palavras-chave.
+
+Cada par (categoria, palavra-chave) do KEYWORDS_DICT recebe um ID inteiro, na
+ordem do dicionário. Os IDs são estáveis enquanto o dicionário não mudar;
+quem os grava fora do processo deve guardar também o digest do vocabulário.
+A pertinência é uma busca em dicionário ou frozenset, e a validação aceita as
+mesmas variações de caixa, acento e separador que normalize_term.
+
+A montagem verifica se o dicionário concorda com o CONCEPT_MAPPING e com o
+KEYWORD_DESCRIPTIONS (check_vocabulary); cada versão da base monta o seu
+vocabulário, então uma divergência impede a versão de ser publicada.
+"""
+import hashlib
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from .normalization import TermSet
+
+Pair = Tuple[str, str]
+
+
+class KeywordVocabulary:
+    """IDs inteiros para os pares (categoria, palavra-chave) do dicionário."""
+
+    def __init__(self, keywords_dict: Mapping[str, Iterable[str]]):
+        self.pairs: Tuple[Pair, ...] = tuple(
+            (category, keyword)
+            for category, keywords in keywords_dict.items()
+            for keyword in keywords
+        )
+        self.ids: Mapping[Pair, int] = MappingProxyType({
+            pair: index for index, pair in enumerate(self.pairs)
+        })
+        self.categories: Mapping[str, FrozenSet[str]] = MappingProxyType({
+            category: frozenset(keywords) for category, keywords in keywords_dict.items()
+        })
+        self._terms = {category: TermSet(keywords) for category, keywords in keywords_dict.items()}
+        self.digest = hashlib.sha1(
+            "\n".join(f"{category}\t{keyword}" for category, keyword in self.pairs).encode("utf-8")
+        ).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def __contains__(self, pair) -> bool:
+        return pair in self.ids
+
+    def id_of(self, category: str, keyword: str) -> int:
+        return self.ids[(category, keyword)]
+
+    def pair_of(self, keyword_id: int) -> Pair:
+        return self.pairs[keyword_id]
+
+    def canonical(self, category: str, keyword) -> Optional[str]:
+        """Palavra-chave da categoria equivalente a keyword, ou None."""
+        terms = self._terms.get(category)
+        return terms.canonical(keyword) if terms is not None else None
+
+    def encode(self, keywords: Mapping[str, Iterable[str]]) -> Tuple[int, ...]:
+        """IDs das palavras-chave, na ordem dada; KeyError se alguma não existir."""
+        return tuple(
+            self.ids[(category, keyword)]
+            for category, values in keywords.items()
+            for keyword in values
+        )
+
+    def decode(self, keyword_ids: Iterable[int]) -> Dict[str, List[str]]:
+        keywords: Dict[str, List[str]] = {}
+        for keyword_id in keyword_ids:
+            category, keyword = self.pairs[keyword_id]
+            keywords.setdefault(category, []).append(keyword)
+        return keywords
+
+
+def check_vocabulary(keywords_dict: Mapping, concept_mapping: Mapping, concept_to_field: Mapping,
+                     keyword_descriptions: Mapping, unweighted: Mapping = None,
+                     unoffered: Mapping = None) -> List[str]:
+    """
+    Divergências entre o dicionário, o mapeamento de conceitos e as descrições.
+
+    unweighted e unoffered listam, por categoria, as divergências conhecidas
+    (palavras-chave sem peso e conceitos não oferecidos ao Groq); uma exceção
+    que deixou de ser divergência também é apontada.
+    """
+    unweighted = unweighted or {}
+    unoffered = unoffered or {}
+    problems = []
+    fields = set(concept_to_field.values())
+    offered = set()
+
+    for category, keywords in keywords_dict.items():
+        if category not in fields:
+            problems.append(f"categoria desconhecida no dicionário: {category!r}")
+        if isinstance(keywords, str) or not all(isinstance(keyword, str) for keyword in keywords):
+            problems.append(f"a categoria {category!r} não é uma lista de palavras-chave")
+            continue
+        if len(set(keywords)) != len(keywords):
+            problems.append(f"palavras-chave repetidas na categoria {category!r}")
+        offered.update(keywords)
+
+    for keyword in sorted(offered - set(keyword_descriptions)):
+        problems.append(f"palavra-chave sem descrição: {keyword!r}")
+    for keyword in sorted(set(keyword_descriptions) - offered):
+        problems.append(f"descrição de palavra-chave fora do dicionário: {keyword!r}")
+
+    for concept, category in concept_to_field.items():
+        keywords = keywords_dict.get(category, ())
+        if isinstance(keywords, str):
+            continue
+        in_dictionary = set(keywords)
+        in_mapping = set(concept_mapping.get(concept, {}))
+        allowed_unweighted = set(unweighted.get(category, ()))
+        allowed_unoffered = set(unoffered.get(category, ()))
+        for keyword in sorted(in_dictionary - in_mapping - allowed_unweighted):
+            problems.append(f"palavra-chave sem peso no CONCEPT_MAPPING: {category}/{keyword}")
+        for keyword in sorted(in_mapping - in_dictionary - allowed_unoffered):
+            problems.append(f"conceito do CONCEPT_MAPPING fora do dicionário: {category}/{keyword}")
+        for keyword in sorted(allowed_unweighted - (in_dictionary - in_mapping)):
+            problems.append(f"exceção obsoleta (UNWEIGHTED_KEYWORDS): {category}/{keyword}")
+        for keyword in sorted(allowed_unoffered - (in_mapping - in_dictionary)):
+            problems.append(f"exceção obsoleta (UNOFFERED_CONCEPTS): {category}/{keyword}")
+
+    return problems
+
+
+def build_vocabulary(keywords_module) -> KeywordVocabulary:
+    """Verifica o módulo do dicionário e compila o vocabulário; ValueError se divergir."""
+    problems = check_vocabulary(
+        keywords_module.KEYWORDS_DICT,
+        keywords_module.CONCEPT_MAPPING,
+        keywords_module.CONCEPT_TO_FIELD,
+        keywords_module.KEYWORD_DESCRIPTIONS,
+        keywords_module.UNWEIGHTED_KEYWORDS,
+        keywords_module.UNOFFERED_CONCEPTS,
+    )
+    if problems:
+        raise ValueError("Dicionário de palavras-chave inconsistente:\n- " + "\n- ".join(problems))
+    return KeywordVocabulary(keywords_module.KEYWORDS_DICT)
+
+
+def get_vocabulary() -> KeywordVocabulary:
+    """Vocabulário da versão ativa da base."""
+    # Importado aqui: versioning monta o vocabulário de cada versão
+    from .versioning import active_version
+
+    return active_version().vocabulary
@@ -0,0 +1,135 @@
+"""
+Matriz densa de pesos para ranquear classificações.
+
+Converte o CONCEPT_MAPPING em uma matriz palavra-chave × (tipo, subtipo) e
+a gravidade de cada par em um vetor, ambos calculados uma única vez por
+versão da base e instituição (os subtipos extras de uma instituição viram
+colunas, com a gravidade resolvida por ela). A
+pontuação de um relato é a soma das linhas das palavras-chave identificadas
+(produto esparso-denso), sem percorrer os dicionários aninhados a cada análise.
+"""
+from operator import add
+from typing import Dict, Iterable, List, Tuple
+
+from .institutions import DEFAULT_INSTITUTION
+from .keywords_dictionary import CONCEPT_TO_FIELD
+from .violence_manager import get_severity, get_violence_types
+from .versioning import active_version
+
+
+class WeightMatrix:
+    """Pesos pré-computados por palavra-chave e por (tipo, subtipo)."""
+
+    def __init__(self, concept_mapping: Dict, violence_types: Dict,
+                 concept_to_field: Dict[str, str] = CONCEPT_TO_FIELD,
+                 institution: str = DEFAULT_INSTITUTION):
+        self.institution = institution
+        self.columns: List[Tuple[str, str]] = []
+        self.column_index: Dict[Tuple[str, str], int] = {}
+        self._subtype_columns: Dict[str, List[int]] = {}
+
+        for vtype_name, vtype_data in violence_types.items():
+            self._add_column(vtype_name, "")
+            for subtype_name in vtype_data.get("subtipos", {}):
+                self._add_column(vtype_name, subtype_name)
+
+        self.row_index: Dict[Tuple[str, str], int] = {}
+        self.rows: List[Tuple[int, ...]] = []
+        for concept, mappings in concept_mapping.items():
+            category = concept_to_field.get(concept, concept)
+            for keyword, targets in mappings.items():
+                self.row_index[(category, keyword)] = len(self.rows)
+                self.rows.append(self._build_row(targets))
+
+        self.severity: Tuple[int, ...] = tuple(
+            get_severity(vtype_name, subtype_name or None, institution)
+            for vtype_name, subtype_name in self.columns
+        )
+
+    def _add_column(self, violence_type: str, subtype: str) -> int:
+        key = (violence_type, subtype)
+        if key not in self.column_index:
+            self.column_index[key] = len(self.columns)
+            self.columns.append(key)
+            if subtype:
+                self._subtype_columns.setdefault(violence_type, []).append(self.column_index[key])
+        return self.column_index[key]
+
+    def _build_row(self, targets: Dict) -> Tuple[int, ...]:
+        row = [0] * len(self.columns)
+        for vtype_name, weight in targets.items():
+            if isinstance(weight, dict):
+                for subtype_name, subtype_weight in weight.items():
+                    index = self.column_index.get((vtype_name, subtype_name))
+                    if index is not None:
+                        row[index] += subtype_weight
+                continue
+
+            # Peso no nível do tipo vale também para todos os seus subtipos
+            index = self.column_index.get((vtype_name, ""))
+            if index is None:
+                continue
+            row[index] += weight
+            for subtype_index in self._subtype_columns.get(vtype_name, []):
+                row[subtype_index] += weight
+        return tuple(row)
+
+    def score(self, keywords: Iterable[Tuple[str, str]]) -> List[int]:
+        """
+        Retorna o vetor de pontuação para pares (categoria, palavra-chave).
+        """
+        scores = [0] * len(self.columns)
+        for key in set(keywords):
+            index = self.row_index.get(key)
+            if index is not None:
+                scores = list(map(add, scores, self.rows[index]))
+        return scores
+
+    def score_of(self, scores: List[int], violence_type: str, subtype: str = "") -> int:
+        index = self.column_index.get((violence_type, subtype or ""))
+        return scores[index] if index is not None else 0
+
+    def severity_of(self, violence_type: str, subtype: str = "") -> int:
+        index = self.column_index.get((violence_type, subtype or ""))
+        if index is None:
+            return get_severity(violence_type, subtype or None, self.institution)
+        return self.severity[index]
+
+    def rank(self, classifications: List[Dict], keywords: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        Ordena as classificações por pontuação e, em caso de empate, por gravidade.
+
+        Cada classificação recebe o campo "score". Empates totais preservam a
+        ordem original.
+        """
+        scores = self.score(keywords)
+        for classification in classifications:
+            classification["score"] = self.score_of(
+                scores, classification["violence_type"], classification.get("subtype", "")
+            )
+
+        return sorted(
+            classifications,
+            key=lambda c: (
+                -c["score"],
+                -self.severity_of(c["violence_type"], c.get("subtype", ""))
+            )
+        )
+
+
+def get_weight_matrix(institution: str = DEFAULT_INSTITUTION) -> WeightMatrix:
+    """Matriz da versão ativa da base e da instituição, montada no primeiro uso."""
+    version = active_version()
+    return version.derived(
+        ("weight_matrix", institution),
+        lambda: WeightMatrix(
+            version.concept_mapping, get_violence_types(institution), version.concept_to_field, institution
+        )
+    )
+
+
+def __getattr__(name):
+    # WEIGHT_MATRIX continua disponível como nome de módulo, sem custo no import
+    if name == "WEIGHT_MATRIX":
+        return get_weight_matrix()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,58 +1,94 @@
+import copy
 import os
-import re
 import streamlit as st
+from engine.analysis_job import AnalysisCancelled, submit_analysis
 from engine.expert_system import ExpertSystem
-from knowledge_base.violence_types import VIOLENCE_TYPES
-from knowledge_base.keyword_aliases import KEYWORD_ALIASES
+from engine.replay import ReplayJournal
+from engine.result_cache import ResultCache
+from knowledge_base.institutions import DEFAULT_INSTITUTION, INSTITUTIONS
+from knowledge_base.versioning import watch_sources
+from utils.result_cards import get_card
 
-def apply_aliases_to_text(text: str) -> str:
-    
-    result = text
-    
-    # Ordenar as palavras-chave por tamanho (maiores primeiro) para evitar substituições parciais
-    sorted_keywords = sorted(KEYWORD_ALIASES.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for keyword, alias in sorted_keywords:
-        # Usar boundary para palavras com letras/números, ou posição para caracteres especiais
-        if keyword.replace("_", "").isalnum():
-            pattern = rf'\b{re.escape(keyword)}\b'
-        else:
-            pattern = rf'{re.escape(keyword)}'
-        result = re.sub(pattern, alias, result, flags=re.IGNORECASE)
-    
-    return result
+# Intervalo (s) entre as consultas ao estágio da análise em andamento
+POLL_INTERVAL = 0.5
+
+# Diário das análises para o replay de bases candidatas (python -m engine.replay)
+REPLAY_HISTORY = os.environ.get("REPLAY_HISTORY", os.path.join("historico", "replay.jsonl"))
+
+STAGE_LABELS = {
+    "queued": "Aguardando na fila...",
+    "extracting": "Identificando os elementos do relato...",
+    "inferring": "Aplicando as regras de identificação...",
+    "rendering": "Preparando os resultados...",
+}
+
+def set_results(outcome):
+    st.session_state.keywords = outcome["keywords"]
+    st.session_state.session_token = outcome["session_token"]
+    st.session_state.results = outcome["classifications"]
+    # A chave do cartão depende da explicação inteira; calculada junto com a análise
+    st.session_state.card_keys = outcome["card_keys"]
+    st.session_state.state = 'result'
+
+@st.fragment(run_every=POLL_INTERVAL)
+def show_analysis_progress():
+    # Só esta região é atualizada enquanto a análise roda no executor
+    job = st.session_state.analysis_job
+    if job.done():
+        del st.session_state.analysis_job
+        try:
+            set_results(job.result())
+        except AnalysisCancelled:
+            pass
+        except Exception as e:
+            st.session_state.analysis_error = f"Não foi possível concluir a análise: {e}"
+        st.rerun()
+
+    st.progress(job.progress, text=STAGE_LABELS.get(job.stage, ""))
+    if st.button("Cancelar análise"):
+        job.cancel()
+        del st.session_state.analysis_job
+        st.rerun()
+
+def show_analysis_error():
+    if st.session_state.get('analysis_error'):
+        st.error(st.session_state.pop('analysis_error'))
+
+def get_institution():
+    # Cada instituição atendida tem o seu endereço (?instituicao=<nome>); a
+    # sessão fica com a instituição em que começou
+    if 'institution' not in st.session_state:
+        st.session_state.institution = st.query_params.get("instituicao", DEFAULT_INSTITUTION)
+    return st.session_state.institution
 
 @st.cache_resource
-def get_expert_system():
+def get_result_cache():
+    # Compartilhado pelas sessões: a chave já identifica a instituição e a base
+    return ResultCache(maxsize=1024)
+
+@st.cache_resource
+def get_replay_journal():
+    # Um diário por processo, compartilhado pelas sessões
+    return ReplayJournal(REPLAY_HISTORY)
+
+def get_expert_system(institution):
+    # Cada sessão tem o seu sistema (a sessão do motor é dela); só o cache de
+    # classificações é compartilhado
     if 'expert_system' not in st.session_state:
+        # Alterações nas fontes da base são recarregadas sem reiniciar o processo
+        watch_sources()
         api_key = st.secrets.get("GROQ_API_KEY", os.environ.get("GROQ_API_KEY", ""))
-        st.session_state.expert_system = ExpertSystem(api_key=api_key)
+        st.session_state.expert_system = ExpertSystem(
+            api_key=api_key, institution=institution, result_cache=get_result_cache()
+        )
+        st.session_state.expert_system.history = get_replay_journal()
     return st.session_state.expert_system
 
-st.set_page_config(
-    page_title="Sistema Especialista",
-    page_icon=":robot:",
-    layout="centered",
-    initial_sidebar_state="collapsed"
-)
-st.title("Sistema Especialista de Identificação de Violência")
+# Cada tela é um fragmento: digitar ou clicar dentro dela só reexecuta a
+# própria tela; a troca de tela (st.session_state.state) reexecuta o app
 
-if 'state' not in st.session_state:
-    st.session_state.state = 'initial'
-if 'keywords' not in st.session_state:
-    st.session_state.keywords = {}
-if 'questions' not in st.session_state:
-    st.session_state.questions = []
-if 'missing_fields' not in st.session_state:
-    st.session_state.missing_fields = []
-if 'partial_facts' not in st.session_state:
-    st.session_state.partial_facts = {}
-if 'results' not in st.session_state:
-    st.session_state.results = []
-
-expert_system = get_expert_system()
-
-if st.session_state.state == 'initial':
+@st.fragment
+def initial_view():
     st.subheader("Relate a situação ocorrida")
     
     user_text = st.text_area(
@@ -61,18 +97,18 @@ if st.session_state.state == 'initial':
         placeholder="Conte com suas palavras o que aconteceu, incluindo detalhes sobre o comportamento, local, frequência e como isso te afetou..."
     )
     
-    if st.button("Analisar"):
+    show_analysis_error()
+    if 'analysis_job' in st.session_state:
+        show_analysis_progress()
+    elif st.button("Analisar"):
         if len(user_text) < 20:
             st.error("Por favor, forneça um relato mais detalhado para análise.")
         else:
-            with st.spinner("Analisando seu relato..."):
-                result = expert_system.analyze_text(user_text)
-                
-                st.session_state.results = result["classifications"]
-                st.session_state.state = 'result'
-                st.rerun()
-
-elif st.session_state.state == 'follow_up':
+            st.session_state.analysis_job = submit_analysis(expert_system, user_text)
+            st.rerun(scope="fragment")
+
+@st.fragment
+def follow_up_view():
     st.subheader("Precisamos de mais algumas informações")
     
     if st.session_state.keywords:
@@ -92,21 +128,22 @@ elif st.session_state.state == 'follow_up':
         placeholder="Responda as perguntas acima para continuar a análise..."
     )
     
-    if st.button("Continuar análise"):
+    show_analysis_error()
+    if 'analysis_job' in st.session_state:
+        show_analysis_progress()
+    elif st.button("Continuar análise"):
         if follow_up_text:
-            with st.spinner("Processando suas respostas..."):
-                # Processar a resposta complementar através do sistema especialista
-                combined_text = follow_up_text 
-                
-                result = expert_system.analyze_text(combined_text)
-                
-                st.session_state.results = result["classifications"]
-                st.session_state.state = 'result'
-                st.rerun()
+            # Complementar a análise atual sem descartar os fatos do relato original
+            st.session_state.analysis_job = submit_analysis(
+                expert_system, follow_up_text, follow_up=True,
+                session_token=st.session_state.get('session_token')
+            )
+            st.rerun(scope="fragment")
         else:
             st.error("Por favor, responda às perguntas para continuar.")
 
-elif st.session_state.state == 'result':
+@st.fragment
+def result_view():
     st.subheader("Resultados da Análise")
     
     if not st.session_state.results:
@@ -114,52 +151,53 @@ elif st.session_state.state == 'result':
     else:
         st.success("Identificamos possíveis tipos de violência:")
         
-        for r in st.session_state.results:
-            vtype = r["violence_type"]
-            subtype = r.get("subtype")
-            
-            if subtype:
-                subtype_formatted = subtype.replace("_", " ").capitalize()
-                title = f"{subtype_formatted} ({vtype.replace('_', ' ').title()})"
-            else:
-                title = VIOLENCE_TYPES[vtype]['nome'] if 'nome' in VIOLENCE_TYPES[vtype] else vtype.replace('_', ' ').title()
-            
-            st.markdown(f"#### {title}")
+        # Cartões montados uma vez e compartilhados entre as sessões (ver result_cards)
+        for key, r in zip(st.session_state.card_keys, st.session_state.results):
+            card = get_card(key, r)
+            st.markdown(card.title)
             with st.expander("Ver detalhes"):
-                if subtype and "subtipos" in VIOLENCE_TYPES[vtype] and subtype in VIOLENCE_TYPES[vtype]["subtipos"]:
-                    st.write(VIOLENCE_TYPES[vtype]["subtipos"][subtype]["definicao"])
-                else:
-                    st.write(VIOLENCE_TYPES[vtype]["definicao"])
-                
-                if "explanation" in r and r["explanation"]:
-                    st.subheader("Por que identificamos este tipo:")
-                    
-                    for i, exp in enumerate(r["explanation"]):
-                        if exp.strip():
-                            clean_exp = exp.strip()
-                            if clean_exp.startswith("- "):
-                                clean_exp = clean_exp[2:]
-                            
-                            # Verificar se é um cabeçalho (como "Como chegamos a esta conclusão:")
-                            if clean_exp.endswith(":") and len(clean_exp.split()) <= 6:
-                                # É um cabeçalho - formatar como subseção SEM bullet point
-                                st.markdown(f"##### {clean_exp}")
-                                # Adicionar uma linha em branco para separação visual
-                                st.write("")
-                            else:
-                                # É um item da lista - aplicar aliases e mostrar como bullet point
-                                formatted_exp = apply_aliases_to_text(clean_exp)
-                                st.write(f"• {formatted_exp}")
-                
-                if "recomendacoes" in VIOLENCE_TYPES[vtype]:
-                    st.subheader("Recomendações:")
-                    for rec in VIOLENCE_TYPES[vtype]["recomendacoes"]:
-                        st.write(f"• {rec}")
+                st.markdown(card.details)
 
 
     if st.button("Iniciar Nova Análise"):
-        for key in ['state', 'keywords', 'questions', 'missing_fields', 'partial_facts', 'results', 'expert_system']:
+        for key in list(SESSION_DEFAULTS) + ['session_token', 'expert_system']:
             if key in st.session_state:
                 del st.session_state[key]
-        st.session_state.state = 'initial'
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+VIEWS = {
+    'initial': initial_view,
+    'follow_up': follow_up_view,
+    'result': result_view,
+}
+
+SESSION_DEFAULTS = {
+    'state': 'initial',
+    'keywords': {},
+    'questions': [],
+    'missing_fields': [],
+    'partial_facts': {},
+    'results': [],
+    'card_keys': [],
+}
+
+st.set_page_config(
+    page_title="Sistema Especialista",
+    page_icon=":robot:",
+    layout="centered",
+    initial_sidebar_state="collapsed"
+)
+st.title("Sistema Especialista de Identificação de Violência")
+
+for key, default in SESSION_DEFAULTS.items():
+    if key not in st.session_state:
+        st.session_state[key] = copy.copy(default)
+
+institution = get_institution()
+if institution not in INSTITUTIONS:
+    st.error(f"Instituição desconhecida: {institution}")
+    st.stop()
+
+expert_system = get_expert_system(institution)
+
+VIEWS[st.session_state.state]()
@@ -0,0 +1,90 @@
+import sys
+import os
+import random
+import re
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base.keyword_aliases import KEYWORD_ALIASES, AliasReplacer, get_alias_replacer
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+
+def _legacy(text, keyword_aliases=KEYWORD_ALIASES):
+    """apply_aliases_to_text como era: um re.sub por alias, dos maiores para os menores."""
+    for keyword, alias in sorted(keyword_aliases.items(), key=lambda x: len(x[0]), reverse=True):
+        if keyword.replace("_", "").isalnum():
+            pattern = rf'\b{re.escape(keyword)}\b'
+        else:
+            pattern = rf'{re.escape(keyword)}'
+        text = re.sub(pattern, alias, text, flags=re.IGNORECASE)
+    return text
+
+
+def test_explanations_match_sequential_substitution():
+    rng = random.Random(0)
+    corpus = {
+        index: {category: rng.sample(keywords, min(2, len(keywords))) for category, keywords in KEYWORDS_DICT.items()}
+        for index in range(20)
+    }
+    batch = ExpertSystem(api_key="test").classify_batch(corpus)
+    lines = [
+        line
+        for result in batch.values()
+        for classification in result["classifications"]
+        for line in classification["explanation"]
+    ]
+    assert lines
+
+    replacer = get_alias_replacer()
+    assert replacer is get_alias_replacer()
+    for line in lines:
+        assert replacer(line) == _legacy(line)
+
+    # As explicações passam pela alternação, sem voltar à sequência de re.sub
+    replacer = AliasReplacer(KEYWORD_ALIASES)
+    replacer._apply_sequence = None
+    for line in lines:
+        assert replacer(line) == _legacy(line)
+
+
+def test_overlapping_and_unusual_text_matches_sequential_substitution():
+    replacer = AliasReplacer(KEYWORD_ALIASES)
+    # Palavras-chave sem boundary que cortam palavras, alias que forma outra
+    # palavra-chave com o texto vizinho e equivalências de caixa do re fora do ASCII
+    for text in ["_AmeaçasComportamentos deficiencia", "NATUREZA_SEXUAL_NAO_CONSENTIDO TIPOS",
+                 "\u212aEY ameaca \u0130nsulto In\u017fulto", ""]:
+        assert replacer(text) == _legacy(text)
+
+    rng = random.Random(1)
+    pieces = list(KEYWORD_ALIASES) + list(KEYWORD_ALIASES.values()) + ["de", "do", "tipos", "ção", "\u212a", "\u017f"]
+    for _ in range(2000):
+        text = "".join(
+            rng.choice([piece, piece.upper(), piece.title()]) + rng.choice(["", " ", ", ", "_", "/"])
+            for piece in rng.sample(pieces, rng.randint(1, 6))
+        )
+        assert replacer(text) == _legacy(text)
+
+    aliases = {"do tipo": "DO TIPO", "grupo": r"\g<0> (\g<0>)", "tipo_a": "Tipo A"}
+    assert AliasReplacer(aliases)("Grupo do tipo_a") == _legacy("Grupo do tipo_a", aliases)
+
+
+def test_overlapping_keywords_match_sequential_substitution():
+    # Palavras-chave que se sobrepõem, que começam juntas, aliases que formam
+    # palavras-chave com o vizinho e aliases vazios
+    tables = [
+        {"do tipo": "X do", "tipo": "Tipo!", "ameaca do": "ameaça", "do": "DO", "ca do": "zz", "a": "b", "b c": "c"},
+        {"ab": "ba", "ba": "ab", "a b": "b a", "b a": "ab", "aa": "a", "a": "aa"},
+        {"x-y": "y", "y-z": "x", "y": "x-", "x": "-y", "z": ""},
+        {"Genero": "genero", "genero": "Gênero", "gen": "GEN", "ero da": "o"},
+    ]
+    for seed, aliases in enumerate(tables):
+        replacer = AliasReplacer(aliases)
+        rng = random.Random(seed)
+        pieces = list(aliases) + list(aliases.values()) + ["de", "do", "ção", "\u212a", "\u0130", " ", "-", "a"]
+        for _ in range(3000):
+            text = "".join(
+                rng.choice([piece, piece.upper(), piece.title()]) + rng.choice(["", "", " ", ", ", "_", "-"])
+                for piece in rng.sample(pieces, rng.randint(1, 7))
+            )
+            assert replacer(text) == _legacy(text, aliases)
@@ -0,0 +1,140 @@
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.analysis_job import AnalysisCancelled, submit_analysis
+from engine.expert_system import ExpertSystem
+
+
+def _slow_groq(expert_system, keywords):
+    """Chamada ao Groq que só responde quando o teste liberar."""
+    groq_api = expert_system.text_processor.groq_api
+    started, release = threading.Event(), threading.Event()
+
+    def send_request(prompt, http=None):
+        started.set()
+        release.wait(5)
+        return groq_api.validate_response({"identified_keywords": keywords})
+
+    groq_api.send_request = send_request
+    return started, release
+
+
+def test_analysis_runs_in_background_and_reports_stages():
+    expert_system = ExpertSystem(api_key="test")
+    started, release = _slow_groq(expert_system, {"action_type": ["perseguicao"]})
+
+    job = submit_analysis(expert_system, "Uma pessoa me segue todos os dias no campus.")
+    assert started.wait(5)
+    assert job.stage == "extracting" and not job.done()
+
+    release.set()
+    outcome = job.result()
+    assert job.stage == "rendering"
+    assert [c["violence_type"] for c in outcome["classifications"]] == ["perseguicao"]
+    assert len(outcome["card_keys"]) == 1
+    assert outcome["keywords"] == {"action_type": ["perseguicao"]}
+
+    # O follow-up parte do token da sessão
+    _, release = _slow_groq(expert_system, {"impact": ["medo_inseguranca"]})
+    release.set()
+    follow_up = submit_analysis(expert_system, "Tenho medo.", follow_up=True,
+                                session_token=outcome["session_token"]).result()
+    assert follow_up["keywords"] == {"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]}
+
+
+def test_follow_up_on_the_same_system_stays_incremental():
+    expert_system = ExpertSystem(api_key="test")
+    _, release = _slow_groq(expert_system, {"action_type": ["perseguicao"]})
+    release.set()
+    outcome = submit_analysis(expert_system, "Uma pessoa me segue todos os dias no campus.").result()
+
+    # O token é o da sessão já carregada: nada é restaurado, o motor segue incremental
+    restores = []
+    expert_system.restore_session = restores.append
+    _, release = _slow_groq(expert_system, {"impact": ["medo_inseguranca"]})
+    release.set()
+    follow_up = submit_analysis(expert_system, "Tenho medo.", follow_up=True,
+                                session_token=outcome["session_token"]).result()
+    assert restores == []
+    assert follow_up["keywords"] == {"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]}
+
+
+def test_cancel_stops_before_changing_the_session():
+    expert_system = ExpertSystem(api_key="test")
+    started, release = _slow_groq(expert_system, {"action_type": ["perseguicao"]})
+
+    job = submit_analysis(expert_system, "Uma pessoa me segue todos os dias no campus.")
+    assert started.wait(5)
+    job.cancel()
+    release.set()
+
+    with pytest.raises(AnalysisCancelled):
+        job.result()
+    job.future.exception(5)
+    assert job.stage == "extracting"
+    assert expert_system.session_keywords == {}
+
+
+def test_slow_groq_call_does_not_hold_the_system():
+    # Sessões diferentes: uma chamada lenta não segura a outra
+    slow, fast = ExpertSystem(api_key="test"), ExpertSystem(api_key="test")
+    started, release = _slow_groq(slow, {"action_type": ["perseguicao"]})
+    _, fast_release = _slow_groq(fast, {"action_type": ["cyberbullying"]})
+    fast_release.set()
+
+    blocked = submit_analysis(slow, "Uma pessoa me segue todos os dias no campus.")
+    assert started.wait(5)
+    assert submit_analysis(fast, "Recebo mensagens ofensivas.").result()["keywords"] == {
+        "action_type": ["cyberbullying"]
+    }
+
+    # Mesma sessão: cancelada durante a chamada ao Groq, a análise seguinte não espera por ela
+    blocked.cancel()
+    _, next_release = _slow_groq(slow, {"action_type": ["insulto_racial"]})
+    next_release.set()
+    outcome = submit_analysis(slow, "Ele me xingou.").future.result(timeout=5)
+    assert outcome["keywords"] == {"action_type": ["insulto_racial"]}
+    assert not blocked.future.done()
+    release.set()
+    with pytest.raises(AnalysisCancelled):
+        blocked.future.result(timeout=5)
+
+
+def test_cancel_aborts_the_groq_request_in_flight():
+    received, release = threading.Event(), threading.Event()
+
+    class SlowGroq(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.set()
+            release.wait(10)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowGroq)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        expert_system = ExpertSystem(api_key="test")
+        expert_system.text_processor.groq_api.endpoint = f"http://127.0.0.1:{server.server_port}/"
+
+        job = submit_analysis(expert_system, "Uma pessoa me segue todos os dias no campus.")
+        assert received.wait(5)
+        started = time.monotonic()
+        job.cancel()
+
+        # A thread de trabalho volta sem esperar a resposta nem o tempo limite
+        job.future.exception(5)
+        assert time.monotonic() - started < 2
+        assert job.stage == "extracting"
+        assert expert_system.session_keywords == {}
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
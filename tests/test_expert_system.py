@@ -0,0 +1,192 @@
+import base64
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from engine.facts import KeywordFact
+from engine.result_cache import ResultCache
+from engine.rules import ViolenceRules
+
+
+def _fake_groq(expert_system, responses):
+    """Substitui a chamada ao Groq por respostas fixas, na ordem dada."""
+    groq_api = expert_system.text_processor.groq_api
+    pending = list(responses)
+
+    def send_request(prompt, http=None):
+        return groq_api.validate_response({"identified_keywords": pending.pop(0)})
+
+    groq_api.send_request = send_request
+
+
+def _types(result):
+    return {(c["violence_type"], c["subtype"]) for c in result["classifications"]}
+
+
+def test_follow_up_keeps_original_facts():
+    expert_system = ExpertSystem(api_key="test")
+    _fake_groq(expert_system, [
+        {"action_type": ["perseguicao"]},
+        {"action_type": ["insulto_racial"], "target": ["raca_etnia"]},
+    ])
+
+    first = expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    assert _types(first) == {("perseguicao", "")}
+
+    second = expert_system.analyze_follow_up("Ele também me xingou por causa da minha raça.")
+    assert _types(second) == {("perseguicao", ""), ("discriminacao_racial", "ofensa_direta")}
+    assert second["multiple_types"] is True
+    assert expert_system.session_keywords == {
+        "action_type": ["perseguicao", "insulto_racial"],
+        "target": ["raca_etnia"],
+    }
+
+
+def test_follow_up_declares_only_new_facts():
+    expert_system = ExpertSystem(api_key="test")
+    _fake_groq(expert_system, [
+        {"action_type": ["perseguicao"]},
+        {"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]},
+    ])
+
+    expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    expert_system.analyze_follow_up("Continua me seguindo e tenho medo.")
+
+    keyword_facts = [
+        (f["category"], f["keyword"]) for f in expert_system.engine.facts.values()
+        if isinstance(f, KeywordFact)
+    ]
+    assert sorted(keyword_facts) == [("action_type", "perseguicao"), ("impact", "medo_inseguranca")]
+
+
+def test_follow_up_without_session_runs_full_analysis():
+    expert_system = ExpertSystem(api_key="test")
+    _fake_groq(expert_system, [{"action_type": ["cyberbullying"]}])
+
+    result = expert_system.analyze_follow_up("Recebo mensagens ofensivas nas redes sociais.")
+    assert _types(result) == {("violencia_digital", "cyberbullying")}
+
+
+def test_repeated_fact_set_is_served_from_cache():
+    expert_system = ExpertSystem(api_key="test")
+    _fake_groq(expert_system, [
+        {"action_type": ["cyberbullying"], "context": ["ambiente_online"]},
+        {"context": ["ambiente_online"], "action_type": ["cyberbullying"]},
+    ])
+
+    first = expert_system.analyze_text("Recebo mensagens ofensivas nas redes sociais.")
+    expert_system.engine.reset()
+    second = expert_system.analyze_text("Fui atacada na internet com mensagens ofensivas.")
+
+    assert second == first
+    assert expert_system.cache_stats()["hits"] == 1
+    assert expert_system.cache_stats()["misses"] == 1
+
+
+def test_follow_up_after_cached_analysis_loads_session():
+    expert_system = ExpertSystem(api_key="test")
+    _fake_groq(expert_system, [
+        {"action_type": ["perseguicao"]},
+        {"action_type": ["perseguicao"]},
+        {"action_type": ["insulto_racial"]},
+    ])
+
+    expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    expert_system.analyze_text("Alguém me segue pelo campus.")
+    result = expert_system.analyze_follow_up("Ele também me xingou por causa da minha raça.")
+
+    assert _types(result) == {("perseguicao", ""), ("discriminacao_racial", "ofensa_direta")}
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.stats()["size"] == 2
+
+
+def test_session_snapshot_restores_in_another_instance():
+    origin = ExpertSystem(api_key="test")
+    _fake_groq(origin, [{"action_type": ["perseguicao"]}])
+    origin.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    token = origin.export_session()
+
+    replica = ExpertSystem(api_key="test")
+    _fake_groq(replica, [{"action_type": ["insulto_racial"], "target": ["raca_etnia"]}])
+    replica.restore_session(token)
+    assert replica.session_keywords == {"action_type": ["perseguicao"]}
+
+    result = replica.analyze_follow_up("Ele também me xingou por causa da minha raça.")
+    assert _types(result) == {("perseguicao", ""), ("discriminacao_racial", "ofensa_direta")}
+    assert len(token) < 4096
+
+
+def test_engine_restore_does_not_refire_rules():
+    origin = ExpertSystem(api_key="test")
+    _fake_groq(origin, [{"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]}])
+    origin.analyze_text("Uma pessoa me segue e tenho medo.")
+
+    engine = ViolenceRules()
+    engine.restore(origin.engine.snapshot())
+
+    assert engine.agenda.activations == []
+    assert engine.explanations == origin.engine.explanations
+    assert len(engine.facts) == len(origin.engine.facts)
+
+
+def test_relato_ids_are_unique_across_instances():
+    origin = ExpertSystem(api_key="test")
+    _fake_groq(origin, [{"action_type": ["perseguicao"]}])
+    origin.analyze_text("Uma pessoa me segue todos os dias no campus.")
+
+    replica = ExpertSystem(api_key="test")
+    _fake_groq(replica, [{"action_type": ["cyberbullying"]}])
+    replica.analyze_text("Recebo mensagens ofensivas nas redes sociais.")
+    assert replica._session_relato_id != origin._session_relato_id
+
+    # A sessão importada mantém o id de origem
+    replica.restore_session(origin.export_session())
+    assert replica._session_relato_id == origin._session_relato_id
+
+
+def test_export_after_cache_hit_does_not_run_engine():
+    origin = ExpertSystem(api_key="test")
+    _fake_groq(origin, [{"action_type": ["perseguicao"]}, {"action_type": ["perseguicao"]}])
+    origin.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    origin.analyze_text("Alguém me segue pelo campus.")
+
+    runs = []
+    origin._run_full_analysis = lambda *args, **kwargs: runs.append(args)
+    token = origin.export_session()
+    assert runs == [] and origin.cache_stats()["hits"] == 1
+
+    # Os fatos de entrada disparam as regras no motor que recebe o follow-up
+    replica = ExpertSystem(api_key="test")
+    _fake_groq(replica, [{"action_type": ["insulto_racial"], "target": ["raca_etnia"]}])
+    replica.restore_session(token)
+    result = replica.analyze_follow_up("Ele também me xingou por causa da minha raça.")
+    assert _types(result) == {("perseguicao", ""), ("discriminacao_racial", "ofensa_direta")}
+
+
+def test_tampered_session_token_is_rejected():
+    origin = ExpertSystem(api_key="test")
+    _fake_groq(origin, [{"action_type": ["perseguicao"]}])
+    origin.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    blob = bytearray(base64.urlsafe_b64decode(origin.export_session()))
+    blob[-1] ^= 1
+
+    with pytest.raises(ValueError):
+        ExpertSystem(api_key="test").restore_session(base64.urlsafe_b64encode(bytes(blob)).decode("ascii"))
+
+    # Token truncado também é recusado com ValueError
+    with pytest.raises(ValueError):
+        ExpertSystem(api_key="test").restore_session(base64.urlsafe_b64encode(b"VLS").decode("ascii"))
@@ -0,0 +1,62 @@
+import copy
+import sys
+import os
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base import keyword_aliases, keywords_dictionary, versioning
+from knowledge_base.fingerprint import content_fingerprint, get_fingerprints
+
+
+def test_content_fingerprint_is_canonical():
+    assert content_fingerprint({"a": [1, 2], "b": "x"}) == content_fingerprint({"b": "x", "a": (1, 2)})
+    assert content_fingerprint({"a": [1, 2]}) != content_fingerprint({"a": [2, 1]})
+
+
+def test_results_are_stamped_and_survive_reload_with_same_content():
+    expert_system = ExpertSystem(api_key="test")
+    fingerprints = expert_system.fingerprints
+    assert set(fingerprints) == {
+        "keywords", "descriptions", "concept_mapping", "concept_to_field", "violence_types",
+        "severity", "knowledge_base", "rules", "combined"
+    }
+    assert fingerprints["rules"] == expert_system.rule_base_version
+    assert get_fingerprints() is get_fingerprints()
+
+    keywords = {"action_type": ["perseguicao"]}
+    batch = expert_system.classify_batch({"caso": keywords})
+    assert batch["caso"]["fingerprint"] == fingerprints["combined"]
+
+    previous = versioning.current_version()
+    knowledge_base = get_fingerprints()
+    try:
+        versioning.reload_knowledge_base(force=True)
+        # Versão nova com o mesmo conteúdo: mesma impressão digital
+        assert get_fingerprints() is not knowledge_base
+        assert get_fingerprints() == knowledge_base
+        assert expert_system.fingerprints == fingerprints
+    finally:
+        versioning._publish(previous)
+
+
+def test_weight_matrix_inputs_change_the_fingerprint():
+    expert_system = ExpertSystem(api_key="test")
+    combined = expert_system.fingerprints["combined"]
+
+    # Versão nova montada de um dicionário com um peso alterado; a publicada não é tocada
+    modified = types.ModuleType(keywords_dictionary.__name__)
+    modified.__dict__.update(vars(keywords_dictionary))
+    modified.CONCEPT_MAPPING = copy.deepcopy(keywords_dictionary.CONCEPT_MAPPING)
+    modified.CONCEPT_MAPPING["comportamentos"]["interrupcao"]["microagressoes"]["interrupcoes_constantes"] += 1
+
+    previous = versioning.current_version()
+    try:
+        versioning._publish(versioning.KnowledgeBaseVersion(
+            previous.number + 1, previous.digest, previous.manager, modified, keyword_aliases
+        ))
+        assert expert_system.fingerprints["combined"] != combined
+    finally:
+        versioning._publish(previous)
+    assert expert_system.fingerprints["combined"] == combined
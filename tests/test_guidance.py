@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import ExplanationSystem
+from knowledge_base import violence_types
+from knowledge_base.guidance import build_guidance_table, get_guidance, get_guidance_table
+
+
+def _chain(violence_type, subtype, key, default):
+    """Busca com fallback para o tipo, como era feita em cada método."""
+    info = violence_types.VIOLENCE_TYPES.get(violence_type, {})
+    if subtype and 'subtipos' in info and subtype in info['subtipos']:
+        return info['subtipos'][subtype].get(key, info.get(key, default))
+    return info.get(key, default)
+
+
+def test_guidance_matches_lookup_chain_for_every_classification():
+    pairs = [("tipo_inexistente", None), ("microagressoes", "subtipo_inexistente")]
+    for vtype, info in violence_types.VIOLENCE_TYPES.items():
+        pairs.append((vtype, None))
+        pairs.extend((vtype, subtype) for subtype in info.get('subtipos', {}))
+
+    for vtype, subtype in pairs:
+        explanation = ExplanationSystem.format_complete_explanation(vtype, subtype)
+        assert explanation['definition'] == _chain(vtype, subtype, 'definicao', '')
+        assert explanation['legal_context'] == _chain(vtype, subtype, 'contexto_legal', '')
+        assert explanation['severity'] == _chain(vtype, subtype, 'gravidade', '')
+        assert explanation['recommendations'] == list(_chain(vtype, subtype, 'recomendacoes', []))
+        assert explanation['reporting_channels'] == list(_chain(vtype, subtype, 'canais_denuncia', []))
+
+
+def test_table_is_built_once_per_version():
+    assert get_guidance_table() is get_guidance_table()
+    assert get_guidance("perseguicao") is get_guidance("perseguicao", "")
+
+
+def test_subtype_without_definition_uses_the_type_definition():
+    table = build_guidance_table({
+        "perseguicao": {
+            "definicao": "Definição do tipo",
+            "subtipos": {"digital": {"definicao": ""}, "presencial": {}, "outro": {"definicao": "Própria"}}
+        }
+    })
+    assert table[("perseguicao", "digital")].definition == "Definição do tipo"
+    assert table[("perseguicao", "presencial")].definition == "Definição do tipo"
+    assert table[("perseguicao", "outro")].definition == "Própria"
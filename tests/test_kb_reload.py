@@ -0,0 +1,91 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base import keywords_dictionary, versioning
+from knowledge_base.violence_manager import get_violence_types
+from knowledge_base.weight_matrix import get_weight_matrix
+
+
+@pytest.fixture(autouse=True)
+def restore_version():
+    previous = versioning.current_version()
+    yield
+    versioning._publish(previous)
+
+
+def test_reload_swaps_version_but_pinned_context_keeps_old():
+    old = versioning.current_version()
+    old_matrix = get_weight_matrix()
+    old_types = dict(get_violence_types())
+
+    with versioning.pinned(old):
+        new = versioning.reload_knowledge_base(force=True)
+        assert get_weight_matrix() is old_matrix
+        assert versioning.active_version() is old
+
+    assert versioning.current_version() is new
+    assert new.number == old.number + 1
+    assert get_weight_matrix() is not old_matrix
+    assert dict(get_violence_types()) == old_types
+    # As fontes são executadas em módulos novos; os importados não mudam
+    assert new.keywords_dict == keywords_dictionary.KEYWORDS_DICT
+    assert new.keywords_dict is not keywords_dictionary.KEYWORDS_DICT
+
+
+def test_reload_without_changes_keeps_version_and_failure_keeps_current(monkeypatch):
+    current = versioning.current_version()
+    assert versioning.reload_knowledge_base() is current
+
+    def broken(name):
+        raise SyntaxError("fonte inválida")
+
+    monkeypatch.setattr(versioning, "_fresh_module", broken)
+    with pytest.raises(SyntaxError):
+        versioning.reload_knowledge_base(force=True)
+    assert versioning.current_version() is current
+
+
+def test_in_flight_analysis_finishes_on_old_version_and_results_are_invalidated(monkeypatch):
+    expert_system = ExpertSystem(api_key="test")
+    groq_api = expert_system.text_processor.groq_api
+    old = versioning.current_version()
+    seen = []
+    fresh_module = versioning._fresh_module
+
+    def edited_module(name):
+        # Simula uma edição em keywords_dictionary.py
+        module = fresh_module(name)
+        if name == "knowledge_base.keywords_dictionary":
+            module.KEYWORD_DESCRIPTIONS = {**module.KEYWORD_DESCRIPTIONS, "perseguicao": "Descrição nova."}
+        return module
+
+    monkeypatch.setattr(versioning, "_fresh_module", edited_module)
+
+    def send_request(prompt, http=None):
+        # A recarga acontece no meio da análise
+        if not seen:
+            versioning.reload_knowledge_base(force=True)
+        seen.append((versioning.active_version(), prompt["system"]))
+        return groq_api.validate_response({"identified_keywords": {"action_type": ["perseguicao"]}})
+
+    groq_api.send_request = send_request
+
+    first = expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    assert seen[0][0] is old
+    assert versioning.current_version() is not old
+
+    second = expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+    assert seen[1][0] is versioning.current_version()
+    # Mesmo texto, prompt refeito a partir das descrições da versão nova
+    assert "Descrição nova." not in seen[0][1]
+    assert "Descrição nova." in seen[1][1]
+    assert groq_api.keyword_dict is versioning.current_version().keywords_dict
+    # O resultado da versão anterior não é reaproveitado
+    assert expert_system.cache_stats()["hits"] == 0
+    assert second["classifications"] == first["classifications"]
+    assert second["fingerprint"] != first["fingerprint"]
@@ -0,0 +1,32 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knowledge_base.keyword_index import KeywordIndex
+from knowledge_base.models.violence_type import ViolenceType, ViolenceSubtype, Severity
+from knowledge_base.violence_manager import get_violence_manager
+
+
+def test_substring_matches_in_knowledge_base_order():
+    results = get_violence_manager().search_by_keywords(["interromper", "AMEA"])
+
+    assert results == [
+        ("microagressoes", None, 1),
+        ("microagressoes", "interrupcoes_constantes", 1),
+        ("perseguicao", None, 1),
+        ("violencia_sexual", "estupro", 1),
+        ("abuso_psicologico", None, 1),
+        ("violencia_digital", None, 1),
+    ]
+
+
+def test_counts_every_query_keyword_and_orders_by_relevance():
+    vtype = ViolenceType(name="tipo", definition="", severity=Severity.MEDIA, keywords=["ameaçar"]).with_subtype(
+        ViolenceSubtype(name="sub", definition="", keywords=["ameaça grave", "ofensa"])
+    )
+    index = KeywordIndex({"tipo": vtype})
+
+    assert index.search(["ame", "ofen", "ofen", "xyz"]) == [("tipo", "sub", 3), ("tipo", None, 1)]
+    assert index.search(["a"]) == [("tipo", None, 1), ("tipo", "sub", 1)]
+    assert index.search([]) == []
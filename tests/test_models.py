@@ -0,0 +1,35 @@
+import sys
+import os
+import pickle
+from dataclasses import FrozenInstanceError
+from types import MappingProxyType
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knowledge_base.models.violence_type import ViolenceType
+from knowledge_base.violence_manager import ViolenceTypeManager
+
+
+def _models():
+    manager = ViolenceTypeManager()
+    violence_types = list(manager.get_all_violence_types().values())
+    subtypes = [subtype for vtype in violence_types for subtype in vtype.subtypes.values()]
+    return violence_types + subtypes + list(manager.get_all_report_channels().values())
+
+
+def test_models_are_frozen_and_slotted():
+    for model in _models():
+        with pytest.raises(FrozenInstanceError):
+            model.name = "outro"
+        assert not hasattr(model, "__dict__")
+
+
+def test_models_survive_pickle():
+    for model in _models():
+        restored = pickle.loads(pickle.dumps(model))
+        assert restored == model
+        # Os subtipos continuam somente leitura depois de restaurados
+        if isinstance(model, ViolenceType):
+            assert isinstance(restored.subtypes, MappingProxyType)
@@ -0,0 +1,46 @@
+import sys
+import os
+import random
+import contextlib
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+CATEGORIES = ["action_type", "frequency", "context", "target", "relationship", "impact"]
+
+
+def _corpus(size, seed):
+    rng = random.Random(seed)
+    return {
+        f"caso-{index}": {
+            category: rng.sample(KEYWORDS_DICT[category], rng.randint(1, 3))
+            for category in rng.sample(CATEGORIES, rng.randint(1, 6))
+        }
+        for index in range(size)
+    }
+
+
+def _one_by_one(expert_system, corpus):
+    results = {}
+    for case_id, keywords in corpus.items():
+        expert_system.engine.load_facts(expert_system.text_processor.build_keyword_facts(keywords))
+        expert_system.engine.run()
+        results[case_id] = expert_system._collect_results()
+    return results
+
+
+def test_batch_matches_one_by_one():
+    corpus = _corpus(40, seed=2)
+    corpus["vazio"] = {}
+
+    for backend in ("experta", "compiled"):
+        expert_system = ExpertSystem(api_key="test", engine=backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = _one_by_one(expert_system, corpus)
+            batch = expert_system.classify_batch(corpus)
+
+        assert list(batch) == list(corpus)
+        assert batch == expected
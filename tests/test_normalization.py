@@ -0,0 +1,47 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+from knowledge_base.normalization import normalize_term, TermSet
+from knowledge_base.violence_manager import get_violence_manager
+from utils.groq_integration import GroqAPI
+
+
+def test_normalize_term_folds_case_accents_and_separators():
+    assert normalize_term("Ameaça") == "ameaca"
+    assert normalize_term("  Não_deixar   FALAR ") == "nao deixar falar"
+    assert normalize_term("histérico") is normalize_term("HISTERICO")
+
+
+def test_term_set_returns_canonical_form():
+    terms = TermSet(["ameaca", "não deixar falar"])
+
+    assert terms.canonical("Ameaça") == "ameaca"
+    assert terms.canonical("nao_deixar_falar") == "não deixar falar"
+    assert terms.canonical("ameacar") is None
+    assert terms.canonical(["ameaca"]) is None
+
+
+def test_validate_response_accepts_variants():
+    groq_api = GroqAPI(api_key="test")
+    groq_api.build_prompt("relato", KEYWORDS_DICT)
+
+    response = groq_api.validate_response({"identified_keywords": {
+        "action_type": ["Ameaça", "ameaca", "HUMILHAÇÃO", "inventada"],
+        "impact": ["medo inseguranca"],
+        "categoria_inventada": ["ameaca"],
+    }})
+
+    assert response["identified_keywords"] == {
+        "action_type": ["ameaca", "humilhacao"],
+        "impact": ["medo_inseguranca"],
+    }
+
+
+def test_search_ignores_accents():
+    manager = get_violence_manager()
+
+    assert manager.search_by_keywords(["ameacar"]) == manager.search_by_keywords(["AMEAÇAR"])
+    assert ("microagressoes", "interrupcoes_constantes", 1) in manager.search_by_keywords(["nao_deixar"])
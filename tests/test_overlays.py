@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from knowledge_base.models.institution import InstitutionOverlay
+from knowledge_base.models.violence_type import ViolenceSubtype, ReportChannel
+from knowledge_base.violence_manager import (
+    InstitutionViolenceTypeManager, get_base_manager, get_violence_manager, get_report_contact
+)
+
+OVERLAY = InstitutionOverlay(
+    name="teste",
+    report_channels={
+        "Ouvidoria": ReportChannel(name="Ouvidoria", description="Ouvidoria local", contact="ouvidoria@teste.br"),
+        "Nucleo_Genero": ReportChannel(name="Núcleo de Gênero", description="Atendimento especializado"),
+    },
+    recommendations={("perseguicao", None): ("Procure a segurança do campus",)},
+    extra_subtypes={"microagressoes": (ViolenceSubtype(name="apelidos", definition="Apelidos depreciativos"),)},
+)
+
+
+def test_default_institution_keeps_ufape_contacts():
+    assert get_report_contact()["Ouvidoria"]["contato"] == "ouvidoria@ufape.edu.br"
+    assert get_base_manager().get_report_channel("Ouvidoria").contact == ""
+
+
+def test_overlay_resolves_deltas_over_shared_base():
+    base = get_base_manager()
+    manager = InstitutionViolenceTypeManager(base, OVERLAY)
+
+    assert manager.get_report_channel("Ouvidoria").contact == "ouvidoria@teste.br"
+    assert manager.get_report_channel("Policia") is base.get_report_channel("Policia")
+    assert manager.get_recommendations("perseguicao") == ("Procure a segurança do campus",)
+    assert list(manager.get_violence_type("microagressoes").subtypes)[-1] == "apelidos"
+
+    # Tipos não tocados e campos não alterados são os mesmos objetos da base
+    assert manager.get_violence_type("xenofobia") is base.get_violence_type("xenofobia")
+    changed, original = manager.get_violence_type("perseguicao"), base.get_violence_type("perseguicao")
+    assert changed.keywords is original.keywords
+    assert manager.get_violence_type("microagressoes").subtypes["estereotipos"] is \
+        base.get_violence_type("microagressoes").subtypes["estereotipos"]
+
+    # A base e as outras instituições não enxergam a sobreposição
+    assert base.get_violence_type("microagressoes").get_subtype("apelidos") is None
+    assert get_violence_manager().get_report_channel("Nucleo_Genero") is None
+    assert list(manager.get_all_violence_types()) == list(base.get_all_violence_types())
+
+
+def test_unknown_institution_or_type_is_rejected():
+    with pytest.raises(ValueError):
+        get_violence_manager("inexistente")
+    with pytest.raises(ValueError):
+        InstitutionViolenceTypeManager(get_base_manager(), InstitutionOverlay(
+            name="erro", recommendations={("inexistente", None): ()}
+        ))
+
+
+def test_expert_system_uses_its_institution(monkeypatch):
+    from engine.expert_system import ExpertSystem
+    from knowledge_base.institutions import INSTITUTIONS
+    from utils.result_cards import card_key, get_card
+
+    monkeypatch.setitem(INSTITUTIONS, OVERLAY.name, OVERLAY)
+    keywords = {"action_type": ["perseguicao"], "frequency": ["repetidamente"]}
+    default, overlaid = ExpertSystem(api_key="test"), ExpertSystem(api_key="test", institution="teste")
+
+    classification = overlaid.classify_batch({"caso": keywords})["caso"]["classifications"][0]
+    key = card_key(classification, overlaid.institution)
+    assert key[0] == "teste"
+    assert "Procure a segurança do campus" in get_card(key, classification).details
+    assert "Procure a segurança do campus" not in get_card(card_key(classification), classification).details
+    # Resultados de instituições diferentes não compartilham a impressão digital
+    assert overlaid.fingerprints["combined"] != default.fingerprints["combined"]
+
+    with pytest.raises(ValueError):
+        ExpertSystem(api_key="test", institution="inexistente")
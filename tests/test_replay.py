@@ -0,0 +1,112 @@
+import sys
+import os
+import random
+import contextlib
+import io
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from engine.replay import ReplayJournal, ReplayLog, replay, diff_results, main
+from engine.rules import ViolenceRules
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+CATEGORIES = ["action_type", "frequency", "context", "target", "relationship", "impact"]
+
+
+class NoStalkingRules(ViolenceRules):
+    """Candidata sem as regras de perseguição."""
+    detect_perseguicao = None
+    detect_perseguicao_com_medo = None
+
+
+def _history(size, seed):
+    rng = random.Random(seed)
+    corpus = {
+        index: {
+            category: rng.sample(KEYWORDS_DICT[category], rng.randint(1, 3))
+            for category in rng.sample(CATEGORIES, rng.randint(1, 6))
+        }
+        for index in range(size)
+    }
+    corpus[size] = {"action_type": ["perseguicao"]}
+
+    expert_system = ExpertSystem(api_key="test", engine="compiled")
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = expert_system.classify_batch(corpus)
+
+    log = ReplayLog(expert_system.rule_base_version)
+    for case_id, keywords in corpus.items():
+        log.append(keywords, results[case_id]["classifications"], case_id=f"caso-{case_id}")
+    return log
+
+
+def test_log_round_trip():
+    log = _history(50, seed=4)
+    restored = ReplayLog.decode(log.encode())
+
+    assert restored.case_ids == log.case_ids
+    assert restored.keywords == log.keywords
+    assert restored.classifications == log.classifications
+    assert restored.rule_base_version == log.rule_base_version
+
+
+def test_replay_reports_only_changed_cases():
+    log = _history(120, seed=8)
+
+    assert diff_results(log, replay(log, workers=2, chunk_size=40)) == []
+
+    changes = diff_results(log, replay(log, f"{__name__}:NoStalkingRules", workers=1))
+    assert changes
+    assert {"case_id": "caso-120", "added": [], "removed": [["perseguicao", ""]],
+            "primary_before": ["perseguicao", ""], "primary_after": None} in changes
+    for change in changes:
+        assert change["removed"] == [["perseguicao", ""]] or change["primary_before"] != change["primary_after"]
+
+
+def test_reordered_secondary_types_are_not_a_change():
+    log = ReplayLog("v")
+    log.append({"action_type": ["perseguicao"]}, [
+        {"violence_type": "perseguicao"}, {"violence_type": "cyberbullying"}, {"violence_type": "assedio_moral"}
+    ])
+    reordered = [(("perseguicao", ""), ("assedio_moral", ""), ("cyberbullying", ""))]
+    assert diff_results(log, reordered) == []
+
+    new_primary = [(("cyberbullying", ""), ("perseguicao", ""), ("assedio_moral", ""))]
+    assert diff_results(log, new_primary)[0]["primary_after"] == ["cyberbullying", ""]
+
+
+def test_journal_keeps_latest_analysis_of_each_relato(tmp_path):
+    path = str(tmp_path / "historico" / "replay.jsonl")
+    expert_system = ExpertSystem(api_key="test")
+    expert_system.history = ReplayJournal(path)
+    groq_api = expert_system.text_processor.groq_api
+    responses = [{"action_type": ["perseguicao"]}, {"impact": ["medo_inseguranca"]}, {"action_type": ["cyberbullying"]}]
+    groq_api.send_request = lambda prompt, http=None: groq_api.validate_response({"identified_keywords": responses.pop(0)})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expert_system.analyze_text("Uma pessoa me segue todos os dias no campus.")
+        expert_system.analyze_follow_up("Tenho medo.")
+        expert_system.analyze_text("Recebo mensagens ofensivas.")
+
+    log = ReplayLog.load(path)
+    assert log.rule_base_version == expert_system.rule_base_version
+    assert len(log) == 2
+    assert log.keywords_of(0) == {"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]}
+    assert diff_results(log, replay(log, workers=1)) == []
+
+
+def test_replay_refuses_history_from_another_rule_base(tmp_path, capsys):
+    log = _history(5, seed=2)
+    log.rule_base_version = "antiga"
+    path = str(tmp_path / "historico.vlr")
+    log.save(path)
+
+    with pytest.raises(SystemExit):
+        main([path, "--workers", "1"])
+    assert "--rebaseline" in capsys.readouterr().err
+
+    main([path, "--workers", "1", "--rebaseline"])
+    assert "0 de 6 casos mudariam" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base.guidance import get_guidance
+from utils.result_cards import CardCache, ResultCard, card_key, get_card, get_card_cache
+
+
+def test_card_is_rendered_once_per_key():
+    expert_system = ExpertSystem(api_key="test")
+    keywords = {"action_type": ["perseguicao"], "frequency": ["repetidamente"], "impact": ["medo_inseguranca"]}
+    classification = expert_system.classify_batch({"caso": keywords})["caso"]["classifications"][0]
+
+    key = card_key(classification)
+    card = get_card(key, classification)
+    guidance = get_guidance(classification["violence_type"], classification.get("subtype"))
+
+    assert guidance.definition in card.details
+    assert "### Por que identificamos este tipo:" in card.details
+    assert "• O comportamento causou Medo e/ou insegurança" in card.details
+    assert "medo_inseguranca" not in card.details
+    # Mesma explicação, outro dicionário: o cartão vem do cache, sem montar de novo
+    assert get_card(card_key(dict(classification)), {}) is card
+    assert get_card_cache() is get_card_cache()
+
+
+def test_cache_is_bounded():
+    cache = CardCache(maxsize=2)
+    for index in range(3):
+        cache.put(index, ResultCard(title=str(index), details=""))
+    assert len(cache) == 2
+    assert cache.get(0) is None and cache.get(2).title == "2"
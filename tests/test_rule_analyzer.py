@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+import contextlib
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import ViolenceRules
+from engine.rules.rule_analyzer import RuleBaseAnalyzer
+from engine.text_processor import TextProcessor
+from engine.facts import ViolenceClassification
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+CATEGORIES = ["action_type", "frequency", "context", "target", "relationship", "impact"]
+
+
+def _analyzer():
+    return RuleBaseAnalyzer(ViolenceRules, KEYWORDS_DICT)
+
+
+def _classify(engine_class, keywords):
+    engine = engine_class()
+    facts = []
+    TextProcessor(api_key="test")._add_keyword_facts(facts, keywords)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.load_facts(facts)
+        engine.run()
+    return {
+        (fact["violence_type"], fact["subtype"])
+        for fact in engine.facts.values()
+        if isinstance(fact, ViolenceClassification)
+    }
+
+
+def test_reports_redundant_rules():
+    report = _analyzer().report()
+
+    subsumed = {item["rule"]: item["subsumed_by"] for item in report["subsumed"]}
+    assert subsumed["detect_perseguicao_com_medo"] == "detect_perseguicao"
+    assert subsumed["detect_discriminacao_racial_ofensa"] == "detect_insulto_racial_simples"
+
+    duplicates = {item["rule"]: item["duplicate_of"] for item in report["duplicates"]}
+    assert duplicates["detect_discriminacao_racial_comportamento"] == "detect_discriminacao_racial_ofensa"
+
+    assert "detect_insulto_racial_simples" not in report["prunable"]
+    assert "detect_perseguicao" not in report["prunable"]
+    assert "start_analysis_phase" not in report["prunable"]
+
+
+def test_pruned_engine_preserves_classifications():
+    pruned_class = _analyzer().compile_pruned()
+    assert len(pruned_class().get_rules()) < len(ViolenceRules().get_rules())
+
+    corpus = [
+        {"action_type": ["perseguicao"], "impact": ["medo_inseguranca"]},
+        {"action_type": ["insulto_racial"], "target": ["raca_etnia"]},
+        {"action_type": ["ameaca"], "relationship": ["relacao_hierarquica"]},
+    ]
+    rng = random.Random(7)
+    for _ in range(40):
+        keywords = {}
+        for category in rng.sample(CATEGORIES, rng.randint(1, 4)):
+            keywords[category] = rng.sample(KEYWORDS_DICT[category], rng.randint(1, 2))
+        corpus.append(keywords)
+
+    for keywords in corpus:
+        assert _classify(pruned_class, keywords) == _classify(ViolenceRules, keywords)
@@ -0,0 +1,101 @@
+import sys
+import os
+import random
+import contextlib
+import io
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from experta import P, Rule
+
+from engine.expert_system import ExpertSystem
+from engine.replay import build_batch_engine
+from engine.rules import ViolenceRules
+from engine.rules.rule_analyzer import collect_rules
+from engine.rules.rule_compiler import UnsupportedRuleError, compile_engine, generate_rule_module
+from engine.text_processor import TextProcessor
+from engine.facts import AnalysisResult, KeywordFact
+from knowledge_base.keywords_dictionary import KEYWORDS_DICT
+
+CATEGORIES = ["action_type", "frequency", "context", "target", "relationship", "impact"]
+
+
+def _corpus(size, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        keywords = {}
+        for category in rng.sample(CATEGORIES, rng.randint(1, 6)):
+            keywords[category] = rng.sample(KEYWORDS_DICT[category], rng.randint(1, 3))
+        corpus.append(keywords)
+    return corpus
+
+
+def _facts(keywords):
+    facts = []
+    TextProcessor(api_key="test")._add_keyword_facts(facts, keywords)
+    return facts
+
+
+def _result(engine):
+    results = [fact.as_dict() for fact in engine.facts.values() if isinstance(fact, AnalysisResult)]
+    return results, engine.explanations
+
+
+def test_generated_module_has_one_matcher_per_rule():
+    source = generate_rule_module(ViolenceRules)
+    compile(source, "<compiled>", "exec")
+    for spec in collect_rules(ViolenceRules):
+        assert f"def match_{spec.name}(index):" in source
+
+
+def test_compiled_engine_matches_experta():
+    experta_engine = ViolenceRules()
+    compiled_engine = compile_engine(ViolenceRules)()
+
+    for keywords in _corpus(150, seed=11):
+        facts = _facts(keywords)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for engine in (experta_engine, compiled_engine):
+                engine.load_facts(facts)
+                engine.run()
+        assert _result(compiled_engine) == _result(experta_engine)
+
+
+def test_compiled_engine_matches_experta_incrementally():
+    experta_engine = ViolenceRules()
+    compiled_engine = compile_engine(ViolenceRules)()
+    corpus = _corpus(60, seed=5)
+
+    for first, second in zip(corpus[::2], corpus[1::2]):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for engine in (experta_engine, compiled_engine):
+                # Caminho com fase de coleta e follow-up declarado depois de run
+                engine.reset()
+                engine.declare(*_facts(first))
+                engine.run()
+                engine.declare(*_facts(second))
+                engine.run()
+        assert _result(compiled_engine) == _result(experta_engine)
+
+
+def test_expert_system_selects_backend():
+    assert isinstance(ExpertSystem(api_key="test", engine="compiled").engine, compile_engine(ViolenceRules))
+    assert type(ExpertSystem(api_key="test").engine) is ViolenceRules
+
+    with pytest.raises(ValueError):
+        ExpertSystem(api_key="test", engine="rete2")
+
+
+class _ConstrainedRules(ViolenceRules):
+    @Rule(KeywordFact(category="impact", keyword=P(lambda keyword: keyword.startswith("medo"))))
+    def impact_with_predicate(self):
+        pass
+
+
+def test_unsupported_pattern_falls_back_to_rete():
+    with pytest.raises(UnsupportedRuleError):
+        compile_engine(_ConstrainedRules)()
+    assert not isinstance(build_batch_engine(_ConstrainedRules), compile_engine(_ConstrainedRules))
@@ -0,0 +1,56 @@
+import sys
+import os
+import contextlib
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import ViolenceRules
+from engine.text_processor import TextProcessor
+from engine.facts import ViolenceClassification
+from knowledge_base.weight_matrix import WEIGHT_MATRIX
+
+KEYWORDS = {
+    "action_type": ["interrupcao", "perseguicao", "contato_fisico_nao_consentido", "coercao_sexual"],
+    "frequency": ["repetidamente"],
+    "impact": ["medo_inseguranca"],
+}
+
+
+def _run(engine, top_k=None):
+    facts = []
+    TextProcessor(api_key="test")._add_keyword_facts(facts, KEYWORDS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.load_facts(facts)
+        engine.run(top_k=top_k)
+    return [
+        (fact["violence_type"], fact["subtype"])
+        for fact in engine.facts.values()
+        if isinstance(fact, ViolenceClassification)
+    ]
+
+
+def test_classifications_fire_in_severity_order():
+    declared = _run(ViolenceRules())
+    severities = [WEIGHT_MATRIX.severity_of(*classification) for classification in declared]
+    assert len(declared) > 2
+    assert severities == sorted(severities, reverse=True)
+
+
+def test_top_k_stops_after_most_severe():
+    full = _run(ViolenceRules())
+
+    engine = ViolenceRules()
+    top = _run(engine, top_k=1)
+    assert top == [("violencia_sexual", "estupro")]
+    assert top == full[:1]
+    # As ativações menos graves ficam pendentes e disparam no próximo run
+    assert engine.agenda.activations
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run()
+    assert {
+        (fact["violence_type"], fact["subtype"])
+        for fact in engine.facts.values()
+        if isinstance(fact, ViolenceClassification)
+    } == set(full)
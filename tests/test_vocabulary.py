@@ -0,0 +1,58 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.expert_system import ExpertSystem
+from knowledge_base import keywords_dictionary
+from knowledge_base.vocabulary import KeywordVocabulary, check_vocabulary, get_vocabulary
+
+
+def test_ids_round_trip_and_membership():
+    vocabulary = get_vocabulary()
+    keywords = {"action_type": ["perseguicao", "ameaca"], "impact": ["medo_inseguranca"]}
+
+    ids = vocabulary.encode(keywords)
+    assert all(isinstance(keyword_id, int) for keyword_id in ids)
+    assert vocabulary.decode(ids) == keywords
+    assert vocabulary.pair_of(vocabulary.id_of("impact", "constrangimento")) == ("impact", "constrangimento")
+    assert ("action_type", "constrangimento") in vocabulary
+    assert ("frequency", "ameaca") not in vocabulary
+    assert vocabulary.canonical("action_type", "Ameaça") == "ameaca"
+    assert vocabulary.canonical("categoria", "ameaca") is None
+
+
+def test_check_reports_disagreements():
+    assert check_vocabulary(
+        keywords_dictionary.KEYWORDS_DICT, keywords_dictionary.CONCEPT_MAPPING,
+        keywords_dictionary.CONCEPT_TO_FIELD, keywords_dictionary.KEYWORD_DESCRIPTIONS,
+        keywords_dictionary.UNWEIGHTED_KEYWORDS, keywords_dictionary.UNOFFERED_CONCEPTS
+    ) == []
+
+    problems = check_vocabulary(
+        {"frequency": ["unica_vez", "sempre"], "interrupcao": "Identificada quando..."},
+        {"frequencia": {"unica_vez": {}, "raramente": {}}},
+        {"frequencia": "frequency"},
+        {"unica_vez": "...", "nunca": "..."},
+        unoffered={"frequency": ["unica_vez"]}
+    )
+    assert problems == [
+        "categoria desconhecida no dicionário: 'interrupcao'",
+        "a categoria 'interrupcao' não é uma lista de palavras-chave",
+        "palavra-chave sem descrição: 'sempre'",
+        "descrição de palavra-chave fora do dicionário: 'nunca'",
+        "palavra-chave sem peso no CONCEPT_MAPPING: frequency/sempre",
+        "conceito do CONCEPT_MAPPING fora do dicionário: frequency/raramente",
+        "exceção obsoleta (UNOFFERED_CONCEPTS): frequency/unica_vez",
+    ]
+
+
+def test_batch_accepts_keyword_ids():
+    expert_system = ExpertSystem(api_key="test")
+    keywords = {"action_type": ["insulto_racial"], "target": ["raca_etnia"]}
+    ids = get_vocabulary().encode(keywords)
+
+    results = expert_system.classify_batch({"texto": keywords, "ids": ids})
+
+    assert results["ids"]["classifications"] == results["texto"]["classifications"]
+    assert KeywordVocabulary(keywords).encode(keywords) == (0, 1)
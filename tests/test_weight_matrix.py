@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knowledge_base.weight_matrix import WeightMatrix, WEIGHT_MATRIX
+from knowledge_base.keywords_dictionary import CONCEPT_MAPPING
+from knowledge_base.violence_types import VIOLENCE_TYPES
+
+
+def test_rows_match_concept_mapping():
+    scores = WEIGHT_MATRIX.score([("action_type", "exclusao")])
+    expected = CONCEPT_MAPPING["comportamentos"]["exclusao"]["discriminacao_genero"]
+
+    assert WEIGHT_MATRIX.score_of(scores, "discriminacao_genero", "discriminacao_flagrante") == expected["discriminacao_flagrante"]
+    assert WEIGHT_MATRIX.score_of(scores, "discriminacao_genero", "discriminacao_sutil") == expected["discriminacao_sutil"]
+    assert WEIGHT_MATRIX.score_of(scores, "microagressoes", "estereotipos") == 0
+
+
+def test_type_level_weight_applies_to_subtypes():
+    matrix = WeightMatrix(
+        {"comportamentos": {"ameaca": {"violencia_sexual": 3}}},
+        VIOLENCE_TYPES
+    )
+    scores = matrix.score([("action_type", "ameaca")])
+
+    assert matrix.score_of(scores, "violencia_sexual") == 3
+    assert matrix.score_of(scores, "violencia_sexual", "estupro") == 3
+
+
+def test_rank_orders_by_score_then_severity():
+    keywords = [
+        ("action_type", "humilhacao"),
+        ("target", "genero"),
+        ("context", "local_trabalho"),
+        ("relationship", "relacao_hierarquica"),
+    ]
+    ranked = WEIGHT_MATRIX.rank([
+        {"violence_type": "abuso_psicologico", "subtype": ""},
+        {"violence_type": "assedio_moral_genero", "subtype": ""},
+    ], keywords)
+    assert [c["violence_type"] for c in ranked] == ["assedio_moral_genero", "abuso_psicologico"]
+
+    tied = WEIGHT_MATRIX.rank([
+        {"violence_type": "microagressoes", "subtype": "estereotipos"},
+        {"violence_type": "violencia_sexual", "subtype": "estupro"},
+    ], [])
+    assert [c["subtype"] for c in tied] == ["estupro", "estereotipos"]
@@ -1,14 +1,98 @@
 import json
+import socket
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
 from typing import Dict, List, Any, Optional
 import os
-from knowledge_base.keywords_dictionary import KEYWORDS_DICT, KEYWORD_DESCRIPTIONS
+from knowledge_base.keywords_dictionary import KEYWORD_DESCRIPTIONS
+from knowledge_base.vocabulary import KeywordVocabulary
+
+class _AbortableConnection:
+    """Registra a conexão na sessão assim que ela abre o socket."""
+    session = None  # definida na subclasse criada para cada sessão
+
+    def connect(self):
+        super().connect()
+        self.session._opened(self)
+
+
+class _AbortablePoolManager(PoolManager):
+    def __init__(self, session, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._session = session
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        connection_class = pool.ConnectionCls
+        pool.ConnectionCls = type(connection_class.__name__, (_AbortableConnection, connection_class),
+                                  {"session": self._session})
+        return pool
+
+
+class _AbortableAdapter(HTTPAdapter):
+    def __init__(self, session):
+        self._session = session
+        super().__init__()
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager = _AbortablePoolManager(self._session, num_pools=connections,
+                                                 maxsize=maxsize, block=block, **pool_kwargs)
+
+
+class AbortableSession(requests.Session):
+    """
+    Sessão HTTP de uma única análise.
+
+    close() também derruba os sockets das conexões em uso, então a chamada ao
+    Groq em andamento termina na hora com erro de conexão, em vez de esperar a
+    resposta ou o tempo limite. Depois de fechada, a sessão não abre conexões.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._connections = []
+        self._closed = False
+        self._lock = threading.Lock()
+        adapter = _AbortableAdapter(self)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _opened(self, connection):
+        with self._lock:
+            if not self._closed:
+                self._connections.append(connection)
+                return
+        self._abort(connection)
+
+    @staticmethod
+    def _abort(connection):
+        if connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            self._abort(connection)
+        super().close()
+
 
 class GroqAPI:
     """
     Classe para comunicação com a API do Groq.
     Gerencia a construção de prompts e o processamento das respostas.
     """
+    # (conexão, leitura) em segundos; sem limite uma API lenta prende o
+    # processo de trabalho quando ninguém fecha a sessão da chamada
+    REQUEST_TIMEOUT = (5, 60)
+
     def __init__(self, api_key: str = None, 
                 model: str = "meta-llama/llama-4-scout-17b-16e-instruct"):
         # Buscar chave da variável de ambiente se não fornecida
@@ -20,14 +104,34 @@ class GroqAPI:
             "Authorization": f"Bearer {self.api_key}"
         }
     
-    def build_prompt(self, user_text: str, keywords_dict: Dict) -> Dict[str, str]:
+    def build_prompt(self, user_text: str, keywords_dict: Dict,
+                     keyword_descriptions: Optional[Dict] = None) -> Dict[str, str]:
 
         """
         Constrói o prompt para o Groq com instruções claras sobre as palavras-chave.
+
+        O prompt do sistema e os termos de validação só dependem do dicionário
+        e das descrições; são refeitos apenas quando esses objetos mudam (por
+        exemplo, depois de uma recarga da base de conhecimento).
         """
-        # Armazenar o dicionário para uso na validação
-        self.keyword_dict = keywords_dict
+        if keyword_descriptions is None:
+            keyword_descriptions = KEYWORD_DESCRIPTIONS
+
+        # Armazenar o dicionário (e seus termos normalizados) para uso na validação
+        if (getattr(self, "keyword_dict", None) is not keywords_dict
+                or getattr(self, "_keyword_descriptions", None) is not keyword_descriptions):
+            self.keyword_dict = keywords_dict
+            self._keyword_descriptions = keyword_descriptions
+            self._vocabulary = KeywordVocabulary(keywords_dict)
+            self._system_prompt = self._build_system_prompt(keywords_dict, keyword_descriptions)
+
+        return {
+            "system": self._system_prompt,
+            "user": f"RELATO: {user_text}"
+        }
 
+    @staticmethod
+    def _build_system_prompt(keywords_dict: Dict, keyword_descriptions: Dict) -> str:
         # Instruções do sistema
         system_prompt = """
         Você é um assistente especializado em identificar indicadores de violência em relatos.
@@ -49,7 +153,7 @@ class GroqAPI:
             system_prompt += f"\n{category.upper()}:\n"
             system_prompt += ", ".join(f'"{kw}"' for kw in keywords)
             for kw in keywords:
-                description = KEYWORD_DESCRIPTIONS.get(kw, "")
+                description = keyword_descriptions.get(kw, "")
                 if description:
                     system_prompt += f'"{kw}" - {description}\n'
                 else:
@@ -75,14 +179,15 @@ class GroqAPI:
         Só inclua categorias que tenham palavras-chave identificadas.
         """
         
-        return {
-            "system": system_prompt,
-            "user": f"RELATO: {user_text}"
-        }
+        return system_prompt
     
-    def send_request(self, prompt: Dict[str, str]) -> Dict[str, Any]:
+    def send_request(self, prompt: Dict[str, str],
+                     http: Optional[requests.Session] = None) -> Dict[str, Any]:
         """
         Envia requisição para a API do Groq e processa a resposta.
+
+        http é a sessão da análise (AbortableSession): fechá-la interrompe a
+        chamada em andamento. Sem ela, a requisição usa uma conexão avulsa.
         """
         try:
             data = {
@@ -95,7 +200,8 @@ class GroqAPI:
                 "response_format": {"type": "json_object"}  # forçar resposta em JSON
             }
             
-            response = requests.post(self.endpoint, headers=self.headers, json=data)
+            response = (http or requests).post(self.endpoint, headers=self.headers, json=data,
+                                               timeout=self.REQUEST_TIMEOUT)
             response.raise_for_status()
             
             result = response.json()
@@ -133,11 +239,15 @@ class GroqAPI:
         return valid_response
 
     def _is_valid_category(self, category: str) -> bool:
-        return category in self.keyword_dict
+        return category in self._vocabulary.categories
 
     def _filter_valid_keywords(self, category: str, keywords: list) -> list:
+        # Aceita variações de caixa, acento e separador e devolve a forma da lista
         valid_keywords = []
+        seen = set()
         for kw in keywords:
-            if kw in self.keyword_dict[category]:
-                valid_keywords.append(kw)
+            canonical = self._vocabulary.canonical(category, kw)
+            if canonical is not None and canonical not in seen:
+                seen.add(canonical)
+                valid_keywords.append(canonical)
         return valid_keywords
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Cartões de resultado pré-renderizados para a página de resultados.
+
+O markdown de cada classificação (título, definição, explicação com aliases e
+recomendações) é montado uma vez por (instituição, tipo, subtipo, assinatura
+da explicação) e guardado em um LRU limitado, compartilhado pelas sessões do
+processo. A chave é calculada quando o resultado chega (card_key); nos reruns
+a página só consulta o cache, então o custo não depende do tamanho da
+explicação.
+
+Cada versão da base de conhecimento e instituição tem o seu cache: depois de uma recarga os
+cartões são montados de novo com as definições e aliases novos.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from knowledge_base.fingerprint import content_fingerprint
+from knowledge_base.guidance import get_guidance
+from knowledge_base.institutions import DEFAULT_INSTITUTION
+from knowledge_base.keyword_aliases import get_alias_replacer
+from knowledge_base.versioning import active_version
+
+# Cartões por versão da base; cada um tem poucos KB
+CARD_CACHE_SIZE = 512
+
+CardKey = Tuple[str, str, str, str]
+
+
+@dataclass(frozen=True)
+class ResultCard:
+    """Markdown de uma classificação: o título e o conteúdo de "Ver detalhes"."""
+    title: str
+    details: str
+
+
+class CardCache:
+    """LRU limitado e seguro entre threads (cada sessão do Streamlit roda em uma)."""
+
+    def __init__(self, maxsize: int = CARD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, ResultCard]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[ResultCard]:
+        with self._lock:
+            card = self._entries.get(key)
+            if card is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return card
+
+    def put(self, key: Hashable, card: ResultCard):
+        with self._lock:
+            self._entries[key] = card
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def card_key(classification: Dict[str, Any], institution: str = DEFAULT_INSTITUTION) -> CardKey:
+    """(instituição, tipo, subtipo, assinatura da explicação) de uma classificação."""
+    return (
+        institution,
+        classification["violence_type"],
+        classification.get("subtype") or "",
+        content_fingerprint(list(classification.get("explanation") or ())),
+    )
+
+
+def _explanation_markdown(explanation: Iterable[str]) -> list:
+    blocks = []
+    for exp in explanation:
+        clean_exp = exp.strip()
+        if not clean_exp:
+            continue
+        if clean_exp.startswith("- "):
+            clean_exp = clean_exp[2:]
+
+        # Cabeçalho (como "Como chegamos a esta conclusão:") vira subseção sem bullet
+        if clean_exp.endswith(":") and len(clean_exp.split()) <= 6:
+            blocks.append(f"##### {clean_exp}")
+        else:
+            blocks.append(f"• {get_alias_replacer()(clean_exp)}")
+    return blocks
+
+
+def render_card(violence_type: str, subtype: Optional[str], explanation: Iterable[str],
+                institution: str = DEFAULT_INSTITUTION) -> ResultCard:
+    """Monta o markdown de uma classificação, sem cache."""
+    guidance = get_guidance(violence_type, subtype, institution)
+
+    if subtype:
+        subtype_formatted = subtype.replace("_", " ").capitalize()
+        title = f"{subtype_formatted} ({violence_type.replace('_', ' ').title()})"
+    else:
+        title = guidance.name
+
+    blocks = [guidance.definition] if guidance.definition else []
+    explanation_blocks = _explanation_markdown(explanation or ())
+    if explanation_blocks:
+        blocks.append("### Por que identificamos este tipo:")
+        blocks.extend(explanation_blocks)
+
+    # As recomendações exibidas são as do tipo
+    type_recommendations = get_guidance(violence_type, institution=institution).recommendations
+    if type_recommendations:
+        blocks.append("### Recomendações:")
+        blocks.extend(f"• {rec}" for rec in type_recommendations)
+
+    # Cada bloco em um parágrafo, como cada st.write separado
+    return ResultCard(title=f"#### {title}", details="\n\n".join(blocks))
+
+
+def get_card_cache(institution: str = DEFAULT_INSTITUTION) -> CardCache:
+    return active_version().derived(("result_cards", institution), CardCache)
+
+
+def get_card(key: CardKey, classification: Dict[str, Any]) -> ResultCard:
+    """Cartão da classificação; só é montado se a chave não estiver no cache."""
+    institution, violence_type, subtype, _ = key
+    cache = get_card_cache(institution)
+    card = cache.get(key)
+    if card is None:
+        card = render_card(violence_type, subtype, classification.get("explanation"), institution)
+        cache.put(key, card)
+    return card